@@ -0,0 +1,204 @@
+"""
+Per-subscriber alert rules compiled into column arrays.
+
+A rule is a short space-separated string, for example:
+
+    speed>=30 speed<=60 dir=W-N hours=6-20 days=sat,sun
+
+- speed>=N / speed<=N   minimum / maximum speed in km/h
+- dir=A-B               clockwise compass sector (e.g. W-N, 250-20), or a
+                        comma-separated list of points (dir=NW,W)
+- hours=A-B             local hours from A up to (not including) B; may wrap
+- days=A-B / days=a,b   days of the week (mon..sun)
+
+Anything left out defaults to the spot: its threshold, its sectors, any
+hour and any day. Parsed rules are compiled once (per registry load) into a
+RuleSet of NumPy column arrays, so the rules a reading has to be checked
+against are matched in a single vectorized pass rather than a Python loop.
+The subscriber index (subscriber_index.SubscriberIndex) narrows a reading
+down to candidate rows and matches them with the RuleSet.
+"""
+
+import re
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .spot_registry import SECTOR_WIDTH
+from .unit_conversions import COMPASS_DEGREES
+
+COMPASS_NAMES = tuple(COMPASS_DEGREES)
+DAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+ALL_DIRECTIONS = ((0.0, 360.0),)
+ALL_HOURS = (1 << 24) - 1
+ALL_DAYS = (1 << 7) - 1
+
+_TOKEN = re.compile(r'^(speed|dir|hours|days)\s*(>=|<=|=)\s*(.+)$')
+
+
+def _direction_degrees(text: str) -> float:
+    """Parse a compass name or number of degrees."""
+    name = text.strip().upper()
+    if name in COMPASS_DEGREES:
+        return COMPASS_DEGREES[name]
+    return float(name)
+
+
+def _parse_sectors(value: str) -> Tuple[Tuple[float, float], ...]:
+    """
+    Sectors for a dir= value, in the same form as a spot's sectors. A single
+    point covers half a compass point either side of it.
+    """
+    sectors = []
+    for part in value.split(','):
+        if '-' in part:
+            start_text, end_text = part.split('-', 1)
+            sectors.append((_direction_degrees(start_text), _direction_degrees(end_text)))
+        else:
+            centre = _direction_degrees(part)
+            sectors.append(((centre - SECTOR_WIDTH / 2) % 360, (centre + SECTOR_WIDTH / 2) % 360))
+    return tuple(sectors)
+
+
+def _parse_range_mask(value: str, names: Optional[Sequence[str]], size: int) -> int:
+    """Bitmask for hours=/days= values; ranges wrap past the end."""
+    def index(text):
+        text = text.strip().lower()
+        if names and text in names:
+            return names.index(text)
+        i = int(text)
+        if not 0 <= i <= size:
+            raise ValueError(f"{text} out of range")
+        return i
+
+    mask = 0
+    for part in value.split(','):
+        if '-' in part:
+            start, end = (index(p) for p in part.split('-', 1))
+            if names:
+                end += 1  # day ranges include the last day
+            i = start % size
+            while True:
+                mask |= 1 << i
+                i = (i + 1) % size
+                if i == end % size:
+                    break
+        else:
+            mask |= 1 << (index(part) % size)
+    return mask
+
+
+def parse_rule(rule: str, default_min: float,
+               default_sectors: Tuple[Tuple[float, float], ...]) -> Tuple[float, float, tuple, int, int]:
+    """
+    Parse one rule string.
+
+    Args:
+        rule: Rule text ('' = the spot defaults)
+        default_min: Spot threshold in km/h
+        default_sectors: Spot sectors, ((start, end), ...) clockwise in degrees
+
+    Returns:
+        (min_speed, max_speed, sectors, hour_mask, day_mask); sectors are
+        checked with spot_registry.in_sectors, as for spots
+
+    Raises:
+        ValueError: If the rule can't be parsed
+    """
+    min_speed, max_speed = default_min, float('inf')
+    sectors, hours, days = default_sectors, ALL_HOURS, ALL_DAYS
+
+    for token in rule.replace(';', ' ').split():
+        match = _TOKEN.match(token)
+        if not match:
+            raise ValueError(f"Unrecognised rule term '{token}' in '{rule}'")
+        field, op, value = match.groups()
+        try:
+            if field == 'speed' and op == '>=':
+                min_speed = float(value)
+            elif field == 'speed' and op == '<=':
+                max_speed = float(value)
+            elif field == 'dir' and op == '=':
+                sectors = _parse_sectors(value)
+            elif field == 'hours' and op == '=':
+                hours = _parse_range_mask(value, None, 24)
+            elif field == 'days' and op == '=':
+                days = _parse_range_mask(value, DAY_NAMES, 7)
+            else:
+                raise ValueError(f"operator '{op}' not supported for {field}")
+        except ValueError as e:
+            raise ValueError(f"Invalid rule term '{token}' in '{rule}': {e}") from e
+
+    return min_speed, max_speed, sectors, hours, days
+
+
+def sector_hits(degrees: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Vectorized spot_registry.in_sector: which (start, end) sectors contain a direction."""
+    full = ends - starts >= 360
+    degrees, starts, ends = degrees % 360, starts % 360, ends % 360
+    inside = np.where(starts <= ends, (starts <= degrees) & (degrees <= ends), (degrees >= starts) | (degrees <= ends))
+    return full | inside
+
+
+class RuleSet:
+    """
+    Compiled rules as parallel column arrays, one row per (subscriber, spot).
+
+    Sectors are stored flattened, with each row's sectors at
+    sector_offsets[row]:sector_offsets[row + 1], since a rule may have
+    several.
+    """
+
+    def __init__(self, keys: Sequence[Tuple[str, str]], rules: Sequence[Tuple[float, float, tuple, int, int]]):
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        columns = list(zip(*rules)) if rules else [(), (), (), (), ()]
+        self.min_speed = np.array(columns[0], dtype=np.float64)
+        self.max_speed = np.array(columns[1], dtype=np.float64)
+        self.hour_mask = np.array(columns[3], dtype=np.uint32)
+        self.day_mask = np.array(columns[4], dtype=np.uint32)
+
+        sectors = [sector for row_sectors in columns[2] for sector in row_sectors]
+        self.sector_offsets = np.cumsum([0] + [len(row_sectors) for row_sectors in columns[2]], dtype=np.int64)
+        self.sector_start = np.array([start for start, _ in sectors], dtype=np.float64)
+        self.sector_end = np.array([end for _, end in sectors], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def match(self, rows: np.ndarray, speed: float, direction: float,
+              when: Optional[datetime] = None) -> np.ndarray:
+        """
+        Evaluate the given rows against one reading.
+
+        Args:
+            rows: Row numbers to check (e.g. an index's candidates for a spot)
+            speed: Wind speed in km/h
+            direction: Wind direction in degrees
+            when: If given, also apply the rules' hour and day windows
+
+        Returns:
+            Boolean array, True where the row's rule is satisfied
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        matched = (self.min_speed[rows] <= speed) & (speed <= self.max_speed[rows])
+        if when is not None:
+            one = np.uint32(1)
+            matched &= ((self.hour_mask[rows] >> np.uint32(when.hour)) & one) == one
+            matched &= ((self.day_mask[rows] >> np.uint32(when.weekday())) & one) == one
+
+        # Gather every candidate's sectors, test them at once, then any() per row
+        first = self.sector_offsets[rows]
+        counts = self.sector_offsets[rows + 1] - first
+        owner = np.repeat(np.arange(len(rows)), counts)
+        sector = first[owner] + np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        hits = sector_hits(direction, self.sector_start[sector], self.sector_end[sector])
+        return matched & (np.bincount(owner, weights=hits, minlength=len(rows)) > 0)
+
+
+def compile_rules(rules: Iterable[Tuple[Tuple[str, str], Tuple[float, float, tuple, int, int]]]) -> RuleSet:
+    """Compile ((subscriber id, spot id), parsed rule) pairs into a RuleSet."""
+    rules = list(rules)
+    return RuleSet([key for key, _ in rules], [rule for _, rule in rules])
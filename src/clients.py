@@ -0,0 +1,132 @@
+"""
+Long-lived client and resource registry.
+
+OpenAI and Twilio clients (each with its own pooled HTTP connections) and
+the OpenAI system prompt are created lazily on first use and then reused
+across calls, retries and daemon cycles. Health and reset hooks let callers
+drop a client that has gone bad so the next call builds a fresh one.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from openai import OpenAI
+from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
+
+from .config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN
+
+log = logging.getLogger(__name__)
+
+SYSTEM_PROMPT_FILE = Path(__file__).parent / "openai_system_prompt.md"
+
+DEFAULT_SYSTEM_PROMPT = """You are an Australian surfer. Create a 1-2 sentence SMS alert about wind conditions.
+MUST include wind direction (N/NW/W etc) and speed in km/h. Keep under 160 chars. Be funny and urgent."""
+
+# Request timeouts for the pooled clients (seconds)
+OPENAI_TIMEOUT = 15.0
+TWILIO_TIMEOUT = 15.0
+
+_lock = threading.RLock()
+_resources: Dict[str, Dict[str, Any]] = {}
+
+
+def _get(name: str, factory: Callable[[], Any], key: Optional[str] = None) -> Any:
+    """Return the named resource, creating it if missing or its key changed."""
+    with _lock:
+        resource = _resources.get(name)
+        if resource is not None and resource['key'] != key:
+            log.info(f"Configuration for {name} changed, recreating")
+            reset_client(name)
+            resource = None
+
+        if resource is None:
+            resource = {
+                'value': factory(),
+                'key': key,
+                'created_at': time.time(),
+                'uses': 0,
+                'errors': 0
+            }
+            _resources[name] = resource
+            log.debug(f"Created {name}")
+
+        resource['uses'] += 1
+        return resource['value']
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Shared OpenAI client (keeps its own HTTP connection pool)."""
+    return _get('openai', lambda: OpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT), key=api_key)
+
+
+def get_twilio_client() -> Client:
+    """Shared Twilio client backed by a pooled HTTP session."""
+    def create():
+        http_client = TwilioHttpClient(pool_connections=True, timeout=TWILIO_TIMEOUT)
+        return Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+
+    return _get('twilio', create, key=TWILIO_ACCOUNT_SID)
+
+
+def get_system_prompt() -> str:
+    """OpenAI system prompt, read from disk once."""
+    def load():
+        if SYSTEM_PROMPT_FILE.exists():
+            return SYSTEM_PROMPT_FILE.read_text()
+        log.warning("System prompt file not found, using default")
+        return DEFAULT_SYSTEM_PROMPT
+
+    return _get('system_prompt', load)
+
+
+def record_client_error(name: str) -> None:
+    """Count an error against a client (shown by client_health)."""
+    with _lock:
+        if name in _resources:
+            _resources[name]['errors'] += 1
+
+
+def reset_client(name: str) -> None:
+    """Close and forget a resource; it is recreated on next use."""
+    with _lock:
+        resource = _resources.pop(name, None)
+    if resource is None:
+        return
+
+    value = resource['value']
+    try:
+        if isinstance(value, Client):
+            session = getattr(value.http_client, 'session', None)
+            if session is not None:
+                session.close()
+        elif hasattr(value, 'close'):
+            value.close()
+    except Exception as e:
+        log.debug(f"Error closing {name}: {e}")
+    log.info(f"Reset {name}")
+
+
+def reset_all_clients() -> None:
+    """Close and forget every resource."""
+    with _lock:
+        names = list(_resources)
+    for name in names:
+        reset_client(name)
+
+
+def client_health() -> Dict[str, Dict[str, Any]]:
+    """Age, use and error counts for each live resource."""
+    now = time.time()
+    with _lock:
+        return {
+            name: {
+                'age_seconds': now - r['created_at'],
+                'uses': r['uses'],
+                'errors': r['errors']
+            }
+            for name, r in _resources.items()
+        }
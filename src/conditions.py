@@ -1,5 +1,5 @@
 import logging
-from .config import WIND_SPEED_THRESHOLD_KMH
+from .config import WIND_SPEED_THRESHOLD_KMH, DIRECTION_CONSISTENCY_MIN, SUSTAINED_MIN_FRACTION
 
 log = logging.getLogger(__name__)
 
@@ -31,21 +31,59 @@ def is_good_wind_direction(degrees: float) -> bool:
     # 247.5° to 22.5° (covering W, NW, N)
     return (degrees >= 247.5) or (degrees <= 22.5)
 
-def check_alert_condition(wind_speed: float, wind_direction: float) -> bool:
+def check_alert_condition(wind_speed: float, wind_direction: float, spot=None) -> bool:
     """
     Check if wind conditions meet alert criteria.
 
     Args:
         wind_speed: Wind speed in km/h
         wind_direction: Wind direction in degrees (0-360)
+        spot: Optional registry Spot whose threshold and sectors to use
 
     Returns:
         True if conditions meet alert criteria (N/NW/W wind >= 25 km/h)
     """
-    is_good_direction = is_good_wind_direction(wind_direction)
-    is_strong = wind_speed >= WIND_SPEED_THRESHOLD_KMH
+    if spot is not None:
+        is_good_direction = spot.is_good_direction(wind_direction)
+        is_strong = wind_speed >= spot.threshold_kmh
+    else:
+        is_good_direction = is_good_wind_direction(wind_direction)
+        is_strong = wind_speed >= WIND_SPEED_THRESHOLD_KMH
 
     log.debug(f"Wind check: speed={wind_speed:.1f} km/h, direction={wind_direction:.0f}°")
     log.debug(f"Good direction (N/NW/W): {is_good_direction}, Is strong: {is_strong}")
 
-    return is_good_direction and is_strong
\ No newline at end of file
+    return is_good_direction and is_strong
+
+# Allowance for scheduler jitter when checking that a window covers the period
+SUSTAINED_GRACE_SECONDS = 120
+
+def sustained_reading(window, duration_minutes: float,
+                      fraction: float = SUSTAINED_MIN_FRACTION):
+    """
+    The window's held reading, if it has lasted for the period.
+
+    The speed is the one at least `fraction` of the samples reached (the
+    window min by default), so a single spike can't lift a weak window the
+    way it lifts the mean.
+
+    Args:
+        window: RollingWindow holding recent readings for the spot
+        duration_minutes: How long conditions must have held
+        fraction: Share of samples that must reach the returned speed
+
+    Returns:
+        (held speed, mean direction) if the window covers the period and the
+        direction is steady, else None
+    """
+    if len(window) == 0:
+        return None
+
+    covers_period = window.span_seconds >= duration_minutes * 60 - SUSTAINED_GRACE_SECONDS
+    is_steady = window.direction_consistency >= DIRECTION_CONSISTENCY_MIN
+    log.debug(f"Sustained check: {window.summary()}")
+    log.debug(f"Covers {duration_minutes} min: {covers_period}, Steady: {is_steady}")
+
+    if covers_period and is_steady:
+        return window.speed_held(fraction), window.mean_direction
+    return None
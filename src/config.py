@@ -13,6 +13,9 @@ ALERT_PHONE_TO = os.getenv('ALERT_PHONE_TO')
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Message Generation ('ai' = OpenAI with local fallback, 'local' = local synthesizer only)
+MESSAGE_MODE = os.getenv('MESSAGE_MODE', 'ai').lower()
+
 # Wreck Beach Coordinates (as specified in plan)
 COORDINATES = {
     'lat': float(os.getenv('WRECK_BEACH_LAT', '49.2611')),
@@ -29,4 +32,96 @@ DAILY_ALERT_LIMIT = int(os.getenv('DAILY_ALERT_LIMIT', '4'))
 
 # Application Settings
 DRY_RUN = os.getenv('DRY_RUN', 'false').lower() == 'true'
-LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
\ No newline at end of file
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+# Overlap message generation with dedup checks and Twilio setup
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'false').lower() == 'true'
+
+# Sustained Wind Detection (0 disables, alerting on the instantaneous reading)
+DEFAULT_SPOT_ID = os.getenv('DEFAULT_SPOT_ID', 'wreck-beach')
+SUSTAINED_WINDOW_MINUTES = int(os.getenv('SUSTAINED_WINDOW_MINUTES', '0'))
+WINDOW_CAPACITY = int(os.getenv('WINDOW_CAPACITY', '32'))
+WINDOW_STATE_PATH = os.getenv('WINDOW_STATE_PATH', '/tmp/wind_alert_window.bin')
+DIRECTION_CONSISTENCY_MIN = float(os.getenv('DIRECTION_CONSISTENCY_MIN', '0.8'))
+# Share of window samples that must reach the threshold (1.0 = every sample)
+SUSTAINED_MIN_FRACTION = float(os.getenv('SUSTAINED_MIN_FRACTION', '1.0'))
+
+# Multi-spot Registry (unset = single spot from the settings above)
+SPOT_REGISTRY_PATH = os.getenv('SPOT_REGISTRY_PATH') or None
+CHECK_INTERVAL_MINUTES = float(os.getenv('CHECK_INTERVAL_MINUTES', '30'))
+
+# Shared Response Cache (0 disables)
+RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '/tmp/wind_alert_cache')
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '300'))
+
+# Weather Source Health / Circuit Breaker
+SOURCE_HEALTH_PATH = os.getenv('SOURCE_HEALTH_PATH', '/tmp/wind_alert_source_health.json')
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '1800'))
+
+# Per-recipient Digests (0 = coalesce within a cycle only)
+DIGEST_WINDOW_SECONDS = float(os.getenv('DIGEST_WINDOW_SECONDS', '0'))
+
+# Deferred Delivery (quiet hours as start-end local hours, e.g. 22-7; empty disables;
+# subscribers can set their own quiet_hours in the spot registry)
+QUIET_HOURS = os.getenv('QUIET_HOURS', '')
+SCHEDULE_PATH = os.getenv('SCHEDULE_PATH', '/tmp/wind_alert_schedule.json')
+DELIVERY_BATCH_SIZE = int(os.getenv('DELIVERY_BATCH_SIZE', '20'))
+
+# Alert Dispatch (0 = send as fast as possible)
+SMS_SEND_RATE_PER_SECOND = float(os.getenv('SMS_SEND_RATE_PER_SECOND', '0'))
+
+# Status Endpoint (daemon mode; 0 disables)
+STATUS_HOST = os.getenv('STATUS_HOST', '127.0.0.1')
+STATUS_PORT = int(os.getenv('STATUS_PORT', '0'))
+
+# History Journal and Columnar Export
+HISTORY_PATH = os.getenv('HISTORY_PATH', '/tmp/wind_alert_history.jsonl')
+HISTORY_EXPORT_DIR = os.getenv('HISTORY_EXPORT_DIR', '/tmp/wind_alert_history')
+HISTORY_BATCH_ROWS = int(os.getenv('HISTORY_BATCH_ROWS', '65536'))
+
+# Profiling (--profile cpu|mem; daemon mode profiles one cycle in every N)
+PROFILE_DIR = os.getenv('PROFILE_DIR', '/tmp/wind_alert_profile')
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '25'))
+PROFILE_SORT = os.getenv('PROFILE_SORT', 'cumulative')
+PROFILE_SAMPLE_EVERY = int(os.getenv('PROFILE_SAMPLE_EVERY', '1'))
+
+# Multi-model Ensemble (comma-separated Open-Meteo models, e.g.
+# ecmwf_ifs025,gfs_seamless,icon_seamless,gem_seamless; empty disables)
+ENSEMBLE_MODELS = os.getenv('ENSEMBLE_MODELS', '')
+ENSEMBLE_HOURS = int(os.getenv('ENSEMBLE_HOURS', '1'))
+ENSEMBLE_MAX_SPREAD_KMH = float(os.getenv('ENSEMBLE_MAX_SPREAD_KMH', '8.0'))
+ENSEMBLE_MIN_DIRECTION_AGREEMENT = float(os.getenv('ENSEMBLE_MIN_DIRECTION_AGREEMENT', '0.8'))
+
+# Weather Sources (registered plugin names in priority order, empty = all;
+# plugin modules to import; merge = first healthy result or mean of all;
+# the ECCC YVR station only serves spots within ECCC_MAX_DISTANCE_KM)
+WEATHER_SOURCES = os.getenv('WEATHER_SOURCES', '')
+WEATHER_SOURCE_PLUGINS = os.getenv('WEATHER_SOURCE_PLUGINS', '')
+SOURCE_MERGE = os.getenv('SOURCE_MERGE', 'first')
+SOURCE_FETCH_WORKERS = int(os.getenv('SOURCE_FETCH_WORKERS', '8'))
+ECCC_MAX_DISTANCE_KM = float(os.getenv('ECCC_MAX_DISTANCE_KM', '25'))
+
+# Multi-spot Cycle (--all-spots; concurrent fetches, digest generations and sends per cycle)
+CYCLE_FETCH_CONCURRENCY = int(os.getenv('CYCLE_FETCH_CONCURRENCY', '8'))
+CYCLE_GENERATE_CONCURRENCY = int(os.getenv('CYCLE_GENERATE_CONCURRENCY', '4'))
+CYCLE_SEND_CONCURRENCY = int(os.getenv('CYCLE_SEND_CONCURRENCY', '4'))
+
+# Delivery Status Callbacks (Twilio posts status changes to STATUS_CALLBACK_URL,
+# received on CALLBACK_PORT; 0 disables). Failed sends are retried once after a delay
+STATUS_CALLBACK_URL = os.getenv('STATUS_CALLBACK_URL', '')
+CALLBACK_HOST = os.getenv('CALLBACK_HOST', '127.0.0.1')
+CALLBACK_PORT = int(os.getenv('CALLBACK_PORT', '0'))
+DELIVERY_DB_PATH = os.getenv('DELIVERY_DB_PATH', '/tmp/wind_alert_deliveries.db')
+DELIVERY_FLUSH_ROWS = int(os.getenv('DELIVERY_FLUSH_ROWS', '500'))
+DELIVERY_FLUSH_SECONDS = float(os.getenv('DELIVERY_FLUSH_SECONDS', '0.5'))
+DELIVERY_RETRY_DELAY_SECONDS = int(os.getenv('DELIVERY_RETRY_DELAY_SECONDS', '300'))
+RETRY_SCHEDULE_PATH = os.getenv('RETRY_SCHEDULE_PATH', '/tmp/wind_alert_retries.json')
+
+# Warm-start Snapshot (one file bundling state, windows, health, schedules,
+# deliveries and live cache entries; restored at start, written at exit; empty disables)
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', '')
+
+# Model Grid Cells (spacing in degrees of the forecast model's grid; spots in the
+# same cell share one fetch at the grid point; 0 fetches at each spot's coordinates)
+GRID_CELL_DEGREES = float(os.getenv('GRID_CELL_DEGREES', '0'))
@@ -0,0 +1,285 @@
+"""
+Concurrent multi-spot check cycle.
+
+One cycle takes every spot through fetch -> condition -> dedup, all spots
+at once on an asyncio loop, then generates one digest per recipient
+covering every spot that fired for them and sends the digests through a
+priority DispatchQueue, highest score first and paced to the SMS rate.
+Each stage has its own bounded semaphore, so a slow upstream or LLM can
+only tie up its own stage's slots. Blocking stage functions run in worker
+threads.
+
+Work is merged where it can be: spots in the same model grid cell (or at
+the same coordinates when grid planning is off) share one fetch, and
+alerts for the same recipient share one message and one SMS.
+A cycle that runs past its interval stops starting new spots; the spots it
+shed are checked first in the next cycle, so cycles never overlap and no
+spot is starved.
+
+The stage functions are passed in, so the runner itself holds no alert
+policy:
+
+    fetch(spot) -> WindReading or None; called once per fetch_key(spot)
+    evaluate(spot, reading) -> recipients to alert, [] if no subscriber
+        rules match, or None if conditions aren't met
+    admit(spot, reading, recipients) -> None to alert, a list to alert only
+        those recipients, else the decision recorded instead (e.g.
+        'suppressed', 'deferred')
+    generate(alerts) -> message for one recipient's digest
+    score(recipient, alerts) -> dispatch priority of a digest; optional,
+        strongest wind first by default
+    send(message, recipient) -> message SID or None
+    on_sent(recipient, alerts, sid) -> None; optional, called after each
+        digest goes out (e.g. to track its delivery)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .config import (CHECK_INTERVAL_MINUTES, DIGEST_WINDOW_SECONDS, CYCLE_FETCH_CONCURRENCY,
+                     CYCLE_GENERATE_CONCURRENCY, CYCLE_SEND_CONCURRENCY, SMS_SEND_RATE_PER_SECOND)
+from .digest import DigestCoalescer, PendingAlert, build_digest_message
+from .dispatch_queue import DispatchQueue
+from .grid_cells import fetch_key
+from .readings import WindReading
+
+log = logging.getLogger(__name__)
+
+STAGES = ('fetch', 'condition', 'dedup', 'generate', 'send')
+
+# Returned in place of a reading for spots not started before the deadline
+SHED = object()
+
+# Condition and dedup read and write shared state files (rolling windows,
+# alert state), so they run one spot at a time; both are cheap
+DEFAULT_LIMITS = {
+    'fetch': CYCLE_FETCH_CONCURRENCY,
+    'condition': 1,
+    'dedup': 1,
+    'generate': CYCLE_GENERATE_CONCURRENCY,
+    'send': CYCLE_SEND_CONCURRENCY
+}
+
+
+@dataclass
+class SpotOutcome:
+    """What happened to one spot in a cycle."""
+    spot_id: str
+    decision: str = 'pending'
+    reading: Optional[WindReading] = None
+    recipients: tuple = ()
+
+
+@dataclass
+class CycleReport:
+    """Summary of one cycle."""
+    started_at: float
+    interval: float
+    duration: float = 0.0
+    fetches: int = 0
+    digests: int = 0
+    sent: int = 0
+    failed: int = 0
+    shed: List[str] = field(default_factory=list)
+    outcomes: Dict[str, SpotOutcome] = field(default_factory=dict)
+    stage_seconds: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    # (recipient, alerts, message) for each digest that went out
+    delivered: List[Tuple[Optional[str], List[PendingAlert], str]] = field(default_factory=list)
+    queue: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    @property
+    def overran(self) -> bool:
+        return self.duration > self.interval
+
+    def decisions(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for outcome in self.outcomes.values():
+            counts[outcome.decision] = counts.get(outcome.decision, 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        decisions = ', '.join(f"{count} {decision}" for decision, count in sorted(self.decisions().items()))
+        return (f"{len(self.outcomes)} spot(s) in {self.duration:.2f}s "
+                f"({self.fetches} fetch(es); {decisions or 'nothing checked'}), "
+                f"{self.digests} digest(s): {self.sent} sent, {self.failed} failed"
+                + (f", {len(self.shed)} shed" if self.shed else ""))
+
+
+class CycleRunner:
+    """
+    Runs check cycles over many spots.
+
+    Keep one runner for the life of a daemon: spots shed by an overrunning
+    cycle, and digests still inside their coalescing window, carry over to
+    the next cycle.
+    """
+
+    def __init__(self, fetch: Callable, evaluate: Callable, admit: Callable,
+                 send: Callable[[str, Optional[str]], Optional[str]],
+                 generate: Callable[[List[PendingAlert]], str] = build_digest_message,
+                 interval_seconds: float = CHECK_INTERVAL_MINUTES * 60,
+                 limits: Optional[Dict[str, int]] = None,
+                 digest_window: float = DIGEST_WINDOW_SECONDS,
+                 on_sent: Optional[Callable[[str, List[PendingAlert], str], None]] = None,
+                 fetch_key: Callable[[object], Hashable] = fetch_key,
+                 score: Optional[Callable[[Optional[str], List[PendingAlert]], float]] = None,
+                 send_rate: float = SMS_SEND_RATE_PER_SECOND):
+        self.fetch = fetch
+        self.fetch_key = fetch_key
+        self.evaluate = evaluate
+        self.admit = admit
+        self.send = send
+        self.generate = generate
+        self.on_sent = on_sent
+        self.score = score or (lambda recipient, alerts: max(a.speed for a in alerts))
+        self.send_rate = send_rate
+        self.interval_seconds = interval_seconds
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.coalescer = DigestCoalescer(digest_window)
+        self._carried: List[str] = []
+
+    def _order(self, spots: Iterable) -> List:
+        """Spots shed last cycle first, then the rest in registry order."""
+        spots = list(spots)
+        carried = set(self._carried)
+        return [s for s in spots if s.id in carried] + [s for s in spots if s.id not in carried]
+
+    def run(self, spots: Iterable, force: bool = False) -> CycleReport:
+        """Run one cycle to completion (from synchronous code)."""
+        return asyncio.run(self.run_cycle(spots, force))
+
+    async def run_cycle(self, spots: Iterable, force: bool = False) -> CycleReport:
+        """
+        Check every spot once and send the resulting digests.
+
+        Args:
+            spots: Registry Spots to check
+            force: Skip the dedup stage
+
+        Returns:
+            CycleReport for the cycle
+        """
+        started = time.monotonic()
+        deadline = started + self.interval_seconds
+        report = CycleReport(started_at=time.time(), interval=self.interval_seconds)
+        semaphores = {stage: asyncio.BoundedSemaphore(max(1, self.limits[stage])) for stage in STAGES}
+        fetches: Dict[tuple, asyncio.Task] = {}
+
+        async def stage(name, func, *args):
+            async with semaphores[name]:
+                began = time.monotonic()
+                try:
+                    return await asyncio.to_thread(func, *args)
+                finally:
+                    report.stage_seconds[name] += time.monotonic() - began
+
+        async def fetch(spot):
+            async with semaphores['fetch']:
+                # Past the interval, don't start new work; shed spots go first next cycle
+                if time.monotonic() >= deadline:
+                    return SHED
+                report.fetches += 1
+                began = time.monotonic()
+                try:
+                    return await asyncio.to_thread(self.fetch, spot)
+                except Exception as e:
+                    log.error(f"Fetch failed for {spot.id}: {e}")
+                    return None
+                finally:
+                    report.stage_seconds['fetch'] += time.monotonic() - began
+
+        async def check(spot):
+            outcome = report.outcomes[spot.id] = SpotOutcome(spot.id)
+
+            # Spots in the same grid cell share one fetch
+            key = self.fetch_key(spot)
+            if key not in fetches:
+                fetches[key] = asyncio.create_task(fetch(spot))
+            reading = await fetches[key]
+            if reading is SHED:
+                outcome.decision = 'shed'
+                report.shed.append(spot.id)
+                return
+            outcome.reading = reading
+            if reading is None:
+                outcome.decision = 'fetch_failed'
+                return
+
+            recipients = await stage('condition', self.evaluate, spot, reading)
+            if recipients is None:
+                outcome.decision = 'below_criteria'
+                return
+            if not recipients:
+                outcome.decision = 'no_matching_subscribers'
+                return
+            outcome.recipients = tuple(recipients)
+
+            if not force:
+                decision = await stage('dedup', self.admit, spot, reading, outcome.recipients)
+                if isinstance(decision, str):
+                    outcome.decision = decision
+                    return
+                if decision is not None:
+                    outcome.recipients = tuple(decision)
+
+            for to in outcome.recipients:
+                self.coalescer.add(to, spot, reading.speed, reading.direction)
+            outcome.decision = 'queued'
+
+        queue = DispatchQueue(self.send_rate)
+        queued: Dict[Optional[str], List[PendingAlert]] = {}
+
+        async def prepare(recipient, alerts):
+            try:
+                message = await stage('generate', self.generate, alerts)
+            except Exception as e:
+                log.error(f"Failed to generate digest for {recipient}: {e}")
+                await settle(recipient, alerts, None, None)
+                return
+            queued[recipient] = alerts
+            queue.push(recipient, message, self.score(recipient, alerts), alerts[0].spot_id)
+
+        async def settle(recipient, alerts, message, sid):
+            if sid:
+                report.sent += 1
+                report.delivered.append((recipient, alerts, message))
+                if self.on_sent is not None:
+                    try:
+                        await asyncio.to_thread(self.on_sent, recipient, alerts, sid)
+                    except Exception as e:
+                        log.error(f"Error recording digest sent to {recipient}: {e}")
+            else:
+                report.failed += 1
+            for alert in alerts:
+                outcome = report.outcomes.get(alert.spot_id)
+                if outcome is None:
+                    continue
+                # A spot counts as sent if any of its recipients' digests went out
+                if outcome.decision == 'queued' or (sid and outcome.decision == 'send_failed'):
+                    outcome.decision = 'sent' if sid else 'send_failed'
+
+        await asyncio.gather(*(check(spot) for spot in self._order(spots)))
+
+        # Windowless digests go out every cycle; windowed ones when due
+        due = self.coalescer.take_due(force=self.coalescer.window_seconds <= 0)
+        report.digests = len(due)
+        await asyncio.gather(*(prepare(recipient, alerts) for recipient, alerts in due))
+
+        if len(queue):
+            results = await stage('send', lambda: queue.drain(self.send, workers=self.limits['send']))
+            for item, sid in results:
+                await settle(item.recipient, queued[item.recipient], item.message, sid)
+            report.queue = queue.metrics()
+            log.info(f"Dispatch queue: {report.queue['dispatched']} sent, {report.queue['failed']} failed, "
+                     f"max depth {report.queue['max_depth']}, p95 wait {report.queue['wait_p95'] or 0:.2f}s")
+
+        self._carried = list(report.shed)
+        report.duration = time.monotonic() - started
+        log.info(f"Cycle complete: {report.summary()}")
+        if report.overran:
+            log.warning(f"Cycle took {report.duration:.1f}s, over its {self.interval_seconds:.0f}s interval"
+                        + (f"; {len(report.shed)} spot(s) shed, checked first next cycle" if report.shed else ""))
+        return report
@@ -0,0 +1,193 @@
+"""
+Deferred alert delivery.
+
+Alerts that come due during quiet hours (or are otherwise pushed back) are
+held in a persistent min-heap keyed by fire time, so inserting and popping
+stay O(log n) however many are pending. When an alert fires, conditions are
+re-checked against fresh data and only alerts that still hold are released,
+in batches, to the sender.
+"""
+
+import heapq
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import SCHEDULE_PATH, QUIET_HOURS, DELIVERY_BATCH_SIZE
+
+log = logging.getLogger(__name__)
+
+# (fire_at, seq, recipient, spot_id, speed, direction, queued_at)
+Entry = Tuple[float, int, Optional[str], str, float, float, float]
+
+
+def parse_quiet_hours(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Parse a quiet hours setting like "22-7" (from 22:00 until 07:00).
+
+    Returns:
+        (start hour, end hour), or None if quiet hours are disabled
+
+    Raises:
+        ValueError: If the setting can't be parsed
+    """
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        start, end = (int(part) for part in text.split('-', 1))
+    except ValueError as e:
+        raise ValueError(f"Invalid quiet hours '{text}', expected e.g. 22-7") from e
+    if not (0 <= start < 24 and 0 <= end < 24) or start == end:
+        raise ValueError(f"Invalid quiet hours '{text}'")
+    return start, end
+
+
+def quiet_hours_end(now: datetime, quiet: str = QUIET_HOURS) -> Optional[datetime]:
+    """
+    End of the current quiet period.
+
+    Returns:
+        When quiet hours end if now falls inside them, else None
+    """
+    hours = parse_quiet_hours(quiet)
+    if hours is None:
+        return None
+
+    start, end = hours
+    wraps = start > end
+    if (start <= now.hour or now.hour < end) if wraps else (start <= now.hour < end):
+        until = now.replace(hour=end, minute=0, second=0, microsecond=0)
+        return until if until > now else until + timedelta(days=1)
+    return None
+
+
+class DeliveryScheduler:
+    """Persistent min-heap of alerts waiting for their fire time."""
+
+    def __init__(self, entries: Optional[List[Entry]] = None, path: str = SCHEDULE_PATH):
+        self.path = path
+        self._heap: List[Entry] = list(entries or [])
+        heapq.heapify(self._heap)
+        self._seq = max((e[1] for e in self._heap), default=-1) + 1
+        self._pending = {(e[2], e[3]) for e in self._heap}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, fire_at: float, recipient: Optional[str], spot_id: str,
+                 speed: float, direction: float, queued_at: float) -> bool:
+        """
+        Hold an alert until fire_at.
+
+        Returns:
+            False if the recipient already has an alert pending for the spot
+        """
+        if (recipient, spot_id) in self._pending:
+            return False
+        heapq.heappush(self._heap, (fire_at, self._seq, recipient, spot_id, speed, direction, queued_at))
+        self._seq += 1
+        self._pending.add((recipient, spot_id))
+        return True
+
+    def next_fire_time(self) -> Optional[float]:
+        """Fire time of the earliest pending alert."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int = DELIVERY_BATCH_SIZE) -> List[Entry]:
+        """Remove and return up to limit alerts whose fire time has passed."""
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            entry = heapq.heappop(self._heap)
+            self._pending.discard((entry[2], entry[3]))
+            due.append(entry)
+        return due
+
+    def release_due(self, now: float,
+                    recheck: Callable[[str], Optional[Tuple[float, float]]],
+                    deliver: Callable[[str, Sequence[Optional[str]], Tuple[float, float]], Optional[str]],
+                    batch_size: int = DELIVERY_BATCH_SIZE) -> Tuple[int, int, int]:
+        """
+        Fire due alerts in batches.
+
+        Args:
+            now: Current time (epoch seconds)
+            recheck: spot id -> fresh (speed, direction) if conditions still
+                hold, else None
+            deliver: Called with (spot id, recipients, fresh reading); returns
+                None once the alerts are sent, 'dropped' if they no longer
+                apply, or any other decision (e.g. 'suppressed') to keep
+                them pending for a later release
+            batch_size: Maximum alerts popped per batch
+
+        Returns:
+            (alerts delivered, alerts dropped because conditions lapsed,
+            alerts held back and kept pending)
+        """
+        delivered = dropped = 0
+        held: List[Entry] = []
+        checked: Dict[str, Optional[Tuple[float, float]]] = {}
+
+        while True:
+            batch = self.pop_due(now, batch_size)
+            if not batch:
+                break
+            batch.sort(key=lambda e: e[3])
+            for spot_id, entries in groupby(batch, key=lambda e: e[3]):
+                entries = list(entries)
+                if spot_id not in checked:
+                    checked[spot_id] = recheck(spot_id)
+                reading = checked[spot_id]
+                if reading is None:
+                    log.info(f"Dropping {len(entries)} deferred alert(s) for {spot_id}, conditions no longer met")
+                    dropped += len(entries)
+                    continue
+                decision = deliver(spot_id, [e[2] for e in entries], reading)
+                if decision is None:
+                    delivered += len(entries)
+                elif decision == 'dropped':
+                    dropped += len(entries)
+                else:
+                    held.extend(entries)
+
+        # Pushed back only now, so they aren't popped again in this release
+        for entry in held:
+            heapq.heappush(self._heap, entry)
+            self._pending.add((entry[2], entry[3]))
+
+        if delivered or dropped or held:
+            log.info(f"Deferred alerts: {delivered} released, {dropped} dropped, {len(held)} held, "
+                     f"{len(self)} pending")
+        return delivered, dropped, len(held)
+
+    def save(self) -> None:
+        """Persist pending alerts for the next run."""
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self._heap, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            log.error(f"Error saving delivery schedule: {e}")
+
+
+def load_schedule(path: str = SCHEDULE_PATH) -> DeliveryScheduler:
+    """Load pending alerts (empty if missing or unreadable)."""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                entries = [tuple(e) for e in json.load(f)]
+            return DeliveryScheduler(entries, path)
+        except (json.JSONDecodeError, IOError, TypeError) as e:
+            log.warning(f"Error loading delivery schedule: {e}, starting fresh")
+    return DeliveryScheduler(path=path)
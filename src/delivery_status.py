@@ -0,0 +1,414 @@
+"""
+SMS delivery tracking from Twilio status callbacks.
+
+Every sent message's SID is recorded in a SQLite delivery store together
+with the recipient and the spot readings it alerted on. When
+STATUS_CALLBACK_URL is set, Twilio posts each message's status changes
+(queued, sent, delivered, undelivered, failed) to that URL, and a small
+receiver running alongside the daemon takes them in.
+
+The receiver only parses and buffers: updates are coalesced per SID in
+memory (a burst of queued/sent/delivered for one message becomes one row
+write) and a background writer applies them in one transaction per batch,
+so a fan-out's worth of callbacks costs a handful of commits. Statuses only
+move forward, so callbacks arriving out of order don't undo a delivery.
+
+Failed and undelivered messages, other than ones that can never succeed
+(invalid, landline or unsubscribed numbers), are handed back for one retry.
+
+post_test_callbacks() plays Twilio's part for testing, posting synthetic
+(optionally signed) callbacks at a receiver.
+"""
+
+import http.client
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .config import (DELIVERY_DB_PATH, DELIVERY_FLUSH_ROWS, DELIVERY_FLUSH_SECONDS, CALLBACK_HOST,
+                     STATUS_CALLBACK_URL, TWILIO_AUTH_TOKEN)
+
+log = logging.getLogger(__name__)
+
+CALLBACK_PATH = '/twilio/status'
+
+# Twilio message statuses in lifecycle order; terminal ones share the top ranks
+STATUS_RANK = {
+    'accepted': 0, 'scheduled': 0, 'queued': 1, 'sending': 2, 'sent': 3,
+    'failed': 4, 'undelivered': 4, 'canceled': 4, 'delivered': 5, 'read': 6
+}
+FAILED_STATUSES = ('failed', 'undelivered')
+
+# Error codes a retry can't fix (invalid number, unsubscribed, not SMS-capable,
+# blocked, unknown destination, landline)
+PERMANENT_ERROR_CODES = frozenset({'21211', '21610', '21614', '30004', '30005', '30006'})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    sid TEXT PRIMARY KEY,
+    recipient TEXT,
+    alerts TEXT,
+    attempt INTEGER NOT NULL DEFAULT 0,
+    sent_at REAL,
+    status TEXT,
+    status_rank INTEGER NOT NULL DEFAULT -1,
+    error_code TEXT,
+    updated_at REAL,
+    retried INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS messages_retry ON messages (retried, status_rank);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class StatusUpdate:
+    """One status callback."""
+    sid: str
+    status: str
+    error_code: Optional[str]
+    received_at: float
+
+    @property
+    def rank(self) -> int:
+        return STATUS_RANK.get(self.status, -1)
+
+
+@dataclass(frozen=True, slots=True)
+class FailedDelivery:
+    """A failed message to retry: who it was for and the spot readings it covered."""
+    sid: str
+    recipient: str
+    alerts: Tuple[Tuple[str, float, float], ...]   # (spot id, speed, direction)
+    sent_at: float
+    error_code: Optional[str]
+
+
+class DeliveryStore:
+    """SQLite store of sent messages and their latest delivery status."""
+
+    def __init__(self, path: str = DELIVERY_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record_sent(self, messages: Iterable[Tuple[str, Optional[str], Sequence[Tuple[str, float, float]]]],
+                    attempt: int = 0, sent_at: Optional[float] = None) -> int:
+        """
+        Remember sent messages (a callback that beat us here keeps its status).
+
+        Args:
+            messages: (SID, recipient, [(spot id, speed, direction), ...]) per message
+            attempt: 0 for first sends, 1 for retries
+            sent_at: Send time (defaults to now)
+
+        Returns:
+            Number of messages recorded
+        """
+        sent_at = time.time() if sent_at is None else sent_at
+        rows = [(sid, recipient, json.dumps([list(a) for a in alerts]), attempt, sent_at)
+                for sid, recipient, alerts in messages if sid]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (sid, recipient, alerts, attempt, sent_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(sid) DO UPDATE SET recipient = excluded.recipient, alerts = excluded.alerts, "
+                "attempt = excluded.attempt, sent_at = excluded.sent_at",
+                rows)
+        return len(rows)
+
+    def apply_updates(self, updates: Iterable[StatusUpdate]) -> int:
+        """
+        Apply a batch of status updates in one transaction.
+
+        An update only replaces a status of the same or an earlier stage.
+
+        Returns:
+            Number of updates in the batch
+        """
+        rows = [(u.sid, u.status, u.rank, u.error_code, u.received_at) for u in updates]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (sid, status, status_rank, error_code, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(sid) DO UPDATE SET status = excluded.status, status_rank = excluded.status_rank, "
+                "error_code = COALESCE(excluded.error_code, messages.error_code), updated_at = excluded.updated_at "
+                "WHERE excluded.status_rank >= messages.status_rank",
+                rows)
+        return len(rows)
+
+    def status(self, sid: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM messages WHERE sid = ?", (sid,)).fetchone()
+        return row[0] if row else None
+
+    def status_counts(self) -> Dict[str, int]:
+        """Messages per latest status (None = no callback yet)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM messages GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def take_failed(self, max_attempt: int = 0, limit: int = 500) -> List[FailedDelivery]:
+        """
+        Claim failed deliveries for retry (each is only returned once).
+
+        Args:
+            max_attempt: Only messages that were at most this attempt
+            limit: Maximum deliveries returned
+
+        Returns:
+            Failed deliveries with a recipient, excluding permanent errors
+        """
+        placeholders = ','.join('?' * len(FAILED_STATUSES))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT sid, recipient, alerts, sent_at, error_code FROM messages "
+                f"WHERE retried = 0 AND status IN ({placeholders}) AND attempt <= ? "
+                f"AND recipient IS NOT NULL LIMIT ?",
+                (*FAILED_STATUSES, max_attempt, limit)).fetchall()
+            self._conn.executemany("UPDATE messages SET retried = 1 WHERE sid = ?", [(r[0],) for r in rows])
+
+        failed = []
+        for sid, recipient, alerts, sent_at, error_code in rows:
+            if error_code in PERMANENT_ERROR_CODES:
+                log.info(f"Not retrying {sid} to {recipient}: permanent error {error_code}")
+                continue
+            failed.append(FailedDelivery(sid, recipient, tuple(tuple(a) for a in json.loads(alerts or '[]')),
+                                         sent_at, error_code))
+        return failed
+
+
+class CallbackBuffer:
+    """
+    Holds status updates in memory and writes them in batches.
+
+    A background thread flushes every flush_seconds, or sooner once
+    flush_rows distinct messages are waiting.
+    """
+
+    def __init__(self, store: DeliveryStore, flush_rows: int = DELIVERY_FLUSH_ROWS,
+                 flush_seconds: float = DELIVERY_FLUSH_SECONDS):
+        self.store = store
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._pending: Dict[str, StatusUpdate] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.received = 0
+        self.written = 0
+        self.batches = 0
+
+    def add(self, update: StatusUpdate) -> None:
+        """Buffer an update, keeping only the furthest-along status per message."""
+        with self._cond:
+            self.received += 1
+            current = self._pending.get(update.sid)
+            if current is None or update.rank >= current.rank:
+                self._pending[update.sid] = update
+            if len(self._pending) >= self.flush_rows:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Write everything buffered now. Returns rows written."""
+        with self._cond:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            written = self.store.apply_updates(batch.values())
+        except sqlite3.Error as e:
+            log.error(f"Error writing delivery statuses: {e}")
+            with self._cond:
+                # Put the batch back under anything newer that arrived meanwhile
+                for sid, update in batch.items():
+                    if sid not in self._pending or update.rank > self._pending[sid].rank:
+                        self._pending[sid] = update
+            return 0
+        self.written += written
+        self.batches += 1
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.flush_rows:
+                    self._cond.wait(self.flush_seconds)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def start(self) -> 'CallbackBuffer':
+        self._thread = threading.Thread(target=self._run, name='delivery-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the writer after a final flush."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def metrics(self) -> Dict[str, int]:
+        with self._cond:
+            pending = len(self._pending)
+        return {'received': self.received, 'written': self.written, 'batches': self.batches, 'pending': pending}
+
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    """Accepts Twilio status callbacks (form-encoded POSTs) into the server's buffer."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, code: int) -> None:
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != CALLBACK_PATH:
+            self._reply(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        params = dict(parse_qsl(self.rfile.read(length).decode('utf-8')))
+
+        validator = self.server.validator
+        if validator is not None and not validator.validate(
+                self.server.public_url, params, self.headers.get('X-Twilio-Signature', '')):
+            log.warning("Rejected status callback with a bad signature")
+            self._reply(403)
+            return
+
+        sid = params.get('MessageSid')
+        status = params.get('MessageStatus')
+        if not sid or not status:
+            self._reply(400)
+            return
+        self.server.buffer.add(StatusUpdate(sid, status.lower(), params.get('ErrorCode') or None, time.time()))
+        self._reply(204)
+
+    def log_message(self, format, *args):
+        log.debug(f"{self.address_string()} {format % args}")
+
+
+def start_callback_server(buffer: CallbackBuffer, port: int, host: str = CALLBACK_HOST,
+                          public_url: str = STATUS_CALLBACK_URL,
+                          auth_token: Optional[str] = TWILIO_AUTH_TOKEN) -> ThreadingHTTPServer:
+    """
+    Start receiving status callbacks in a background thread.
+
+    Requests are checked against Twilio's signature when both the public
+    callback URL and the auth token are known.
+
+    Args:
+        buffer: Where updates go (started by the caller)
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind
+        public_url: URL Twilio was given, which signatures are computed over
+        auth_token: Twilio auth token for signature checks
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((host, port), CallbackHandler)
+    server.daemon_threads = True
+    server.buffer = buffer
+    server.public_url = public_url
+    server.validator = None
+    if public_url and auth_token:
+        from twilio.request_validator import RequestValidator
+        server.validator = RequestValidator(auth_token)
+    thread = threading.Thread(target=server.serve_forever, name='callback-server', daemon=True)
+    thread.start()
+    log.info(f"Status callbacks accepted on http://{host}:{server.server_address[1]}{CALLBACK_PATH}")
+    return server
+
+
+def synthetic_callbacks(count: int, failure_rate: float = 0.05) -> List[Dict[str, str]]:
+    """
+    Callback bodies for count fake messages: queued, sent, then delivered
+    (or undelivered with error 30003 for about failure_rate of them).
+    """
+    step = int(1 / failure_rate) if failure_rate > 0 else 0
+    bodies = []
+    for i in range(count):
+        sid = f"SMtest{i:026d}"
+        final = {'MessageStatus': 'undelivered', 'ErrorCode': '30003'} if step and i % step == 0 \
+            else {'MessageStatus': 'delivered'}
+        bodies.append({'MessageSid': sid, 'MessageStatus': 'queued'})
+        bodies.append({'MessageSid': sid, 'MessageStatus': 'sent'})
+        bodies.append({'MessageSid': sid, **final})
+    return bodies
+
+
+def post_test_callbacks(url: str, bodies: Sequence[Dict[str, str]], concurrency: int = 8,
+                        auth_token: Optional[str] = None, signed_url: Optional[str] = None) -> Tuple[int, float]:
+    """
+    Post callbacks to a receiver the way Twilio would, over keep-alive connections.
+
+    Args:
+        url: Receiver URL (e.g. http://127.0.0.1:8081/twilio/status)
+        bodies: Form fields of each callback
+        concurrency: Parallel connections
+        auth_token: Sign requests with this Twilio auth token
+        signed_url: URL to sign for (the public callback URL; defaults to url)
+
+    Returns:
+        (callbacks accepted, seconds taken)
+    """
+    parts = urlsplit(url)
+    validator = None
+    if auth_token:
+        from twilio.request_validator import RequestValidator
+        validator = RequestValidator(auth_token)
+
+    def post_all(chunk):
+        accepted = 0
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        try:
+            for body in chunk:
+                headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+                if validator is not None:
+                    headers['X-Twilio-Signature'] = validator.compute_signature(signed_url or url, body)
+                conn.request('POST', parts.path or '/', urlencode(body), headers)
+                response = conn.getresponse()
+                response.read()
+                accepted += response.status < 300
+        finally:
+            conn.close()
+        return accepted
+
+    # Keep each message's callbacks on one connection so they arrive in order
+    chunks = [[] for _ in range(max(1, concurrency))]
+    for body in bodies:
+        chunks[hash(body['MessageSid']) % len(chunks)].append(body)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        accepted = sum(pool.map(post_all, chunks))
+    return accepted, time.monotonic() - started
@@ -0,0 +1,155 @@
+"""
+Per-recipient alert digests.
+
+When several spots cross threshold in the same cycle (or within a short
+window), a subscriber following all of them should get one SMS, not one per
+spot. The coalescer groups pending alerts by recipient and builds a single
+digest message per recipient, kept within one SMS segment where possible,
+so SMS sends and LLM calls drop by the fan-in factor.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import DIGEST_WINDOW_SECONDS
+from .message_generator import generate_alert_message, get_wind_direction_abbrev
+from .sms_encoding import fits_single_segment
+from .unit_conversions import format_speed
+
+log = logging.getLogger(__name__)
+
+DIGEST_OPENER = "Wind alert!"
+DIGEST_CLOSER = "Get out there!"
+
+
+@dataclass(frozen=True, slots=True)
+class PendingAlert:
+    """One spot's alert waiting to be sent to a recipient."""
+    recipient: Optional[str]
+    spot_id: str
+    spot_name: str
+    speed: float
+    direction: float
+    queued_at: float
+    units: str = 'kmh'      # the spot's display units
+
+
+def _spot_line(alert: PendingAlert, name: str) -> str:
+    return f"{name} {get_wind_direction_abbrev(alert.direction)} {format_speed(alert.speed, alert.units)}"
+
+
+def build_digest_message(alerts: List[PendingAlert]) -> str:
+    """
+    Build one message covering every alert for a recipient.
+
+    A single alert gets the normal (AI or fallback) message. Several alerts
+    become a compact list, strongest first, shortened step by step (full
+    names, then short names, then the top spots plus "+N more") until it
+    fits one segment.
+    """
+    if len(alerts) == 1:
+        alert = alerts[0]
+        return generate_alert_message(alert.speed, alert.direction, alert.spot_name, alert.units)
+
+    ordered = sorted(alerts, key=lambda a: a.speed, reverse=True)
+
+    def render(names, count):
+        lines = [_spot_line(a, name) for a, name in zip(ordered[:count], names)]
+        extra = len(ordered) - count
+        more = f" +{extra} more" if extra else ""
+        return f"{DIGEST_OPENER} {', '.join(lines)}{more}. {DIGEST_CLOSER}"
+
+    full_names = [a.spot_name for a in ordered]
+    short_names = [name.split()[0] for name in full_names]
+
+    for names in (full_names, short_names):
+        message = render(names, len(ordered))
+        if fits_single_segment(message):
+            return message
+
+    for count in range(len(ordered) - 1, 0, -1):
+        message = render(short_names, count)
+        if fits_single_segment(message):
+            return message
+    return message
+
+
+class DigestCoalescer:
+    """
+    Collects alerts per recipient and releases them as digests.
+
+    With a window of 0, alerts are held only until the end of the cycle
+    (flush(force=True)); otherwise a recipient's digest is released once
+    its oldest pending alert has waited window_seconds.
+    """
+
+    def __init__(self, window_seconds: float = DIGEST_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._pending: Dict[Optional[str], Dict[str, PendingAlert]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(alerts) for alerts in self._pending.values())
+
+    def add(self, recipient: Optional[str], spot, speed: float, direction: float,
+            now: Optional[float] = None) -> None:
+        """Queue an alert; a newer reading for the same spot replaces the old one."""
+        now = time.time() if now is None else now
+        alerts = self._pending.setdefault(recipient, {})
+        queued_at = alerts[spot.id].queued_at if spot.id in alerts else now
+        alerts[spot.id] = PendingAlert(recipient, spot.id, spot.name, speed, direction, queued_at, spot.units)
+
+    def flush(self, now: Optional[float] = None, force: bool = False) -> List[Tuple[Optional[str], str, List[PendingAlert]]]:
+        """
+        Release due digests.
+
+        Args:
+            now: Current time (defaults to time.time())
+            force: Release everything, e.g. at the end of a cycle
+
+        Returns:
+            List of (recipient, digest message, alerts covered)
+        """
+        return [(recipient, build_digest_message(alerts), alerts)
+                for recipient, alerts in self.take_due(now, force)]
+
+    def take_due(self, now: Optional[float] = None, force: bool = False) -> List[Tuple[Optional[str], List[PendingAlert]]]:
+        """
+        Remove due recipients' alerts without building messages, for callers
+        that generate digests themselves.
+
+        Returns:
+            List of (recipient, alerts covered)
+        """
+        now = time.time() if now is None else now
+        released = []
+        for recipient in list(self._pending):
+            alerts = list(self._pending[recipient].values())
+            oldest = min(a.queued_at for a in alerts)
+            if force or now - oldest >= self.window_seconds:
+                del self._pending[recipient]
+                released.append((recipient, alerts))
+
+        if released:
+            covered = sum(len(alerts) for _, alerts in released)
+            log.info(f"Coalesced {covered} alert(s) into {len(released)} digest(s)")
+        return released
+
+    def send_due(self, send: Callable[[str, Optional[str]], Optional[str]],
+                 now: Optional[float] = None, force: bool = False) -> List[Tuple[List[PendingAlert], Optional[str]]]:
+        """
+        Flush due digests and send each with send(message, recipient).
+
+        Returns:
+            List of (alerts covered, message SID or None)
+        """
+        results = []
+        for recipient, message, alerts in self.flush(now, force):
+            try:
+                sid = send(message, recipient)
+            except Exception as e:
+                log.error(f"Failed to send digest to {recipient}: {e}")
+                sid = None
+            results.append((alerts, sid))
+        return results
@@ -0,0 +1,164 @@
+"""
+Priority dispatch queue between alert evaluation and sending.
+
+When sends are rate-limited the order matters, so alerts are queued with a
+score (how far the wind is over the spot's threshold, how squarely it
+blows into the spot's good sector, and the subscriber's tier) and sent
+highest score first. The queue tracks depth and how long each alert waited
+so a backlog shows up in the logs.
+"""
+
+import heapq
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import SMS_SEND_RATE_PER_SECOND
+
+log = logging.getLogger(__name__)
+
+# Score weights: a full threshold's worth of margin counts 1.0
+DIRECTION_WEIGHT = 0.5
+TIER_WEIGHT = 0.25
+
+
+def direction_quality(spot, direction: float) -> float:
+    """
+    How centrally a direction falls in the spot's good sectors.
+
+    Returns:
+        1.0 at the middle of a sector, falling to 0.0 at its edges and outside
+    """
+    best = 0.0
+    for start, end in spot.sectors:
+        width = (end - start) % 360 or 360
+        centre = start + width / 2
+        offset = abs((direction - centre + 180) % 360 - 180)
+        best = max(best, 1 - offset / (width / 2))
+    return best
+
+
+def alert_score(spot, wind_speed: float, wind_direction: float, tier: int = 0) -> float:
+    """Priority of an alert; higher is sent sooner."""
+    margin = max(0.0, (wind_speed - spot.threshold_kmh) / spot.threshold_kmh)
+    return margin + DIRECTION_WEIGHT * direction_quality(spot, wind_direction) + TIER_WEIGHT * tier
+
+
+@dataclass(frozen=True, slots=True)
+class QueuedAlert:
+    """A message waiting to be sent to one recipient."""
+    recipient: Optional[str]
+    message: str
+    score: float
+    spot_id: str
+    enqueued_at: float
+
+
+class DispatchQueue:
+    """Max-priority queue of outgoing alerts with depth and wait metrics."""
+
+    def __init__(self, rate_per_second: float = SMS_SEND_RATE_PER_SECOND):
+        self.rate_per_second = rate_per_second
+        self._heap: List[Tuple[float, int, QueuedAlert]] = []
+        self._seq = 0
+        self.max_depth = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.waits: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, recipient: Optional[str], message: str, score: float,
+             spot_id: str = '', now: Optional[float] = None) -> None:
+        """Queue a message; ties keep insertion order."""
+        now = time.monotonic() if now is None else now
+        item = QueuedAlert(recipient, message, score, spot_id, now)
+        heapq.heappush(self._heap, (-score, self._seq, item))
+        self._seq += 1
+        self.max_depth = max(self.max_depth, len(self._heap))
+
+    def pop(self) -> Optional[QueuedAlert]:
+        """Highest-scoring queued alert, or None if empty."""
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def drain(self, send: Callable[[str, Optional[str]], Optional[str]],
+              sleep: Callable[[float], None] = time.sleep,
+              workers: int = 1) -> List[Tuple[QueuedAlert, Optional[str]]]:
+        """
+        Send every queued alert in priority order with send(message, recipient),
+        pacing sends to rate_per_second when set.
+
+        With several workers, sends overlap but still start in priority order
+        and no faster than rate_per_second.
+
+        Returns:
+            List of (alert, message SID or None) in the order sends finished
+        """
+        interval = 1.0 / self.rate_per_second if self.rate_per_second > 0 else 0.0
+        results = []
+        lock = threading.Lock()
+        last_started = None
+
+        def take() -> Optional[QueuedAlert]:
+            nonlocal last_started
+            # Held while pacing, so sends start one interval apart in queue order
+            with lock:
+                item = self.pop()
+                if item is None:
+                    return None
+                if interval and last_started is not None:
+                    delay = interval - (time.monotonic() - last_started)
+                    if delay > 0:
+                        sleep(delay)
+                last_started = time.monotonic()
+                self.waits.append(last_started - item.enqueued_at)
+                return item
+
+        def work() -> None:
+            while True:
+                item = take()
+                if item is None:
+                    return
+                try:
+                    sid = send(item.message, item.recipient)
+                except Exception as e:
+                    log.error(f"Failed to send alert to {item.recipient}: {e}")
+                    sid = None
+                with lock:
+                    if sid:
+                        self.dispatched += 1
+                    else:
+                        self.failed += 1
+                    results.append((item, sid))
+
+        workers = min(workers, len(self))
+        if workers <= 1:
+            work()
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(work) for _ in range(workers)]:
+                    future.result()
+        return results
+
+    def _wait_percentile(self, fraction: float) -> Optional[float]:
+        waits = sorted(self.waits)
+        if not waits:
+            return None
+        return waits[min(len(waits) - 1, math.ceil(fraction * len(waits)) - 1)]
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        """Queue depth, send counts and wait times (seconds)."""
+        return {
+            'depth': len(self),
+            'max_depth': self.max_depth,
+            'dispatched': self.dispatched,
+            'failed': self.failed,
+            'wait_p50': self._wait_percentile(0.5),
+            'wait_p95': self._wait_percentile(0.95),
+            'wait_max': max(self.waits) if self.waits else None
+        }
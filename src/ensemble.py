@@ -0,0 +1,229 @@
+"""
+Multi-model ensemble consensus from Open-Meteo.
+
+One forecast request with models=a,b,c returns every model's hourly series
+side by side (wind_speed_10m_<model>, ...). Those are stacked into
+(model x hour) arrays and reduced in one pass: mean and median speed,
+circular-mean direction, speed spread and direction agreement (resultant
+length, 1 = every model points the same way). Models with no data for an
+hour are left out of that hour.
+
+When ensemble mode is on, alerts only fire if the models agree, so a single
+model's error can't trigger one on its own.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import requests
+
+from .config import (ENSEMBLE_MODELS, ENSEMBLE_HOURS, ENSEMBLE_MAX_SPREAD_KMH,
+                     ENSEMBLE_MIN_DIRECTION_AGREEMENT, RESPONSE_CACHE_TTL_SECONDS)
+from .readings import ReadingBatch, Source, WindReading
+from .response_cache import get_or_fetch
+from .source_health import load_health
+
+log = logging.getLogger(__name__)
+
+OPEN_METEO_SOURCE = 'open-meteo'
+
+
+def parse_models(value: str) -> tuple:
+    """Parse a comma-separated model list ('' -> no models)."""
+    return tuple(model.strip() for model in value.split(',') if model.strip())
+
+
+@dataclass(frozen=True)
+class Consensus:
+    """Per-hour consensus across models (arrays are indexed by hour)."""
+    times: tuple
+    models: tuple
+    mean_speed: np.ndarray
+    median_speed: np.ndarray
+    direction: np.ndarray
+    speed_spread: np.ndarray            # standard deviation across models, km/h
+    direction_agreement: np.ndarray     # mean resultant length, 0..1
+    model_count: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def readings(self) -> ReadingBatch:
+        """
+        The consensus series as readings (median speed, circular-mean direction).
+
+        Hours are timestamped from the response's times (UTC), or left
+        without a time if there are none.
+        """
+        hours = len(self.median_speed)
+        try:
+            times = np.array(self.times, dtype='datetime64[s]').astype(np.float64)
+        except ValueError:
+            times = np.empty(0)
+        if len(times) != hours:
+            times = np.full(hours, np.nan)
+        return ReadingBatch.from_arrays(times, self.median_speed, self.direction, Source.OPEN_METEO)
+
+    def reading(self, hour: int = 0) -> WindReading:
+        """The consensus for one hour as a reading."""
+        return self.readings()[hour]
+
+    def agrees(self, hour: int = 0, max_spread: float = ENSEMBLE_MAX_SPREAD_KMH,
+               min_agreement: float = ENSEMBLE_MIN_DIRECTION_AGREEMENT) -> bool:
+        """True if the models agree closely enough on speed and direction to alert."""
+        return (self.model_count[hour] >= 2
+                and self.speed_spread[hour] <= max_spread
+                and self.direction_agreement[hour] >= min_agreement)
+
+    def summary(self, hour: int = 0) -> str:
+        return (f"{int(self.model_count[hour])}/{len(self.models)} models, "
+                f"median {self.median_speed[hour]:.1f} km/h (mean {self.mean_speed[hour]:.1f}, "
+                f"spread {self.speed_spread[hour]:.1f}) @ {self.direction[hour]:.0f}° "
+                f"(agreement {self.direction_agreement[hour]:.2f})")
+
+    def to_dict(self) -> Dict:
+        """Plain dict form (for the JSON response cache)."""
+        return {
+            'times': list(self.times),
+            'models': list(self.models),
+            **{name: getattr(self, name).tolist() for name in
+               ('mean_speed', 'median_speed', 'direction', 'speed_spread',
+                'direction_agreement', 'model_count')}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Consensus':
+        return cls(
+            times=tuple(data['times']),
+            models=tuple(data['models']),
+            mean_speed=np.asarray(data['mean_speed'], dtype=np.float64),
+            median_speed=np.asarray(data['median_speed'], dtype=np.float64),
+            direction=np.asarray(data['direction'], dtype=np.float64),
+            speed_spread=np.asarray(data['speed_spread'], dtype=np.float64),
+            direction_agreement=np.asarray(data['direction_agreement'], dtype=np.float64),
+            model_count=np.asarray(data['model_count'], dtype=np.int64)
+        )
+
+
+def consensus_from_arrays(speeds: np.ndarray, directions: np.ndarray,
+                          times: Sequence = (), models: Sequence = ()) -> Consensus:
+    """
+    Reduce (model x hour) speed and direction arrays to a per-hour consensus.
+
+    NaN marks a model with no value for that hour. Hours where no model has
+    data come out as NaN with a model count of 0.
+    """
+    speeds = np.asarray(speeds, dtype=np.float64)
+    directions = np.asarray(directions, dtype=np.float64)
+    valid = ~(np.isnan(speeds) | np.isnan(directions))
+    count = valid.sum(axis=0)
+    empty = count == 0
+    n = np.where(empty, 1, count)
+
+    mean = np.where(valid, speeds, 0.0).sum(axis=0) / n
+    spread = np.sqrt((np.where(valid, speeds - mean, 0.0) ** 2).sum(axis=0) / n)
+    masked = np.where(valid, speeds, np.nan)
+    masked[:, empty] = 0.0                  # keep nanmedian quiet about empty hours
+    median = np.nanmedian(masked, axis=0)
+
+    radians = np.radians(np.where(valid, directions, 0.0))
+    sin = np.where(valid, np.sin(radians), 0.0).sum(axis=0) / n
+    cos = np.where(valid, np.cos(radians), 0.0).sum(axis=0) / n
+    direction = np.degrees(np.arctan2(sin, cos)) % 360
+    agreement = np.hypot(sin, cos)
+
+    for values in (mean, median, spread, direction, agreement):
+        values[empty] = np.nan
+
+    return Consensus(times=tuple(times), models=tuple(models), mean_speed=mean, median_speed=median,
+                     direction=direction, speed_spread=spread, direction_agreement=agreement,
+                     model_count=count)
+
+
+def parse_ensemble(data: Dict, models: Sequence[str]) -> Consensus:
+    """
+    Parse a multi-model Open-Meteo response into a consensus.
+
+    Raises:
+        ValueError: If no requested model returned wind data
+    """
+    hourly = data.get('hourly', {})
+    times = hourly.get('time', [])
+    hours = len(times)
+
+    speeds = np.full((len(models), hours), np.nan)
+    directions = np.full((len(models), hours), np.nan)
+    found = []
+    for row, model in enumerate(models):
+        speed = hourly.get(f'wind_speed_10m_{model}')
+        direction = hourly.get(f'wind_direction_10m_{model}')
+        if speed is None or direction is None:
+            continue
+        # None (no data for that hour) becomes NaN
+        speed, direction = speed[:hours], direction[:hours]
+        speeds[row, :len(speed)] = np.array(speed, dtype=np.float64)
+        directions[row, :len(direction)] = np.array(direction, dtype=np.float64)
+        found.append(model)
+
+    if not found or hours == 0:
+        raise ValueError("No model wind data in ensemble response")
+    missing = set(models) - set(found)
+    if missing:
+        log.warning(f"Ensemble models missing from response: {', '.join(sorted(missing))}")
+
+    return consensus_from_arrays(speeds, directions, times, models)
+
+
+def fetch_ensemble_uncached(coordinates: Dict, models: Sequence[str] = None,
+                            hours: int = ENSEMBLE_HOURS) -> Consensus:
+    """Fetch every model's forecast in a single Open-Meteo request."""
+    models = tuple(models or parse_models(ENSEMBLE_MODELS))
+    response = requests.get(
+        'https://api.open-meteo.com/v1/forecast',
+        params={
+            'latitude': coordinates['lat'],
+            'longitude': coordinates['lon'],
+            'hourly': 'wind_speed_10m,wind_direction_10m',
+            'models': ','.join(models),
+            'wind_speed_unit': 'kmh',
+            'forecast_hours': hours
+        },
+        timeout=10
+    )
+    response.raise_for_status()
+    return parse_ensemble(response.json(), models)
+
+
+def fetch_consensus(coordinates: Dict, models: Sequence[str] = None) -> Optional[Consensus]:
+    """
+    Fetch the ensemble consensus for a location, through the response cache.
+
+    Success and failure count towards Open-Meteo's source health, and an
+    open circuit skips the request. Returns None if the ensemble can't be
+    fetched, so callers can fall back to the single-reading sources.
+    """
+    models = tuple(models or parse_models(ENSEMBLE_MODELS))
+    health = load_health()
+    if not health.allow(OPEN_METEO_SOURCE):
+        log.info(f"Skipping ensemble ({OPEN_METEO_SOURCE} circuit open)")
+        return None
+
+    def fetch():
+        started = time.monotonic()
+        try:
+            consensus = fetch_ensemble_uncached(coordinates, models)
+            health.record_success(OPEN_METEO_SOURCE, time.monotonic() - started)
+            return consensus.to_dict()
+        except Exception as e:
+            health.record_failure(OPEN_METEO_SOURCE, time.monotonic() - started)
+            log.warning(f"Ensemble fetch failed: {e}")
+            return None
+        finally:
+            health.save()
+
+    key = f"ensemble:{coordinates['lat']:.4f},{coordinates['lon']:.4f}:{','.join(models)}"
+    cached = get_or_fetch(key, fetch, RESPONSE_CACHE_TTL_SECONDS)
+    return Consensus.from_dict(cached) if cached else None
@@ -0,0 +1,54 @@
+"""
+Model grid cell planning for spot fetches.
+
+A forecast model only has data at its grid points; Open-Meteo answers any
+coordinates with the nearest one. Spots closer together than the grid
+spacing therefore get identical readings, and fetching each of them
+separately just repeats the same upstream call and parse.
+
+With GRID_CELL_DEGREES set to the model's spacing, each spot is mapped to
+its nearest grid point (its cell) and readings are fetched once per cell,
+at the grid point itself, then fanned out to every spot in the cell. Using
+the grid point as the fetch location also means the response cache is
+shared by all spots in a cell. Typical spacings: 0.25 for ecmwf_ifs025 and
+gfs025, 0.1 for ecmwf_ifs / regional models, 0.025 for gem_hrdps_continental.
+Projected (non lat/lon) model grids are approximated by the nearest regular
+lat/lon cell.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from .config import GRID_CELL_DEGREES
+
+Cell = Tuple[int, int]
+
+
+def cell_for(coordinates: Dict, resolution: float = GRID_CELL_DEGREES) -> Optional[Cell]:
+    """
+    Grid cell (lat index, lon index) of the grid point nearest to coordinates.
+
+    Returns:
+        The cell, or None if grid planning is disabled (resolution <= 0)
+    """
+    if resolution <= 0:
+        return None
+    lon = (coordinates['lon'] + 180) % 360 - 180
+    return round(coordinates['lat'] / resolution), round(lon / resolution)
+
+
+def cell_coordinates(cell: Cell, resolution: float = GRID_CELL_DEGREES) -> Dict[str, float]:
+    """Coordinates of a cell's grid point."""
+    return {'lat': round(cell[0] * resolution, 6), 'lon': round(cell[1] * resolution, 6)}
+
+
+def fetch_coordinates(coordinates: Dict, resolution: float = GRID_CELL_DEGREES) -> Dict:
+    """Where to fetch for a location: its grid point, or itself when planning is off."""
+    cell = cell_for(coordinates, resolution)
+    return coordinates if cell is None else cell_coordinates(cell, resolution)
+
+
+def fetch_key(spot, resolution: float = GRID_CELL_DEGREES) -> tuple:
+    """Key under which spots share one fetch: their cell, else their rounded coordinates."""
+    cell = cell_for({'lat': spot.lat, 'lon': spot.lon}, resolution)
+    return ('cell', *cell) if cell is not None else (round(spot.lat, 4), round(spot.lon, 4))
+
@@ -0,0 +1,225 @@
+"""
+Observation and alert history.
+
+Every check appends one JSON line to a history journal: the reading, the
+alert decision, the message sent and how long each stage took. The export
+command streams that journal into columnar files partitioned by day
+(date=YYYY-MM-DD/history.arrow and .parquet), one bounded record batch at a
+time, so memory stays flat however long the history grows. Arrow IPC files
+can be memory-mapped for zero-copy analysis.
+
+pyarrow is only needed for exporting, so it is imported on demand.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Sequence
+
+from .config import HISTORY_PATH, HISTORY_EXPORT_DIR, HISTORY_BATCH_ROWS
+
+log = logging.getLogger(__name__)
+
+FORMATS = ('arrow', 'parquet')
+STAGES = ('fetch', 'evaluate', 'message', 'send', 'total')
+
+
+def require_pyarrow():
+    """Import pyarrow, with a clear error if it isn't installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required for columnar history (pip install pyarrow)") from e
+    return pa, ipc, pq
+
+
+def history_schema():
+    """Arrow schema of exported history rows."""
+    pa, _, _ = require_pyarrow()
+    return pa.schema(
+        [
+            ('checked_at', pa.timestamp('s')),
+            ('spot', pa.string()),
+            ('speed_kmh', pa.float32()),
+            ('direction_deg', pa.float32()),
+            ('source', pa.string()),
+            ('decision', pa.string()),
+            ('message', pa.string()),
+        ]
+        + [(f'{stage}_s', pa.float32()) for stage in STAGES]
+    )
+
+
+def record_cycle(status: Dict, path: str = HISTORY_PATH) -> None:
+    """
+    Append one check's outcome to the history journal.
+
+    Args:
+        status: Cycle status (checked_at, spot, speed_kmh, direction_deg,
+            source, decision, message, timings)
+        path: Journal file
+    """
+    row = {name: status.get(name) for name in
+           ('checked_at', 'spot', 'speed_kmh', 'direction_deg', 'source', 'decision', 'message')}
+    timings = status.get('timings', {})
+    row.update({f'{stage}_s': timings.get(stage) for stage in STAGES})
+
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(row) + '\n')
+    except OSError as e:
+        log.error(f"Error writing history: {e}")
+
+
+class PartitionedWriter:
+    """
+    Writes record batches into partitioned Arrow IPC and/or Parquet files
+    (out_dir/<partition>=<key>/<basename>.arrow, e.g. date=2025-01-18).
+
+    Files are opened lazily per key and kept open until close_partition()
+    or close(), so each batch is written straight through without holding
+    earlier ones. A key that is written again after being closed gets a new
+    part file (basename-1, basename-2, ...).
+    """
+
+    def __init__(self, out_dir: str, schema, basename: str, formats: Sequence[str] = FORMATS,
+                 partition: str = 'date'):
+        self.pa, self.ipc, self.pq = require_pyarrow()
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+        self.out_dir = out_dir
+        self.schema = schema
+        self.basename = basename
+        self.formats = tuple(formats)
+        self.partition = partition
+        self.rows = 0
+        self._writers: Dict[str, list] = {}
+        self._parts: Dict[str, int] = {}
+
+    def _open(self, key: str) -> list:
+        partition = os.path.join(self.out_dir, f'{self.partition}={key}')
+        os.makedirs(partition, exist_ok=True)
+        part = self._parts.get(key, 0)
+        self._parts[key] = part + 1
+        name = self.basename if part == 0 else f'{self.basename}-{part}'
+
+        writers = []
+        for fmt in self.formats:
+            path = os.path.join(partition, f'{name}.{fmt}')
+            if fmt == 'arrow':
+                writers.append(self.ipc.new_file(path, self.schema))
+            else:
+                writers.append(self.pq.ParquetWriter(path, self.schema, compression='zstd'))
+        return writers
+
+    def write(self, key: str, columns: Dict[str, Sequence]) -> None:
+        """Write one batch of rows (column name -> values) to a partition's files."""
+        batch = self.pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        if not batch.num_rows:
+            return
+        if key not in self._writers:
+            self._writers[key] = self._open(key)
+        for writer in self._writers[key]:
+            if isinstance(writer, self.pq.ParquetWriter):
+                writer.write_batch(batch)
+            else:
+                writer.write(batch)
+        self.rows += batch.num_rows
+
+    @property
+    def partitions(self) -> Sequence[str]:
+        return sorted(self._parts)
+
+    def close_partition(self, key: str) -> None:
+        """Finish a partition's files."""
+        for writer in self._writers.pop(key, ()):
+            writer.close()
+
+    def close(self) -> None:
+        for key in list(self._writers):
+            self.close_partition(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_journal(path: str) -> Iterable[Dict]:
+    """Journal rows, skipping lines that can't be parsed."""
+    with open(path, 'r') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                row['checked_at'] = datetime.fromisoformat(row['checked_at'])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                log.warning(f"Skipping history line {line_no}: {e}")
+                continue
+            yield row
+
+
+def export_history(journal_path: str = HISTORY_PATH, out_dir: str = HISTORY_EXPORT_DIR,
+                   formats: Sequence[str] = FORMATS, batch_rows: int = HISTORY_BATCH_ROWS) -> int:
+    """
+    Export the history journal to day-partitioned columnar files.
+
+    Args:
+        journal_path: History journal to read
+        out_dir: Directory for date=YYYY-MM-DD partitions (files are replaced;
+            a day that reappears out of order gets an extra part file)
+        formats: Any of 'arrow' and 'parquet'
+        batch_rows: Rows buffered before a batch is written
+
+    Returns:
+        Number of rows exported
+
+    Raises:
+        ImportError: If pyarrow isn't installed
+        FileNotFoundError: If the journal doesn't exist
+    """
+    schema = history_schema()
+    names = schema.names
+    day, buffer = None, None
+
+    # The journal is in time order, so each day is finished (written and
+    # closed) as soon as the next one starts: one partition open at a time
+    with PartitionedWriter(out_dir, schema, 'history', formats) as writer:
+        for row in _iter_journal(journal_path):
+            row_day = row['checked_at'].date().isoformat()
+            if row_day != day:
+                if day is not None:
+                    writer.write(day, buffer)
+                    writer.close_partition(day)
+                day, buffer = row_day, {name: [] for name in names}
+            for name in names:
+                buffer[name].append(row.get(name))
+            if len(buffer['checked_at']) >= batch_rows:
+                writer.write(day, buffer)
+                buffer = {name: [] for name in names}
+
+        if day is not None:
+            writer.write(day, buffer)
+
+    log.info(f"Exported {writer.rows} history row(s) across {len(writer.partitions)} day(s) to {out_dir}")
+    return writer.rows
+
+
+def open_history_day(out_dir: str, day: str, basename: str = 'history'):
+    """
+    Memory-map one day's Arrow file as a table (no copy into memory).
+
+    Returns:
+        pyarrow.Table backed by the mapped file
+    """
+    pa, ipc, _ = require_pyarrow()
+    source = pa.memory_map(os.path.join(out_dir, f'date={day}', f'{basename}.arrow'), 'r')
+    return ipc.open_file(source).read_all()
+
@@ -0,0 +1,301 @@
+"""
+Bulk import of historical wind observations.
+
+Streams large local archive files into the columnar history store, in a
+readings/ dataset next to the exported alert history. Hourly archives hold
+only 24 rows a day, so imports are partitioned by month
+(readings/month=YYYY-MM/readings.arrow and .parquet) to keep files compact:
+
+- ECCC climate hourly CSV ("Date/Time (LST)", "Wind Dir (10s deg)",
+  "Wind Spd (km/h)"), read block by block with pyarrow's streaming CSV reader
+- Open-Meteo archive JSON (hourly time, wind_speed_10m and
+  wind_direction_10m arrays), memory-mapped and walked array by array in
+  chunks so the document is never parsed as a whole
+
+Speeds are normalised to km/h through unit_conversions and compass points
+to degrees. Each chunk is converted with NumPy into a ReadingBatch, and a
+month is written as a single batch once its rows are complete, so memory stays flat on multi-GB
+inputs. Archives are expected in time order; a month that shows up again
+later goes to an extra part file rather than overwriting the first.
+"""
+
+import csv
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .config import DEFAULT_SPOT_ID, HISTORY_EXPORT_DIR
+from .history import FORMATS, PartitionedWriter, require_pyarrow
+from .readings import ReadingBatch, Source
+from .unit_conversions import COMPASS_DEGREES, convert_wind_speed, parse_unit_label
+
+log = logging.getLogger(__name__)
+
+READINGS_DIR = 'readings'
+
+# Bytes per CSV block and rows per JSON chunk
+CSV_BLOCK_BYTES = 8 << 20
+JSON_CHUNK_ROWS = 65536
+
+ECCC_TIME_COLUMN = 'Date/Time (LST)'
+ECCC_DIR_COLUMN = 'Wind Dir (10s deg)'
+ECCC_COMPASS_COLUMN = 'Wind Dir'
+ECCC_SPEED_COLUMN = re.compile(r'^Wind Spd \((.+)\)$')
+
+OPENMETEO_SPEED_KEY = 'wind_speed_10m'
+OPENMETEO_DIR_KEY = 'wind_direction_10m'
+
+def readings_schema():
+    """Arrow schema of imported reading rows."""
+    pa, _, _ = require_pyarrow()
+    return pa.schema([
+        ('observed_at', pa.timestamp('s')),
+        ('spot', pa.string()),
+        ('speed_kmh', pa.float32()),
+        ('direction_deg', pa.float32()),
+        ('source', pa.string()),
+    ])
+
+
+def _read_csv_header(path: str) -> List[str]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def iter_eccc_csv(path: str, block_size: int = CSV_BLOCK_BYTES) -> Iterator[ReadingBatch]:
+    """
+    Stream an ECCC climate hourly CSV in blocks.
+
+    Rows missing a time, speed or direction (including unknown compass
+    points) are skipped.
+
+    Raises:
+        ValueError: If the file doesn't have the ECCC wind columns
+    """
+    pa, _, _ = require_pyarrow()
+    import pyarrow.compute as pc
+    import pyarrow.csv as pcsv
+
+    header = _read_csv_header(path)
+    speed_column = next((c for c in header if ECCC_SPEED_COLUMN.match(c)), None)
+    if ECCC_DIR_COLUMN in header:
+        dir_column, dir_type = ECCC_DIR_COLUMN, pa.float64()
+    elif ECCC_COMPASS_COLUMN in header:
+        dir_column, dir_type = ECCC_COMPASS_COLUMN, pa.string()
+    else:
+        dir_column = None
+    if ECCC_TIME_COLUMN not in header or speed_column is None or dir_column is None:
+        raise ValueError(f"{path} is missing ECCC hourly wind columns")
+
+    unit = parse_unit_label(ECCC_SPEED_COLUMN.match(speed_column).group(1))
+    factor = convert_wind_speed(1.0, unit, 'kmh')
+    compass_names = pa.array(list(COMPASS_DEGREES))
+    compass_degrees = np.array(list(COMPASS_DEGREES.values()))
+
+    reader = pcsv.open_csv(
+        path,
+        read_options=pcsv.ReadOptions(block_size=block_size),
+        convert_options=pcsv.ConvertOptions(
+            include_columns=[ECCC_TIME_COLUMN, speed_column, dir_column],
+            column_types={ECCC_TIME_COLUMN: pa.timestamp('s'), speed_column: pa.float64(), dir_column: dir_type},
+            timestamp_parsers=[pcsv.ISO8601, '%Y-%m-%d %H:%M']
+        )
+    )
+
+    for batch in reader:
+        times = batch.column(ECCC_TIME_COLUMN)
+        speeds = batch.column(speed_column)
+        dirs = batch.column(dir_column)
+        if dir_column == ECCC_COMPASS_COLUMN:
+            dirs = pc.index_in(pc.utf8_upper(pc.utf8_trim_whitespace(dirs)), value_set=compass_names)
+
+        valid = pc.and_(pc.is_valid(times), pc.and_(pc.is_valid(speeds), pc.is_valid(dirs)))
+        times = pc.filter(times, valid).cast(pa.int64()).to_numpy()
+        speeds = pc.filter(speeds, valid).to_numpy() * factor
+        dirs = pc.filter(dirs, valid).to_numpy()
+        if dir_column == ECCC_COMPASS_COLUMN:
+            dirs = compass_degrees[dirs]
+        else:
+            dirs = (dirs * 10) % 360
+        yield ReadingBatch.from_arrays(times, speeds, dirs, Source.ECCC)
+
+
+class _ArrayCursor:
+    """Reads items of a JSON array of scalars from a memory map, n at a time."""
+
+    def __init__(self, mm: mmap.mmap, start: int, end: int):
+        self.mm = mm
+        self.pos = start
+        self.end = end
+        self._rest: List[bytes] = []
+
+    def take(self, n: int) -> List[bytes]:
+        items = self._rest
+        while len(items) < n and self.pos < self.end:
+            stop = min(self.pos + max(1 << 16, n * 12), self.end)
+            if stop < self.end:
+                comma = self.mm.rfind(b',', self.pos, stop)
+                if comma < 0:
+                    comma = self.mm.find(b',', stop, self.end)
+                stop = self.end if comma < 0 else comma + 1
+            block = self.mm[self.pos:stop].rstrip(b', \t\r\n')
+            if block.strip():
+                items.extend(block.split(b','))
+            self.pos = stop
+        self._rest = items[n:]
+        return items[:n]
+
+
+def _json_array_span(mm: mmap.mmap, key: str, start: int, end: int) -> Tuple[int, int]:
+    """Byte range of the items of "key": [...] between start and end."""
+    match = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*\[').search(mm, start, end)
+    if match is None:
+        raise ValueError(f"No '{key}' array in hourly data")
+    close = mm.find(b']', match.end(), end)
+    if close < 0:
+        raise ValueError(f"Unterminated '{key}' array")
+    return match.end(), close
+
+
+def _parse_numbers(items: List[bytes]) -> np.ndarray:
+    return np.array(b','.join(items).replace(b'null', b'nan').split(b','), dtype=np.float64)
+
+
+def _parse_times(items: List[bytes]) -> np.ndarray:
+    first = items[0].strip()
+    if first.startswith(b'"'):
+        return np.array([item.strip().strip(b'"').decode() for item in items],
+                        dtype='datetime64[s]').astype(np.int64)
+    return np.array(items, dtype=np.float64).astype(np.int64)  # timeformat=unixtime
+
+
+def iter_openmeteo_archive(path: str, chunk_rows: int = JSON_CHUNK_ROWS) -> Iterator[ReadingBatch]:
+    """
+    Stream an Open-Meteo archive JSON file in chunks of rows.
+
+    Times may be ISO strings or unix seconds. Rows with a null speed or
+    direction are skipped.
+
+    Raises:
+        ValueError: If the file doesn't have hourly wind arrays
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        hourly = re.compile(rb'"hourly"\s*:\s*\{').search(mm)
+        if hourly is None:
+            raise ValueError(f"{path} has no hourly data")
+        hourly_end = mm.find(b'}', hourly.end())
+        if hourly_end < 0:
+            raise ValueError(f"{path} has unterminated hourly data")
+
+        units_match = re.compile(rb'"hourly_units"\s*:\s*(\{[^}]*\})').search(mm)
+        units = json.loads(units_match.group(1)) if units_match else {}
+        factor = convert_wind_speed(1.0, parse_unit_label(units.get(OPENMETEO_SPEED_KEY, 'km/h')), 'kmh')
+
+        cursors = [_ArrayCursor(mm, *_json_array_span(mm, key, hourly.end(), hourly_end))
+                   for key in ('time', OPENMETEO_SPEED_KEY, OPENMETEO_DIR_KEY)]
+        times_cursor, speeds_cursor, dirs_cursor = cursors
+
+        while True:
+            time_items = times_cursor.take(chunk_rows)
+            if not time_items:
+                break
+            n = len(time_items)
+            speed_items, dir_items = speeds_cursor.take(n), dirs_cursor.take(n)
+            if len(speed_items) != n or len(dir_items) != n:
+                raise ValueError(f"{path} has hourly arrays of different lengths")
+
+            times = _parse_times(time_items)
+            speeds = _parse_numbers(speed_items) * factor
+            dirs = _parse_numbers(dir_items)
+            valid = ~(np.isnan(speeds) | np.isnan(dirs))
+            yield ReadingBatch.from_arrays(times[valid], speeds[valid], dirs[valid] % 360, Source.OPEN_METEO)
+
+
+def _write_chunks(chunks: Iterator[ReadingBatch], writer: PartitionedWriter, spot_id: str, source: str) -> int:
+    """Write chunks into month partitions, one batch per completed month."""
+    pa = writer.pa
+    pending: Dict[str, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+    rows = 0
+
+    def flush(month):
+        parts = pending.pop(month)
+        times, speeds, dirs = (np.concatenate(column) for column in zip(*parts))
+        writer.write(month, {
+            'observed_at': pa.array(times, type=pa.timestamp('s')),
+            'spot': pa.repeat(pa.scalar(spot_id), len(times)),
+            'speed_kmh': pa.array(speeds, type=pa.float32()),
+            'direction_deg': pa.array(dirs, type=pa.float32()),
+            'source': pa.repeat(pa.scalar(source), len(times)),
+        })
+        writer.close_partition(month)
+
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        rows += len(chunk)
+        times, speeds, dirs = chunk.times.astype(np.int64), chunk.speeds, chunk.directions
+        months = times.astype('datetime64[s]').astype('datetime64[M]')
+        bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+        for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(times)]))):
+            month = str(months[start])
+            if month not in pending:
+                # Input is in time order, so any other pending month is complete
+                for done in list(pending):
+                    flush(done)
+                pending[month] = []
+            pending[month].append((times[start:end], speeds[start:end], dirs[start:end]))
+
+    for month in list(pending):
+        flush(month)
+    return rows
+
+
+def detect_format(path: str) -> str:
+    """'eccc' for CSV files, 'open-meteo' for JSON files."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'eccc'
+    if ext == '.json':
+        return 'open-meteo'
+    raise ValueError(f"Can't tell the archive format of {path} (expected .csv or .json)")
+
+
+def import_history(paths: Sequence[str], spot_id: str = DEFAULT_SPOT_ID,
+                   out_dir: str = HISTORY_EXPORT_DIR, formats: Sequence[str] = FORMATS) -> int:
+    """
+    Import archive files into the columnar history store.
+
+    Args:
+        paths: ECCC hourly CSV and/or Open-Meteo archive JSON files
+        spot_id: Spot the observations are recorded against
+        out_dir: History store directory (imports go to its readings/ dataset)
+        formats: Any of 'arrow' and 'parquet'
+
+    Returns:
+        Number of rows imported
+
+    Raises:
+        ImportError: If pyarrow isn't installed
+        ValueError: If a file isn't a recognised archive
+    """
+    total = 0
+    readings_dir = os.path.join(out_dir, READINGS_DIR)
+    with PartitionedWriter(readings_dir, readings_schema(), 'readings', formats, partition='month') as writer:
+        for path in paths:
+            source = detect_format(path)
+            started = time.monotonic()
+            chunks = iter_eccc_csv(path) if source == 'eccc' else iter_openmeteo_archive(path)
+            rows = _write_chunks(chunks, writer, spot_id, source)
+            elapsed = time.monotonic() - started
+            log.info(f"Imported {rows} row(s) from {path} in {elapsed:.1f}s "
+                     f"({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+            total += rows
+
+    log.info(f"Imported {total} row(s) for {spot_id} across {len(writer.partitions)} month(s) into {readings_dir}")
+    return total
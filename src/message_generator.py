@@ -7,14 +7,23 @@ Falls back to standard messages if OpenAI API is unavailable.
 """
 
 import os
+import re
 import logging
-from typing import Optional
-from pathlib import Path
-from openai import OpenAI
-from openai import OpenAIError
+from typing import Iterable, Optional
+from openai import OpenAIError, APIConnectionError
+from .clients import get_openai_client, get_system_prompt, record_client_error, reset_client
+from .sms_encoding import optimize_for_sms, fits_single_segment, segment_info
+from .message_synth import synthesize_message, DEFAULT_SPOT_NAME
+from .unit_conversions import convert_wind_speed, format_speed
+from .config import MESSAGE_MODE
 
 log = logging.getLogger(__name__)
 
+SMS_CHAR_LIMIT = 160
+
+# A sentence is complete once its closing punctuation is followed by whitespace
+SENTENCE_END = re.compile(r'[.!?]+(?=\s)')
+
 def get_wind_direction_abbrev(degrees: float) -> str:
     """Convert degrees to short compass direction."""
     degrees = degrees % 360
@@ -53,13 +62,71 @@ def get_wind_direction_abbrev(degrees: float) -> str:
     else:
         return "?"
 
-def generate_surfer_message(wind_speed: float, wind_direction: float) -> Optional[str]:
+def truncate_to_sms(message: str) -> str:
+    """Cut a message to the SMS limit, preferring the last complete sentence."""
+    if len(message) <= SMS_CHAR_LIMIT:
+        return message
+
+    # Try to cut at last complete sentence
+    sentences = message.split('!')
+    if len(sentences) > 1:
+        message = '!'.join(sentences[:-1]) + '!'
+        if len(message) <= SMS_CHAR_LIMIT:
+            return message
+    return message[:SMS_CHAR_LIMIT - 3] + "..."
+
+def collect_streamed_message(stream: Iterable, direction_abbrev: str, speed_text: str) -> str:
+    """
+    Consume a streamed chat completion, stopping as soon as it is usable.
+
+    The stream is cut off once the text contains complete sentences that fit
+    one SMS segment (after encoding optimization) and mention the direction and speed, or once it has run
+    past the limit, so we don't wait for (or pay for) tokens we'd discard.
+
+    Args:
+        stream: Iterable of chat completion chunks
+        direction_abbrev: Direction that must appear (e.g. "NW")
+        speed_text: Speed that must appear (e.g. "38")
+
+    Returns:
+        The message text, truncated to the SMS limit
+    """
+    text = ''
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text += chunk.choices[0].delta.content or ''
+
+            # Longest run of complete sentences that still fits in one SMS segment
+            for end in reversed([m.end() for m in SENTENCE_END.finditer(text)]):
+                candidate = optimize_for_sms(text[:end].strip())
+                if fits_single_segment(candidate):
+                    if direction_abbrev in candidate and speed_text in candidate:
+                        log.debug(f"Stopping stream early after {len(text)} chars")
+                        return candidate
+                    break
+
+            if len(text) > SMS_CHAR_LIMIT:
+                log.debug("Stream passed SMS limit, stopping")
+                break
+    finally:
+        close = getattr(stream, 'close', None)
+        if close:
+            close()
+
+    return truncate_to_sms(optimize_for_sms(text.strip()))
+
+def generate_surfer_message(wind_speed: float, wind_direction: float,
+                            spot_name: str = DEFAULT_SPOT_NAME, units: str = 'kmh') -> Optional[str]:
     """
     Generate a funny Australian surfer dude message using OpenAI ChatGPT.
 
     Args:
         wind_speed: Wind speed in km/h
         wind_direction: Wind direction in degrees
+        spot_name: Name of the spot the alert is for
+        units: Units to show the speed in ('kmh', 'ms' or 'knots')
 
     Returns:
         Generated message string or None if failed
@@ -76,28 +143,23 @@ def generate_surfer_message(wind_speed: float, wind_direction: float) -> Optiona
         return None
 
     try:
-        client = OpenAI(api_key=api_key)
-
-        # Load system prompt from file
-        prompt_file = Path(__file__).parent / "openai_system_prompt.md"
-        if prompt_file.exists():
-            system_prompt = prompt_file.read_text()
-        else:
-            log.warning("System prompt file not found, using default")
-            system_prompt = """You are an Australian surfer. Create a 1-2 sentence SMS alert about wind conditions.
-MUST include wind direction (N/NW/W etc) and speed in km/h. Keep under 160 chars. Be funny and urgent."""
+        # Shared client and cached system prompt (created on first use)
+        client = get_openai_client(api_key)
+        system_prompt = get_system_prompt()
 
         direction_abbrev = get_wind_direction_abbrev(wind_direction)
+        speed_text = format_speed(wind_speed, units)
+        speed_value = f"{convert_wind_speed(wind_speed, 'kmh', units):.0f}"
 
-        user_message = f"""Wind conditions at Wreck Beach:
-- Wind: {direction_abbrev} at {wind_speed:.0f}km/h
+        user_message = f"""Wind conditions at {spot_name}:
+- Wind: {direction_abbrev} at {speed_text}
 - Direction degrees: {wind_direction:.0f}°
 
-Create a 1-2 sentence SMS that MUST include "{direction_abbrev}" and "{wind_speed:.0f}km/h". Make it funny and urgent!"""
+Create a 1-2 sentence SMS that MUST include "{direction_abbrev}" and "{speed_text}" and name {spot_name}. Make it funny and urgent!"""
 
         log.info(f"Calling OpenAI API with gpt-4o-mini model...")
 
-        response = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -106,74 +168,84 @@ Create a 1-2 sentence SMS that MUST include "{direction_abbrev}" and "{wind_spee
             max_tokens=100,
             temperature=0.9,  # Higher temperature for more creative/funny responses
             presence_penalty=0.3,  # Encourage variety
-            frequency_penalty=0.3
+            frequency_penalty=0.3,
+            stream=True
         )
 
-        message = response.choices[0].message.content.strip()
-
-        # Ensure message fits SMS limit (160 chars)
-        if len(message) > 160:
-            # Try to cut at last complete sentence
-            sentences = message.split('!')
-            if len(sentences) > 1:
-                message = '!'.join(sentences[:-1]) + '!'
-            else:
-                message = message[:157] + "..."
+        message = collect_streamed_message(stream, direction_abbrev, speed_value)
 
         # Verify message contains required info (direction and speed)
-        if direction_abbrev not in message or f"{wind_speed:.0f}" not in message:
+        if direction_abbrev not in message or speed_value not in message:
             log.warning("AI message missing required wind data, using fallback")
             return None
 
         log.info(f"Generated AI message: {message}")
         return message
 
+    except APIConnectionError as e:
+        # Drop pooled connections that may have gone stale
+        log.error(f"OpenAI connection error: {e}. Using fallback message.")
+        record_client_error('openai')
+        reset_client('openai')
+        return None
     except OpenAIError as e:
         log.error(f"OpenAI API error: {e}. Using fallback message.")
+        record_client_error('openai')
         return None
     except Exception as e:
         log.error(f"Unexpected error generating AI message: {e}. Using fallback.")
         return None
 
-def create_fallback_message(wind_speed: float, wind_direction: float) -> str:
+def create_fallback_message(wind_speed: float, wind_direction: float,
+                            spot_name: str = DEFAULT_SPOT_NAME, units: str = 'kmh') -> str:
     """
     Create a fallback message when OpenAI is unavailable.
     Still surfer-themed but ensures wind stats are included.
 
+    Uses the local phrase synthesizer, so repeated fallbacks vary.
+
     Args:
         wind_speed: Wind speed in km/h
         wind_direction: Wind direction in degrees
+        spot_name: Name of the spot the alert is for
+        units: Units to show the speed in ('kmh', 'ms' or 'knots')
 
     Returns:
         Fallback message string (always includes direction and speed)
     """
-    direction = get_wind_direction_abbrev(wind_direction)
+    return synthesize_message(wind_speed, get_wind_direction_abbrev(wind_direction),
+                              spot_name=spot_name, units=units)
 
-    # Create surfer-themed fallback messages with guaranteed wind stats
-    if wind_speed >= 35:
-        return f"🌊 {direction} wind {wind_speed:.0f}km/h absolutely FIRING at Wreck Beach! Drop everything and get here NOW legend!"
-    elif wind_speed >= 30:
-        return f"🏄 {direction} {wind_speed:.0f}km/h pumping at Wreck Beach! Epic conditions mate, time to shred!"
-    else:
-        return f"🌊 {direction} wind {wind_speed:.0f}km/h at Wreck Beach! Solid sesh brewing, get on it!"
-
-def generate_alert_message(wind_speed: float, wind_direction: float) -> str:
+def generate_alert_message(wind_speed: float, wind_direction: float,
+                           spot_name: str = DEFAULT_SPOT_NAME, units: str = 'kmh') -> str:
     """
     Main function to generate alert message with AI or fallback.
 
     Args:
         wind_speed: Wind speed in km/h
         wind_direction: Wind direction in degrees
+        spot_name: Name of the spot the alert is for
+        units: Units to show the speed in (the spot's units)
 
     Returns:
         Alert message string (AI-generated or fallback)
     """
-    # Try AI generation first
-    ai_message = generate_surfer_message(wind_speed, wind_direction)
-
-    if ai_message:
-        return ai_message
-
-    # Use fallback if AI fails
-    log.info("Using fallback message (AI unavailable)")
-    return create_fallback_message(wind_speed, wind_direction)
\ No newline at end of file
+    if MESSAGE_MODE == 'local':
+        # Local synthesizer as the primary mode, no network call
+        message = create_fallback_message(wind_speed, wind_direction, spot_name, units)
+    else:
+        # Try AI generation first
+        message = generate_surfer_message(wind_speed, wind_direction, spot_name, units)
+
+        if not message:
+            # Use fallback if AI fails
+            log.info("Using fallback message (AI unavailable)")
+            message = create_fallback_message(wind_speed, wind_direction, spot_name, units)
+
+    # Swap or strip non-GSM characters (emoji etc.) so the alert fits fewer segments
+    optimized = optimize_for_sms(message)
+    before, after = segment_info(message), segment_info(optimized)
+    if optimized != message:
+        log.info(f"Optimized message encoding: {before.encoding} {before.segments} segment(s) "
+                 f"-> {after.encoding} {after.segments} segment(s)")
+    return optimized
\ No newline at end of file
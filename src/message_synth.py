@@ -0,0 +1,151 @@
+"""
+Local surfer message synthesizer.
+
+Builds Australian surfer dude alerts from phrase tables without any network
+call. Templates are compiled once at import into pre-split parts with their
+fixed lengths, so generating a message is a few random choices and a join.
+Every message includes the direction abbreviation, speed and spot name, and
+the phrases only use GSM-7 characters so it fits a single SMS segment.
+"""
+
+import logging
+import random
+from typing import List, Optional, Tuple
+
+from .sms_encoding import is_gsm7, GSM7_SINGLE
+from .unit_conversions import format_speed
+
+log = logging.getLogger(__name__)
+
+OPENERS = (
+    "Crikey!", "Oi legend!", "Strewth!", "Mate!", "Righto!", "Fair dinkum!",
+    "Stone the crows!", "Wake up ya galah!", "Hold onto ya boardies!", "Heads up crew!",
+    "No worries, big news!", "Grommets assemble!", "Drop the snag!", "Bloody oath!",
+    "Oi oi oi!", "Cowabunga cobber!",
+)
+
+# Body templates per speed band; {dir}, {speed} (with units) and {spot} are
+# filled in at synthesis
+BODIES = {
+    'solid': (
+        "{dir} {speed} building at {spot}.",
+        "{spot} has a {dir} {speed} breeze kicking in.",
+        "{dir} wind {speed} rolling into {spot}.",
+        "Solid {dir} {speed} on the go at {spot}.",
+        "{speed} of {dir} goodness hitting {spot}.",
+        "{spot} getting a tidy {dir} {speed}.",
+    ),
+    'pumping': (
+        "{dir} {speed} pumping at {spot}!",
+        "{spot} is cranking with {dir} {speed}!",
+        "{dir} wind {speed} going off at {spot}!",
+        "Epic {dir} {speed} lighting up {spot}!",
+        "{speed} {dir} and {spot} is absolutely going!",
+        "{spot} is pumping, {dir} {speed}!",
+    ),
+    'firing': (
+        "{dir} {speed} absolutely FIRING at {spot}!",
+        "{spot} has gone OFF, {dir} {speed}!",
+        "{dir} wind {speed} is nuking {spot}!",
+        "Total send, {dir} {speed} howling at {spot}!",
+        "{speed} of {dir} fury smashing {spot}!",
+        "{spot} is FIRING with {dir} {speed}!",
+    ),
+}
+
+DEFAULT_SPOT_NAME = "Wreck Beach"
+
+CLOSERS = (
+    "Get on it!", "Time to shred!", "Drop everything!", "See ya out there!",
+    "Chuck a sickie!", "Wax up and paddle out!", "Don't miss it ya drongo!",
+    "Grab ya board mate!", "Go go go!", "She'll be sweet, get down there!",
+    "Leave the brekkie, go!", "No time for a cuppa!", "Send it legend!",
+    "Boardies on, out the door!", "Absolute ripper, move!",
+)
+
+# Placeholder lengths assumed when checking a template fits (e.g. "NNW",
+# "120km/h"); the spot name varies per spot so it is added at synthesis
+MAX_DIR_LEN = 3
+MAX_SPEED_LEN = 7
+
+
+def speed_band(wind_speed: float) -> str:
+    """Pick the phrase band for a wind speed (same cut-offs as the old fallbacks)."""
+    if wind_speed >= 35:
+        return 'firing'
+    if wind_speed >= 30:
+        return 'pumping'
+    return 'solid'
+
+
+def _compile_body(template: str) -> Tuple[Tuple[str, ...], int]:
+    """Split a body template into literal parts with fields in between."""
+    parts = []
+    rest = template
+    while '{' in rest:
+        literal, _, after = rest.partition('{')
+        field, _, rest = after.partition('}')
+        parts.extend([literal, '{' + field + '}'])
+    parts.append(rest)
+    fixed_len = sum(len(p) for p in parts if not p.startswith('{'))
+    return tuple(parts), fixed_len
+
+
+def _compile_tables():
+    """Compile and validate the phrase tables once at import."""
+    for phrase in OPENERS + CLOSERS + tuple(t for band in BODIES.values() for t in band):
+        if not is_gsm7(phrase):
+            raise ValueError(f"Phrase is not GSM-7: {phrase!r}")
+
+    bodies = {}
+    for band, templates in BODIES.items():
+        compiled = []
+        for template in templates:
+            parts, fixed_len = _compile_body(template)
+            if '{dir}' not in parts or '{speed}' not in parts or '{spot}' not in parts:
+                raise ValueError(f"Template must include direction, speed and spot: {template!r}")
+            compiled.append((parts, fixed_len + MAX_DIR_LEN + MAX_SPEED_LEN))
+        bodies[band] = tuple(compiled)
+    return bodies
+
+
+_COMPILED_BODIES = _compile_tables()
+_rng = random.Random()
+
+
+def variety() -> int:
+    """Number of distinct messages the tables can produce per speed band."""
+    return min(len(b) for b in _COMPILED_BODIES.values()) * len(OPENERS) * len(CLOSERS)
+
+
+def synthesize_message(wind_speed: float, direction_abbrev: str,
+                       rng: Optional[random.Random] = None,
+                       spot_name: str = DEFAULT_SPOT_NAME, units: str = 'kmh') -> str:
+    """
+    Generate a surfer-style alert locally.
+
+    Args:
+        wind_speed: Wind speed in km/h
+        direction_abbrev: Compass abbreviation (e.g. "NW")
+        rng: Optional random generator (for reproducible output)
+        spot_name: Name of the spot the alert is for
+        units: Units to show the speed in ('kmh', 'ms' or 'knots')
+
+    Returns:
+        Message containing the direction, speed and spot name, within one
+        GSM-7 segment
+    """
+    rng = rng or _rng
+    parts, body_len = rng.choice(_COMPILED_BODIES[speed_band(wind_speed)])
+    opener = rng.choice(OPENERS)
+    closer = rng.choice(CLOSERS)
+
+    fields = {'{dir}': direction_abbrev, '{speed}': format_speed(wind_speed, units), '{spot}': spot_name}
+    body = ''.join(fields.get(p, p) for p in parts)
+    body_len += len(spot_name)
+
+    pieces: List[str] = [opener, body, closer]
+    # Drop optional pieces if an unusually long combination would overflow
+    if len(opener) + body_len + len(closer) + 2 > GSM7_SINGLE:
+        pieces = [body, closer] if body_len + len(closer) + 1 <= GSM7_SINGLE else [body]
+    return ' '.join(pieces)
@@ -0,0 +1,117 @@
+"""
+Run profiling.
+
+Wraps a run in cProfile (cpu) or tracemalloc (mem), writes the raw stats
+to a file that can be re-sorted later, and logs the top entries. CPU stats
+load with pstats (python -m pstats <file>); memory snapshots load with
+tracemalloc.Snapshot.load().
+
+cProfile only sees the thread that started it, so work done on the
+pipelined executor threads shows up as time waiting on futures.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Optional
+
+from .config import PROFILE_DIR, PROFILE_TOP_N, PROFILE_SORT
+
+log = logging.getLogger(__name__)
+
+MODES = ('cpu', 'mem')
+EXTENSIONS = {'cpu': 'prof', 'mem': 'tracemalloc'}
+
+
+class RunProfiler:
+    """
+    Context manager that profiles the enclosed block.
+
+    The stats file is written on exit and its path left in .path.
+    """
+
+    def __init__(self, mode: str, label: str = 'run', out_dir: str = PROFILE_DIR,
+                 top_n: int = PROFILE_TOP_N, sort: str = PROFILE_SORT):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.label = label
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self.sort = sort
+        self.path: Optional[str] = None
+        self.summary = ''
+        self._profile = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.mode == 'cpu':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        else:
+            tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.path = os.path.join(self.out_dir, f"{self.label}-{stamp}.{EXTENSIONS[self.mode]}")
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            if self.mode == 'cpu':
+                self._profile.disable()
+                self._profile.dump_stats(self.path)
+                self.summary = self._cpu_summary()
+            else:
+                self.summary = self._mem_summary()
+        except OSError as e:
+            log.error(f"Error writing profile: {e}")
+            self.path = None
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+        if self.path:
+            log.info(f"Profile ({self.mode}) written to {self.path}\n{self.summary}")
+        return False
+
+    def _cpu_summary(self) -> str:
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.strip_dirs().sort_stats(self.sort).print_stats(self.top_n)
+        return out.getvalue().strip()
+
+    def _mem_summary(self) -> str:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+        snapshot.dump(self.path)
+
+        lines = [f"current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB"]
+        for stat in snapshot.statistics('lineno')[:self.top_n]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+                         f"{os.path.basename(frame.filename)}:{frame.lineno}")
+        return '\n'.join(lines)
+
+
+def profiled_call(mode: Optional[str], func: Callable, *args, label: str = 'run', **kwargs):
+    """
+    Call func(*args, **kwargs), profiled when a mode is given.
+
+    Returns:
+        Whatever func returns
+    """
+    if not mode:
+        return func(*args, **kwargs)
+    with RunProfiler(mode, label=label):
+        return func(*args, **kwargs)
@@ -0,0 +1,151 @@
+"""
+Typed wind readings.
+
+A WindReading is a small immutable slotted record, with its source stored as
+a shared enum member rather than a string per reading. ReadingBatch holds
+many readings column-wise in NumPy arrays (17 bytes per reading), so
+forecast series and imported history stay compact and can be processed
+without building a Python object per reading.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+
+class Source(str, Enum):
+    """Where a reading came from."""
+    OPEN_METEO = 'open-meteo'
+    ECCC = 'eccc'
+    TEST = 'test'
+    STATION = 'station'     # plugin station (buoy, lighthouse, anemometer)
+    MERGED = 'merged'       # combined from several sources
+
+    def __str__(self) -> str:
+        return self.value
+
+
+_SOURCES = tuple(Source)
+_SOURCE_CODES = {source: code for code, source in enumerate(_SOURCES)}
+
+
+@dataclass(frozen=True, slots=True)
+class WindReading:
+    """One wind observation."""
+    speed: float                          # km/h
+    direction: float                      # degrees
+    source: Source
+    observed_at: Optional[float] = None   # epoch seconds, if known
+
+    def to_dict(self) -> Dict:
+        """Plain dict form (for JSON caches and state)."""
+        return {
+            'speed': self.speed,
+            'direction': self.direction,
+            'source': self.source.value,
+            'observed_at': self.observed_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WindReading':
+        """Rebuild a reading from to_dict() output."""
+        return cls(float(data['speed']), float(data['direction']), Source(data['source']),
+                   data.get('observed_at'))
+
+
+class ReadingBatch:
+    """Many readings stored as parallel arrays (struct of arrays)."""
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._speeds = np.empty(capacity, dtype=np.float32)
+        self._directions = np.empty(capacity, dtype=np.float32)
+        self._sources = np.empty(capacity, dtype=np.uint8)
+        self._size = 0
+
+    @classmethod
+    def from_readings(cls, readings: Iterable[WindReading]) -> 'ReadingBatch':
+        readings = list(readings)
+        batch = cls(len(readings))
+        batch.extend(readings)
+        return batch
+
+    @classmethod
+    def from_arrays(cls, times, speeds, directions, source: Source) -> 'ReadingBatch':
+        """Build a batch from columns that share one source."""
+        n = len(speeds)
+        batch = cls(n)
+        batch._times[:n] = times
+        batch._speeds[:n] = speeds
+        batch._directions[:n] = directions
+        batch._sources[:n] = _SOURCE_CODES[Source(source)]
+        batch._size = n
+        return batch
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._speeds)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name in ('_times', '_speeds', '_directions', '_sources'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def append(self, reading: WindReading) -> None:
+        self._grow(self._size + 1)
+        i = self._size
+        self._times[i] = np.nan if reading.observed_at is None else reading.observed_at
+        self._speeds[i] = reading.speed
+        self._directions[i] = reading.direction
+        self._sources[i] = _SOURCE_CODES[reading.source]
+        self._size += 1
+
+    def extend(self, readings: Iterable[WindReading]) -> None:
+        for reading in readings:
+            self.append(reading)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i: int) -> WindReading:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("reading index out of range")
+        observed_at = float(self._times[i])
+        return WindReading(float(self._speeds[i]), float(self._directions[i]),
+                           _SOURCES[self._sources[i]], None if np.isnan(observed_at) else observed_at)
+
+    def __iter__(self) -> Iterator[WindReading]:
+        for i in range(self._size):
+            yield self[i]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self._size]
+
+    @property
+    def speeds(self) -> np.ndarray:
+        return self._speeds[:self._size]
+
+    @property
+    def directions(self) -> np.ndarray:
+        return self._directions[:self._size]
+
+    @property
+    def sources(self) -> np.ndarray:
+        """Source codes (index into tuple(Source))."""
+        return self._sources[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the stored readings."""
+        return self.times.nbytes + self.speeds.nbytes + self.directions.nbytes + self.sources.nbytes
+
+    def latest(self) -> Optional[WindReading]:
+        return self[self._size - 1] if self._size else None
@@ -0,0 +1,145 @@
+"""
+Cross-process cache for fetched wind readings.
+
+Overlapping runs (Cloud Scheduler retries, manual workflow_dispatch) share
+one on-disk cache. Entries are written to a temp file and atomically renamed
+into place, so readers never see partial JSON, and a per-key file lock gives
+single-flight behaviour: the first run to miss the cache fetches upstream
+while the others wait on the lock and then read its result.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from .config import RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTL_SECONDS
+
+log = logging.getLogger(__name__)
+
+# How long to wait for another process's fetch before fetching ourselves
+LOCK_TIMEOUT_SECONDS = 30
+LOCK_POLL_SECONDS = 0.05
+
+
+def _paths(key: str, cache_dir: str):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return (os.path.join(cache_dir, f"{digest}.json"),
+            os.path.join(cache_dir, f"{digest}.lock"))
+
+
+def read_cached(key: str, ttl: float, cache_dir: str = RESPONSE_CACHE_DIR) -> Optional[Any]:
+    """Return the cached value for key if it is younger than ttl seconds."""
+    data_path, _ = _paths(key, cache_dir)
+    try:
+        with open(data_path, 'r') as f:
+            entry = json.load(f)
+        age = time.time() - entry['stored_at']
+        if 0 <= age <= ttl:
+            return entry['value']
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.warning(f"Ignoring unreadable cache entry for {key}: {e}")
+    return None
+
+
+def write_cached(key: str, value: Any, cache_dir: str = RESPONSE_CACHE_DIR) -> None:
+    """Store a value for key via write-to-temp and atomic rename."""
+    data_path, _ = _paths(key, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'key': key, 'stored_at': time.time(), 'value': value}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, data_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        log.warning(f"Error writing cache entry for {key}: {e}")
+
+
+@contextmanager
+def _exclusive_lock(lock_path: str, timeout: float):
+    """
+    Hold an exclusive flock on lock_path.
+
+    Yields True if the lock was acquired, False if timeout expired first or
+    the lock file couldn't be opened.
+    """
+    try:
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        lock_file = open(lock_path, 'a')
+    except OSError as e:
+        log.warning(f"Cache lock unavailable: {e}")
+        yield False
+        return
+
+    with lock_file:
+        deadline = time.monotonic() + timeout
+        acquired = False
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def get_or_fetch(key: str,
+                 fetch: Callable[[], Optional[Any]],
+                 ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+                 cache_dir: str = RESPONSE_CACHE_DIR) -> Optional[Any]:
+    """
+    Return a fresh cached value for key, fetching it at most once across processes.
+
+    Args:
+        key: Cache key (e.g. source and coordinates)
+        fetch: Called on a miss; must return a JSON-serializable value or None
+        ttl: Maximum age in seconds of a usable entry (0 disables caching)
+        cache_dir: Directory holding cache entries and lock files
+
+    Returns:
+        The cached or freshly fetched value (None results are not cached)
+    """
+    if ttl <= 0:
+        return fetch()
+
+    cached = read_cached(key, ttl, cache_dir)
+    if cached is not None:
+        log.info(f"Using cached data for {key}")
+        return cached
+
+    _, lock_path = _paths(key, cache_dir)
+    with _exclusive_lock(lock_path, LOCK_TIMEOUT_SECONDS) as acquired:
+        if not acquired:
+            log.warning(f"No cache lock for {key}, fetching directly")
+            return fetch()
+
+        # Another process may have fetched while we waited for the lock
+        cached = read_cached(key, ttl, cache_dir)
+        if cached is not None:
+            log.info(f"Using data fetched by a concurrent run for {key}")
+            return cached
+
+        value = fetch()
+        if value is not None:
+            write_cached(key, value, cache_dir)
+        return value
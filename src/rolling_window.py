@@ -0,0 +1,279 @@
+"""
+Rolling-window wind detector.
+
+Keeps a fixed-size ring buffer of recent readings per spot so alerts can be
+based on sustained conditions instead of a single instantaneous sample.
+Rolling mean, min, max (gust) and direction consistency are all maintained
+with O(1) (amortized) updates, and windows are persisted in a compact binary file
+so cold starts don't lose history.
+"""
+
+import logging
+import math
+import os
+import struct
+import tempfile
+from array import array
+from collections import deque
+from typing import Dict, Optional
+
+from .config import WINDOW_CAPACITY, WINDOW_STATE_PATH
+
+log = logging.getLogger(__name__)
+
+# File format: magic, version, spot count; then per spot an id and n samples
+_MAGIC = b'RWIN'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHH')
+_SPOT_HEADER = struct.Struct('<HH')
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer of (timestamp, speed, direction) samples.
+
+    Running sums give the mean speed and mean direction vector, and
+    monotonic deques give the window min and max, so push and evict are O(1).
+    """
+
+    __slots__ = ('capacity', '_times', '_speeds', '_dirs', '_head', '_size',
+                 '_seq', '_sum_speed', '_sum_sin', '_sum_cos', '_max_seqs', '_min_seqs')
+
+    def __init__(self, capacity: int = WINDOW_CAPACITY):
+        if capacity < 1:
+            raise ValueError("Window capacity must be at least 1")
+        self.capacity = capacity
+        self._times = array('d', [0.0]) * capacity
+        self._speeds = array('f', [0.0]) * capacity
+        self._dirs = array('f', [0.0]) * capacity
+        self._head = 0   # slot of the oldest sample
+        self._size = 0
+        self._seq = 0    # sequence number of the next sample pushed
+        self._sum_speed = 0.0
+        self._sum_sin = 0.0
+        self._sum_cos = 0.0
+        self._max_seqs = deque()  # sequence numbers with decreasing speed
+        self._min_seqs = deque()  # sequence numbers with increasing speed
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, seq: int) -> int:
+        return seq % self.capacity
+
+    def push(self, timestamp: float, speed: float, direction: float) -> None:
+        """Add a sample, evicting the oldest one if the buffer is full."""
+        if self._size == self.capacity:
+            self._evict_oldest()
+
+        seq = self._seq
+        slot = self._slot(seq)
+        radians = math.radians(direction)
+
+        self._times[slot] = timestamp
+        self._speeds[slot] = speed
+        self._dirs[slot] = direction % 360
+        self._sum_speed += speed
+        self._sum_sin += math.sin(radians)
+        self._sum_cos += math.cos(radians)
+
+        while self._max_seqs and self._speeds[self._slot(self._max_seqs[-1])] <= speed:
+            self._max_seqs.pop()
+        self._max_seqs.append(seq)
+        while self._min_seqs and self._speeds[self._slot(self._min_seqs[-1])] >= speed:
+            self._min_seqs.pop()
+        self._min_seqs.append(seq)
+
+        if self._size == 0:
+            self._head = slot
+        self._size += 1
+        self._seq += 1
+
+    def _evict_oldest(self) -> None:
+        oldest_seq = self._seq - self._size
+        slot = self._slot(oldest_seq)
+        radians = math.radians(self._dirs[slot])
+
+        self._sum_speed -= self._speeds[slot]
+        self._sum_sin -= math.sin(radians)
+        self._sum_cos -= math.cos(radians)
+        if self._max_seqs and self._max_seqs[0] == oldest_seq:
+            self._max_seqs.popleft()
+        if self._min_seqs and self._min_seqs[0] == oldest_seq:
+            self._min_seqs.popleft()
+
+        self._size -= 1
+        self._head = self._slot(oldest_seq + 1)
+        if self._size == 0:
+            # Reset sums so floating point drift can't accumulate
+            self._sum_speed = self._sum_sin = self._sum_cos = 0.0
+
+    def expire(self, cutoff: float) -> None:
+        """
+        Drop samples older than the cutoff timestamp.
+
+        The newest sample at or before the cutoff is kept, so the window
+        still reaches back to the start of the period whenever data exists.
+        """
+        while self._size > 1 and self._times[self._slot(self._seq - self._size + 1)] <= cutoff:
+            self._evict_oldest()
+
+    @property
+    def oldest_time(self) -> Optional[float]:
+        return self._times[self._head] if self._size else None
+
+    @property
+    def newest_time(self) -> Optional[float]:
+        return self._times[self._slot(self._seq - 1)] if self._size else None
+
+    @property
+    def span_seconds(self) -> float:
+        """Time covered between the oldest and newest samples."""
+        if not self._size:
+            return 0.0
+        return self.newest_time - self.oldest_time
+
+    @property
+    def mean_speed(self) -> float:
+        return self._sum_speed / self._size if self._size else 0.0
+
+    @property
+    def max_speed(self) -> float:
+        """Highest speed in the window (the gust)."""
+        if not self._max_seqs:
+            return 0.0
+        return float(self._speeds[self._slot(self._max_seqs[0])])
+
+    @property
+    def min_speed(self) -> float:
+        """Lowest speed in the window (the lull)."""
+        if not self._min_seqs:
+            return 0.0
+        return float(self._speeds[self._slot(self._min_seqs[0])])
+
+    def speed_held(self, fraction: float = 1.0) -> float:
+        """
+        Highest speed reached by at least this fraction of the samples.
+
+        A fraction of 1.0 is the window min (O(1)); lower fractions let a
+        few lulls through at the cost of sorting the window.
+        """
+        if not self._size:
+            return 0.0
+        if fraction >= 1.0:
+            return self.min_speed
+        speeds = sorted((s for _, s, _ in self.samples()), reverse=True)
+        return speeds[max(math.ceil(fraction * self._size), 1) - 1]
+
+    @property
+    def mean_direction(self) -> float:
+        """Circular mean of the sample directions in degrees (0-360)."""
+        if not self._size:
+            return 0.0
+        return math.degrees(math.atan2(self._sum_sin, self._sum_cos)) % 360
+
+    @property
+    def direction_consistency(self) -> float:
+        """
+        Mean resultant length of the directions.
+
+        1.0 means every sample came from the same direction, values near 0
+        mean the wind is swinging around.
+        """
+        if not self._size:
+            return 0.0
+        return math.hypot(self._sum_sin, self._sum_cos) / self._size
+
+    def samples(self):
+        """Yield (timestamp, speed, direction) tuples from oldest to newest."""
+        for seq in range(self._seq - self._size, self._seq):
+            slot = self._slot(seq)
+            yield self._times[slot], float(self._speeds[slot]), float(self._dirs[slot])
+
+    def summary(self) -> Dict:
+        """Snapshot of the window statistics, useful for logging."""
+        return {
+            'samples': self._size,
+            'span_minutes': self.span_seconds / 60,
+            'mean_speed': self.mean_speed,
+            'lull': self.min_speed,
+            'gust': self.max_speed,
+            'mean_direction': self.mean_direction,
+            'consistency': self.direction_consistency
+        }
+
+
+def load_windows(path: str = WINDOW_STATE_PATH,
+                 capacity: int = WINDOW_CAPACITY) -> Dict[str, RollingWindow]:
+    """Load persisted windows keyed by spot id (empty dict if unavailable)."""
+    windows = {}
+    if not os.path.exists(path):
+        return windows
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Unsupported window file (magic={magic!r}, version={version})")
+
+        offset = _HEADER.size
+        for _ in range(count):
+            id_len, n = _SPOT_HEADER.unpack_from(data, offset)
+            offset += _SPOT_HEADER.size
+            spot_id = data[offset:offset + id_len].decode('utf-8')
+            offset += id_len
+
+            times = array('d')
+            times.frombytes(data[offset:offset + 8 * n])
+            offset += 8 * n
+            speeds = array('f')
+            speeds.frombytes(data[offset:offset + 4 * n])
+            offset += 4 * n
+            dirs = array('f')
+            dirs.frombytes(data[offset:offset + 4 * n])
+            offset += 4 * n
+
+            window = RollingWindow(capacity)
+            for t, s, d in zip(times, speeds, dirs):
+                window.push(t, s, d)
+            windows[spot_id] = window
+
+    except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+        log.warning(f"Error loading rolling window file: {e}, starting empty")
+        return {}
+
+    return windows
+
+
+def save_windows(windows: Dict[str, RollingWindow], path: str = WINDOW_STATE_PATH) -> None:
+    """Persist windows atomically in the compact binary format."""
+    parts = [_HEADER.pack(_MAGIC, _VERSION, len(windows))]
+    for spot_id, window in windows.items():
+        encoded_id = spot_id.encode('utf-8')
+        times, speeds, dirs = array('d'), array('f'), array('f')
+        for t, s, d in window.samples():
+            times.append(t)
+            speeds.append(s)
+            dirs.append(d)
+        parts.append(_SPOT_HEADER.pack(len(encoded_id), len(window)))
+        parts.append(encoded_id)
+        parts.append(times.tobytes())
+        parts.append(speeds.tobytes())
+        parts.append(dirs.tobytes())
+
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(parts))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        log.debug(f"Rolling windows saved for {len(windows)} spot(s)")
+    except OSError as e:
+        log.error(f"Error saving rolling windows: {e}")
@@ -0,0 +1,116 @@
+"""
+SMS encoding and segment calculation.
+
+A message using only the GSM-7 alphabet fits 160 characters in one segment
+(153 per segment when concatenated). A single character outside it, such as
+an emoji, switches the whole message to UCS-2 with 70 (67) code units per
+segment, so a 100-character alert with one emoji is billed as 2 segments.
+The optimizer swaps or strips such characters so alerts fit one GSM-7
+segment whenever the text allows.
+"""
+
+import logging
+import math
+import re
+import unicodedata
+from typing import NamedTuple
+
+log = logging.getLogger(__name__)
+
+# GSM 03.38 basic character set
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+
+# Extension table characters, sent as an escape plus the character (2 units)
+GSM7_EXTENDED = set("^{}\\[~]|€\f")
+
+GSM7_SINGLE, GSM7_MULTI = 160, 153
+UCS2_SINGLE, UCS2_MULTI = 70, 67
+
+# Common characters outside GSM-7 and their closest GSM-7 equivalents
+REPLACEMENTS = {
+    '‘': "'", '’': "'", '‚': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '—': '-', '‒': '-', '−': '-',
+    '…': '...', '\u00a0': ' ', '\u2009': ' ', '\u200b': '',
+    '°': ' deg', '•': '-', '\t': ' ',
+}
+
+_SPACES = re.compile(r' {2,}')
+
+
+class SegmentInfo(NamedTuple):
+    """How a message will be encoded and billed."""
+    encoding: str   # 'GSM-7' or 'UCS-2'
+    units: int      # septets (GSM-7) or UTF-16 code units (UCS-2)
+    segments: int
+
+
+def is_gsm7(text: str) -> bool:
+    """Check if every character can be sent in GSM-7."""
+    return all(c in GSM7_BASIC or c in GSM7_EXTENDED for c in text)
+
+
+def segment_info(text: str) -> SegmentInfo:
+    """
+    Work out the encoding and segment count for a message.
+
+    Args:
+        text: Message body
+
+    Returns:
+        SegmentInfo with encoding, length in encoding units and segments
+    """
+    if is_gsm7(text):
+        units = sum(2 if c in GSM7_EXTENDED else 1 for c in text)
+        single, multi, encoding = GSM7_SINGLE, GSM7_MULTI, 'GSM-7'
+    else:
+        units = len(text.encode('utf-16-le')) // 2
+        single, multi, encoding = UCS2_SINGLE, UCS2_MULTI, 'UCS-2'
+
+    segments = 1 if units <= single else math.ceil(units / multi)
+    return SegmentInfo(encoding, units, segments)
+
+
+def to_gsm7(text: str) -> str:
+    """
+    Convert text to GSM-7 by swapping lookalike characters and stripping the rest.
+
+    Accented letters outside the GSM-7 alphabet lose their accent; emoji and
+    other symbols are dropped.
+    """
+    out = []
+    for c in text:
+        if c in GSM7_BASIC or c in GSM7_EXTENDED:
+            out.append(c)
+        elif c in REPLACEMENTS:
+            out.append(REPLACEMENTS[c])
+        else:
+            base = ''.join(b for b in unicodedata.normalize('NFKD', c) if b in GSM7_BASIC)
+            out.append(base)
+    return _SPACES.sub(' ', ''.join(out)).strip()
+
+
+def optimize_for_sms(text: str) -> str:
+    """
+    Rewrite a message to use as few segments as possible.
+
+    The GSM-7 version is used whenever it needs fewer segments than the
+    original, which for alerts with emoji usually means one instead of two
+    or three. Text that is already GSM-7 is returned unchanged.
+    """
+    original = segment_info(text)
+    if original.encoding == 'GSM-7':
+        return text
+
+    converted = to_gsm7(text)
+    if converted and segment_info(converted).segments < original.segments:
+        return converted
+    return text
+
+
+def fits_single_segment(text: str) -> bool:
+    """Check if a message is delivered as a single segment."""
+    return segment_info(text).segments == 1
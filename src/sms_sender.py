@@ -1,13 +1,15 @@
 import logging
 from typing import Optional
-from twilio.rest import Client
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from twilio.base.exceptions import TwilioException
+from .sms_encoding import segment_info
+from .clients import get_twilio_client, record_client_error, reset_client
 from .config import (
     TWILIO_ACCOUNT_SID,
     TWILIO_AUTH_TOKEN,
     TWILIO_PHONE_FROM,
     ALERT_PHONE_TO,
+    STATUS_CALLBACK_URL,
     DRY_RUN
 )
 
@@ -18,32 +20,41 @@ log = logging.getLogger(__name__)
     wait=wait_exponential(multiplier=1, min=4, max=10),
     retry=retry_if_exception_type((TwilioException, ConnectionError))
 )
-def send_sms(message_body: str) -> Optional[str]:
+def send_sms(message_body: str, to: Optional[str] = None) -> Optional[str]:
     """
     Send SMS via Twilio with retry logic.
 
     Args:
         message_body: The message to send
+        to: Recipient phone number (defaults to ALERT_PHONE_TO)
 
     Returns:
         Message SID if successful, None if dry run
     """
+    to = to or ALERT_PHONE_TO
+
     # Check for required configuration
-    if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_FROM, ALERT_PHONE_TO]):
+    if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_FROM, to]):
         log.error("Missing required Twilio configuration")
         return None
 
+    encoding = segment_info(message_body)
+    log.info(f"SMS is {encoding.units} {encoding.encoding} units, {encoding.segments} segment(s)")
+
     if DRY_RUN:
-        log.info(f"[DRY RUN] Would send SMS: {message_body}")
+        log.info(f"[DRY RUN] Would send SMS to {to}: {message_body}")
         return "DRY_RUN_SID"
 
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
 
+        # Ask Twilio to report delivery status changes when a receiver is set up
+        extra = {'status_callback': STATUS_CALLBACK_URL} if STATUS_CALLBACK_URL else {}
         message = client.messages.create(
             body=message_body,
             from_=TWILIO_PHONE_FROM,
-            to=ALERT_PHONE_TO
+            to=to,
+            **extra
         )
 
         log.info(f"SMS sent successfully. SID: {message.sid}")
@@ -51,6 +62,13 @@ def send_sms(message_body: str) -> Optional[str]:
 
     except TwilioException as e:
         log.error(f"Twilio error: {e}")
+        record_client_error('twilio')
+        raise
+    except ConnectionError as e:
+        # Rebuild the pooled client before tenacity retries
+        log.error(f"Connection error sending SMS: {e}")
+        record_client_error('twilio')
+        reset_client('twilio')
         raise
     except Exception as e:
         log.error(f"Unexpected error sending SMS: {e}")
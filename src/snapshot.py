@@ -0,0 +1,241 @@
+"""
+Warm-start snapshot of runtime state in a single file.
+
+Scheduled runs on ephemeral runners start with an empty /tmp, so everything
+learned in earlier runs (alert state, rolling windows, source health and
+circuit breakers, deferred and retry schedules, delivery tracking, cached
+responses) is lost unless carried over. A snapshot bundles those files into
+one versioned file that is restored at startup and written back at the end
+of the run.
+
+Layout (little-endian):
+
+    header   magic b'WASNAP', version u16, member count u32
+    index    per member: name length u16, name (UTF-8), offset u64,
+             length u64, crc32 u32
+    payload  member bytes at their offsets
+
+The snapshot is memory-mapped and read in one pass; each member is checked
+against its CRC and written back to its usual path, so the rest of the code
+loads state exactly as it would from a warm disk. Members whose file already
+exists locally are left alone. The history journal is not included; it is
+append-only and kept as its own artifact.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from .config import (STATE_FILE_PATH, WINDOW_STATE_PATH, SOURCE_HEALTH_PATH, SCHEDULE_PATH, RETRY_SCHEDULE_PATH,
+                     DELIVERY_DB_PATH, RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTL_SECONDS, SNAPSHOT_PATH)
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'WASNAP'
+VERSION = 1
+HEADER = struct.Struct('<6sHI')
+NAME_LENGTH = struct.Struct('<H')
+INDEX_ENTRY = struct.Struct('<QQI')
+
+# Members stored under this prefix are response cache entries
+CACHE_PREFIX = 'cache/'
+
+
+def default_members() -> Dict[str, str]:
+    """Snapshot member name -> file it is restored to."""
+    return {
+        'state': STATE_FILE_PATH,
+        'windows': WINDOW_STATE_PATH,
+        'source_health': SOURCE_HEALTH_PATH,
+        'schedule': SCHEDULE_PATH,
+        'retries': RETRY_SCHEDULE_PATH,
+        'deliveries': DELIVERY_DB_PATH
+    }
+
+
+def _cache_files(cache_dir: str, ttl: float) -> Dict[str, str]:
+    """Cache entries still young enough to be served (locks and temp files skipped)."""
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return {}
+    oldest = time.time() - ttl
+    files = {}
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.json') and entry.is_file() and entry.stat().st_mtime >= oldest:
+            files[CACHE_PREFIX + entry.name] = entry.path
+    return files
+
+
+def pack(members: Dict[str, bytes]) -> bytes:
+    """Build snapshot bytes from member name -> contents."""
+    names = [name.encode('utf-8') for name in members]
+    offset = HEADER.size + sum(NAME_LENGTH.size + len(name) + INDEX_ENTRY.size for name in names)
+
+    index = []
+    for name, data in zip(names, members.values()):
+        index.append(NAME_LENGTH.pack(len(name)) + name + INDEX_ENTRY.pack(offset, len(data), zlib.crc32(data)))
+        offset += len(data)
+    return b''.join([HEADER.pack(MAGIC, VERSION, len(members)), *index, *members.values()])
+
+
+def unpack(buffer) -> Dict[str, bytes]:
+    """
+    Read member name -> contents from snapshot bytes (or a memory map).
+
+    Members failing their CRC are skipped with a warning.
+
+    Raises:
+        ValueError: If the buffer isn't a snapshot of a supported version
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a wind alert snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} (expected {VERSION})")
+
+    members = {}
+    pos = HEADER.size
+    try:
+        for _ in range(count):
+            (name_length,) = NAME_LENGTH.unpack_from(buffer, pos)
+            pos += NAME_LENGTH.size
+            name = bytes(buffer[pos:pos + name_length]).decode('utf-8')
+            pos += name_length
+            offset, length, crc = INDEX_ENTRY.unpack_from(buffer, pos)
+            pos += INDEX_ENTRY.size
+
+            data = bytes(buffer[offset:offset + length])
+            if len(data) != length or zlib.crc32(data) != crc:
+                log.warning(f"Snapshot member {name} is corrupt, skipping it")
+                continue
+            members[name] = data
+    except struct.error as e:
+        raise ValueError(f"Snapshot index is truncated: {e}") from e
+    return members
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Dict[str, bytes]:
+    """
+    Load every member of a snapshot file with one memory map.
+
+    Returns:
+        Member name -> contents (empty if the file is missing)
+
+    Raises:
+        ValueError: If the file isn't a valid snapshot
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Snapshot is empty")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return unpack(mapped)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def restore_snapshot(path: str = SNAPSHOT_PATH, members: Optional[Dict[str, str]] = None,
+                     cache_dir: str = RESPONSE_CACHE_DIR) -> int:
+    """
+    Put a snapshot's files back in place before a run.
+
+    Files that already exist are kept, so a snapshot never overwrites newer
+    local state. An unreadable snapshot is logged and the run starts cold.
+
+    Args:
+        path: Snapshot file
+        members: Member name -> file path (defaults to the configured paths)
+        cache_dir: Where response cache entries are restored
+
+    Returns:
+        Number of files restored
+    """
+    started = time.monotonic()
+    try:
+        contents = read_snapshot(path)
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring snapshot {path}: {e}, starting cold")
+        return 0
+    if not contents:
+        return 0
+
+    targets = default_members() if members is None else members
+    restored = 0
+    for name, data in contents.items():
+        if name.startswith(CACHE_PREFIX):
+            target = os.path.join(cache_dir, os.path.basename(name[len(CACHE_PREFIX):])) if cache_dir else None
+        else:
+            target = targets.get(name)
+        if not target or os.path.exists(target):
+            continue
+        try:
+            _write_atomic(target, data)
+            restored += 1
+        except OSError as e:
+            log.warning(f"Error restoring {name} from snapshot: {e}")
+
+    log.info(f"Restored {restored} of {len(contents)} file(s) from snapshot {path} "
+             f"in {(time.monotonic() - started) * 1000:.1f}ms")
+    return restored
+
+
+def write_snapshot(path: str = SNAPSHOT_PATH, members: Optional[Dict[str, str]] = None,
+                   cache_dir: str = RESPONSE_CACHE_DIR, cache_ttl: float = RESPONSE_CACHE_TTL_SECONDS) -> Tuple[int, int]:
+    """
+    Bundle the current state files into the snapshot, replacing it atomically.
+
+    Missing files are left out. Run this once nothing is writing state
+    (end of the run), so the delivery database has been checkpointed.
+
+    Args:
+        path: Snapshot file
+        members: Member name -> file path (defaults to the configured paths)
+        cache_dir: Response cache whose live entries are included
+        cache_ttl: Cache entries older than this are left out
+
+    Returns:
+        (members written, snapshot size in bytes); (0, 0) if writing failed
+    """
+    sources = {**(default_members() if members is None else members), **_cache_files(cache_dir, cache_ttl)}
+    contents = {}
+    for name, source in sources.items():
+        try:
+            with open(source, 'rb') as f:
+                contents[name] = f.read()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            log.warning(f"Leaving {name} out of snapshot: {e}")
+
+    data = pack(contents)
+    try:
+        _write_atomic(path, data)
+    except OSError as e:
+        log.error(f"Error writing snapshot {path}: {e}")
+        return 0, 0
+    log.info(f"Wrote snapshot {path}: {len(contents)} file(s), {len(data)} bytes")
+    return len(contents), len(data)
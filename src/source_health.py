@@ -0,0 +1,211 @@
+"""
+Per-source health tracking and circuit breaker for weather sources.
+
+Each source keeps a rolling window of recent outcomes and latencies,
+persisted between runs. A source that fails CIRCUIT_FAILURE_THRESHOLD times
+in a row is skipped (circuit open) until CIRCUIT_OPEN_SECONDS have passed,
+after which a single half-open probe decides whether it closes again; other
+callers are turned away while the probe is in flight.
+Healthy sources are tried in order of expected cost, so a slow or flaky
+primary no longer costs every run its full timeout.
+
+Concurrent fetches in one process share a single SourceHealth per file
+(see load_health), so outcomes recorded by one thread aren't overwritten
+by another thread's stale copy.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .config import SOURCE_HEALTH_PATH, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_OPEN_SECONDS
+
+log = logging.getLogger(__name__)
+
+# Number of recent outcomes/latencies kept per source
+HEALTH_WINDOW = 20
+
+# Latency charged for a failure when ranking (matches the request timeout)
+FAILURE_COST_SECONDS = 10.0
+
+# A half-open probe with no outcome after this long (its run died, say) is
+# given up on and another caller may probe
+PROBE_TIMEOUT_SECONDS = 6 * FAILURE_COST_SECONDS
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Health file path -> the instance shared by everything in this process
+_shared: Dict[str, 'SourceHealth'] = {}
+_shared_lock = threading.Lock()
+
+
+def _new_record() -> Dict:
+    return {
+        'outcomes': [],
+        'latencies': [],
+        'consecutive_failures': 0,
+        'state': CLOSED,
+        'opened_at': None,
+        'probe_started_at': None
+    }
+
+
+class SourceHealth:
+    """Rolling health statistics and breaker state for a set of sources (thread-safe)."""
+
+    def __init__(self, records: Optional[Dict[str, Dict]] = None, path: str = SOURCE_HEALTH_PATH):
+        self.path = path
+        self.records = records or {}
+        self._lock = threading.RLock()
+
+    def _record(self, name: str) -> Dict:
+        with self._lock:
+            if name not in self.records:
+                self.records[name] = _new_record()
+            return self.records[name]
+
+    def _observe(self, name: str, ok: bool, latency: float) -> Dict:
+        # Callers hold the lock
+        record = self._record(name)
+        record['outcomes'] = (record['outcomes'] + [1 if ok else 0])[-HEALTH_WINDOW:]
+        record['latencies'] = (record['latencies'] + [round(latency, 3)])[-HEALTH_WINDOW:]
+        return record
+
+    def record_success(self, name: str, latency: float) -> None:
+        """Record a successful fetch, closing the circuit."""
+        with self._lock:
+            record = self._observe(name, True, latency)
+            if record['state'] != CLOSED:
+                log.info(f"Circuit for {name} closed after successful probe")
+            record['consecutive_failures'] = 0
+            record['state'] = CLOSED
+            record['opened_at'] = None
+            record['probe_started_at'] = None
+
+    def record_failure(self, name: str, latency: float, now: Optional[float] = None) -> None:
+        """Record a failed fetch, opening the circuit if failures keep coming."""
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._observe(name, False, latency)
+            record['consecutive_failures'] += 1
+            record['probe_started_at'] = None
+
+            if record['state'] == HALF_OPEN or record['consecutive_failures'] >= CIRCUIT_FAILURE_THRESHOLD:
+                if record['state'] != OPEN:
+                    log.warning(f"Circuit for {name} opened after {record['consecutive_failures']} failure(s)")
+                record['state'] = OPEN
+                record['opened_at'] = now
+
+    def allow(self, name: str, now: Optional[float] = None) -> bool:
+        """
+        Check if a source may be tried.
+
+        An open circuit moves to half-open once CIRCUIT_OPEN_SECONDS have
+        passed, letting one probe through. Other callers are refused until
+        the probe's outcome is recorded, or PROBE_TIMEOUT_SECONDS pass
+        without one.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._record(name)
+
+            if record['state'] == OPEN:
+                if now - (record['opened_at'] or 0) < CIRCUIT_OPEN_SECONDS:
+                    return False
+                record['state'] = HALF_OPEN
+                record['probe_started_at'] = now
+                log.info(f"Circuit for {name} half-open, probing")
+                return True
+            if record['state'] == HALF_OPEN:
+                started = record['probe_started_at']
+                if started is not None and now - started < PROBE_TIMEOUT_SECONDS:
+                    return False
+                record['probe_started_at'] = now
+                log.info(f"Circuit for {name} probe timed out, probing again")
+                return True
+            return True
+
+    def success_rate(self, name: str) -> Optional[float]:
+        outcomes = self._record(name)['outcomes']
+        return sum(outcomes) / len(outcomes) if outcomes else None
+
+    def p95_latency(self, name: str) -> Optional[float]:
+        latencies = sorted(self._record(name)['latencies'])
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def expected_cost(self, name: str) -> float:
+        """
+        Expected seconds spent on a source: p95 latency plus the failure
+        rate times the timeout. Unmeasured sources sort last.
+        """
+        rate = self.success_rate(name)
+        if rate is None:
+            return float('inf')
+        return self.p95_latency(name) + (1 - rate) * FAILURE_COST_SECONDS
+
+    def ranked(self, names: Iterable[str]) -> List[str]:
+        """Order sources by expected cost, keeping declared order for ties."""
+        names = list(names)
+        with self._lock:
+            return sorted(names, key=lambda n: (self.expected_cost(n), names.index(n)))
+
+    def summary(self, name: str) -> str:
+        rate = self.success_rate(name)
+        p95 = self.p95_latency(name)
+        record = self._record(name)
+        return (f"{name}: state={record['state']}, "
+                f"success={'n/a' if rate is None else f'{rate:.0%}'}, "
+                f"p95={'n/a' if p95 is None else f'{p95:.2f}s'}")
+
+    def save(self) -> None:
+        """Persist health records for the next run, via a unique temp file and atomic rename."""
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Held through the rename, so an older snapshot never replaces a newer one
+            with self._lock:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(self.records, f, indent=2)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            log.error(f"Error saving source health: {e}")
+
+
+def _read_health(path: str) -> SourceHealth:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                records = json.load(f)
+            return SourceHealth({name: {**_new_record(), **r} for name, r in records.items()}, path)
+        except (json.JSONDecodeError, IOError, AttributeError) as e:
+            log.warning(f"Error loading source health: {e}, starting fresh")
+    return SourceHealth(path=path)
+
+
+def load_health(path: str = SOURCE_HEALTH_PATH) -> SourceHealth:
+    """
+    Source health for path, shared within the process.
+
+    The file is read on first use (empty if missing or unreadable); later
+    calls return the same instance, so concurrent fetches record into one
+    set of records instead of each saving over the others. Separate
+    processes still write the file last-writer-wins.
+    """
+    with _shared_lock:
+        if path not in _shared:
+            _shared[path] = _read_health(path)
+        return _shared[path]
@@ -0,0 +1,328 @@
+"""
+Spot and subscriber registry.
+
+Loads watched spots and their subscribers from a JSON or TOML file into
+immutable, slotted objects with derived values (threshold in km/h, compass
+point mask) computed once at parse time. Each load builds a new immutable
+snapshot that replaces the old one in a single assignment, so a reader never
+sees a half-loaded registry. Without a registry file the
+registry holds a single Wreck Beach spot built from the environment
+config, so single-spot deployments behave exactly as before.
+
+Example (JSON):
+    {
+      "spots": [{"id": "wreck-beach", "name": "Wreck Beach",
+                 "lat": 49.2611, "lon": -123.2614, "threshold": 35,
+                 "units": "kmh", "sectors": [[247.5, 22.5]]}],
+      "subscribers": [{"id": "griffin", "phone": "+1604XXXXXXX",
+                       "spots": ["wreck-beach"], "tier": 1,
+                       "rule": "speed>=30 hours=6-21", "quiet_hours": "22-7"}]
+    }
+"""
+
+import json
+import logging
+import os
+import tomllib
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .config import (
+    COORDINATES,
+    WIND_SPEED_THRESHOLD_KMH,
+    ALERT_PHONE_TO,
+    DEFAULT_SPOT_ID,
+    SPOT_REGISTRY_PATH,
+    QUIET_HOURS
+)
+from .delivery_scheduler import parse_quiet_hours
+from .unit_conversions import convert_wind_speed
+
+log = logging.getLogger(__name__)
+
+# Good directions at Wreck Beach: W through NW to N (see conditions.is_good_wind_direction)
+DEFAULT_SECTORS = ((247.5, 22.5),)
+
+COMPASS_POINTS = 16
+SECTOR_WIDTH = 360 / COMPASS_POINTS
+
+
+def compass_index(degrees: float) -> int:
+    """Index (0-15) of the 22.5° compass point nearest to a direction."""
+    return int(((degrees % 360) + SECTOR_WIDTH / 2) // SECTOR_WIDTH) % COMPASS_POINTS
+
+
+def in_sector(degrees: float, start: float, end: float) -> bool:
+    """
+    Check if a direction lies in a clockwise sector from start to end
+    (inclusive). A sector spanning 360° or more covers every direction.
+    """
+    if end - start >= 360:
+        return True
+    degrees, start, end = degrees % 360, start % 360, end % 360
+    if start <= end:
+        return start <= degrees <= end
+    # Sector wraps through north
+    return degrees >= start or degrees <= end
+
+
+def in_sectors(degrees: float, sectors: Iterable[Tuple[float, float]]) -> bool:
+    """Check if a direction lies in any of the sectors."""
+    return any(in_sector(degrees, start, end) for start, end in sectors)
+
+
+def sectors_to_mask(sectors: Iterable[Tuple[float, float]]) -> int:
+    """
+    Bitmask of the compass points (22.5° buckets, as compass_index) that any
+    sector touches. A superset for prefiltering; exact checks use in_sectors.
+    """
+    mask = 0
+    for start, end in sectors:
+        for i in range(COMPASS_POINTS):
+            centre = i * SECTOR_WIDTH
+            if (in_sector(centre, start, end) or compass_index(start) == i
+                    or compass_index(end) == i):
+                mask |= 1 << i
+    return mask
+
+
+@dataclass(frozen=True, slots=True)
+class Spot:
+    """A watched location and its alert criteria."""
+    id: str
+    name: str
+    lat: float
+    lon: float
+    threshold_kmh: float
+    sectors: Tuple[Tuple[float, float], ...]
+    units: str                  # display units for messages ('kmh', 'ms' or 'knots')
+    sector_mask: int            # compass points the sectors touch (sectors_to_mask)
+
+    @property
+    def coordinates(self) -> Dict[str, float]:
+        """Coordinates in the same shape as config.COORDINATES."""
+        return {'lat': self.lat, 'lon': self.lon}
+
+    def is_good_direction(self, degrees: float) -> bool:
+        """Check a direction against this spot's sectors."""
+        return in_sectors(degrees, self.sectors)
+
+
+@dataclass(frozen=True, slots=True)
+class Subscriber:
+    """A phone number following one or more spots."""
+    id: str
+    phone: str
+    spot_ids: Tuple[str, ...]
+    tier: int = 0
+    rule: str = ''
+    quiet_hours: Optional[str] = None  # e.g. "22-7"; "" for none, None for QUIET_HOURS
+
+
+def build_spot(raw: Dict) -> Spot:
+    """Validate a raw spot entry and precompute its derived values."""
+    try:
+        units = raw.get('units', 'kmh')
+        if units not in ('kmh', 'ms', 'knots'):
+            raise ValueError(f"unknown units '{units}'")
+        sectors = tuple((float(start), float(end)) for start, end in raw.get('sectors', DEFAULT_SECTORS))
+        if 'threshold' in raw:
+            threshold_kmh = convert_wind_speed(float(raw['threshold']), units, 'kmh')
+        else:
+            threshold_kmh = WIND_SPEED_THRESHOLD_KMH
+
+        return Spot(
+            id=str(raw['id']),
+            name=str(raw.get('name', raw['id'])),
+            lat=float(raw['lat']),
+            lon=float(raw['lon']),
+            threshold_kmh=threshold_kmh,
+            sectors=sectors,
+            units=units,
+            sector_mask=sectors_to_mask(sectors)
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid spot entry {raw!r}: {e}") from e
+
+
+def build_subscriber(raw: Dict) -> Subscriber:
+    """Validate a raw subscriber entry."""
+    try:
+        quiet_hours = raw.get('quiet_hours')
+        if quiet_hours is not None:
+            quiet_hours = str(quiet_hours)
+            parse_quiet_hours(quiet_hours)
+        return Subscriber(
+            id=str(raw['id']),
+            phone=str(raw['phone']),
+            spot_ids=tuple(str(s) for s in raw.get('spots', ())),
+            tier=int(raw.get('tier', 0)),
+            rule=str(raw.get('rule', '')),
+            quiet_hours=quiet_hours
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid subscriber entry {raw!r}: {e}") from e
+
+
+def default_registry_data() -> Dict:
+    """Registry contents equivalent to the single-spot environment config."""
+    subscribers = []
+    if ALERT_PHONE_TO:
+        subscribers.append({'id': 'default', 'phone': ALERT_PHONE_TO, 'spots': [DEFAULT_SPOT_ID]})
+
+    return {
+        'spots': [{
+            'id': DEFAULT_SPOT_ID,
+            'name': 'Wreck Beach',
+            'lat': COORDINATES['lat'],
+            'lon': COORDINATES['lon'],
+            'threshold': WIND_SPEED_THRESHOLD_KMH
+        }],
+        'subscribers': subscribers
+    }
+
+
+def read_registry_file(path: str) -> Dict:
+    """Read a registry file, choosing the parser by extension."""
+    if path.endswith('.toml'):
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@dataclass(frozen=True, slots=True)
+class RegistrySnapshot:
+    """One load of the registry, with its lookup tables."""
+    spots: Mapping[str, Spot]
+    subscribers: Mapping[str, Subscriber]
+    by_spot: Mapping[str, Tuple[Subscriber, ...]]
+    by_phone: Mapping[str, Subscriber]
+    version: int  # bumped on every (re)load so derived data can be rebuilt
+
+
+_EMPTY = RegistrySnapshot(MappingProxyType({}), MappingProxyType({}), MappingProxyType({}),
+                          MappingProxyType({}), 0)
+
+
+class SpotRegistry:
+    """
+    Immutable snapshot of spots and subscribers with O(1) lookup by id.
+
+    Call reload_if_changed() between cycles in daemon mode; the file is only
+    re-parsed when its mtime changes.
+    """
+
+    def __init__(self, path: Optional[str] = SPOT_REGISTRY_PATH):
+        self.path = path
+        self._mtime_ns = None
+        self._snapshot = _EMPTY
+
+        if path:
+            self._mtime_ns = os.stat(path).st_mtime_ns
+            self._load(read_registry_file(path))
+        else:
+            self._load(default_registry_data())
+
+    def _load(self, data: Dict) -> None:
+        spots = {}
+        for raw in data.get('spots', []):
+            spot = build_spot(raw)
+            if spot.id in spots:
+                raise ValueError(f"Duplicate spot id '{spot.id}'")
+            spots[spot.id] = spot
+        if not spots:
+            raise ValueError("Registry must define at least one spot")
+
+        subscribers = {}
+        by_spot = {spot_id: [] for spot_id in spots}
+        for raw in data.get('subscribers', []):
+            subscriber = build_subscriber(raw)
+            subscribers[subscriber.id] = subscriber
+            for spot_id in subscriber.spot_ids:
+                if spot_id not in by_spot:
+                    raise ValueError(f"Subscriber '{subscriber.id}' follows unknown spot '{spot_id}'")
+                by_spot[spot_id].append(subscriber)
+
+        by_phone = {}
+        for subscriber in subscribers.values():
+            by_phone.setdefault(subscriber.phone, subscriber)
+
+        # One reference swap, so readers never see a half-loaded registry
+        self._snapshot = RegistrySnapshot(
+            spots=MappingProxyType(spots),
+            subscribers=MappingProxyType(subscribers),
+            by_spot=MappingProxyType({spot_id: tuple(subs) for spot_id, subs in by_spot.items()}),
+            by_phone=MappingProxyType(by_phone),
+            version=self._snapshot.version + 1
+        )
+        log.info(f"Spot registry loaded: {len(spots)} spot(s), {len(subscribers)} subscriber(s)")
+
+    @property
+    def spots(self) -> Mapping[str, Spot]:
+        return self._snapshot.spots
+
+    @property
+    def subscribers(self) -> Mapping[str, Subscriber]:
+        return self._snapshot.subscribers
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, spot_id: str) -> Optional[Spot]:
+        """Look up a spot by id."""
+        return self._snapshot.spots.get(spot_id)
+
+    def default_spot(self) -> Spot:
+        """The spot used by single-spot runs (DEFAULT_SPOT_ID, else the first)."""
+        spots = self._snapshot.spots
+        return spots.get(DEFAULT_SPOT_ID) or next(iter(spots.values()))
+
+    def subscribers_for(self, spot_id: str) -> Tuple[Subscriber, ...]:
+        """Subscribers following a spot."""
+        return self._snapshot.by_spot.get(spot_id, ())
+
+    def quiet_hours_for(self, phone: Optional[str]) -> str:
+        """
+        Quiet hours for a recipient: the subscriber's own, else QUIET_HOURS
+        (also for ALERT_PHONE_TO, passed as None).
+        """
+        subscriber = self._snapshot.by_phone.get(phone)
+        if subscriber is None or subscriber.quiet_hours is None:
+            return QUIET_HOURS
+        return subscriber.quiet_hours
+
+    def reload_if_changed(self) -> bool:
+        """
+        Re-parse the registry file if its mtime changed.
+
+        Returns:
+            True if the registry was reloaded. A file that fails to parse is
+            logged and the previous contents are kept.
+        """
+        if not self.path:
+            return False
+
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if mtime_ns == self._mtime_ns:
+                return False
+            self._load(read_registry_file(self.path))
+            self._mtime_ns = mtime_ns
+            return True
+        except (OSError, ValueError) as e:
+            log.error(f"Error reloading spot registry: {e}, keeping previous registry")
+            return False
+
+
+_registry: Optional[SpotRegistry] = None
+
+
+def get_registry() -> SpotRegistry:
+    """Shared registry, parsed on first use."""
+    global _registry
+    if _registry is None:
+        _registry = SpotRegistry()
+    return _registry
@@ -1,12 +1,28 @@
+"""
+Alert deduplication state.
+
+Cooldown and the daily limit are tracked per spot. The default spot keeps
+its record at the top level of the state file (the single-spot layout),
+and every other spot gets its own record under 'spots'.
+"""
+
 import json
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Optional
-from .config import STATE_FILE_PATH, ALERT_COOLDOWN_HOURS, DAILY_ALERT_LIMIT
+from typing import Dict, Iterable, Optional, Tuple
+from .config import STATE_FILE_PATH, ALERT_COOLDOWN_HOURS, DAILY_ALERT_LIMIT, DEFAULT_SPOT_ID
 
 log = logging.getLogger(__name__)
 
+def _default_record() -> Dict:
+    return {
+        'last_alert_time': '2000-01-01T00:00:00',
+        'last_alert_condition': '',
+        'alert_count_today': 0,
+        'last_reset_date': datetime.now().date().isoformat()
+    }
+
 def load_state() -> Dict:
     """Load alert state from file."""
     if os.path.exists(STATE_FILE_PATH):
@@ -17,12 +33,17 @@ def load_state() -> Dict:
             log.warning(f"Error loading state file: {e}, using defaults")
 
     # Default state
-    return {
-        'last_alert_time': '2000-01-01T00:00:00',
-        'last_alert_condition': '',
-        'alert_count_today': 0,
-        'last_reset_date': datetime.now().date().isoformat()
-    }
+    return _default_record()
+
+def spot_record(state: Dict, spot_id: Optional[str] = None) -> Dict:
+    """
+    The deduplication record for a spot within the state, created if missing.
+
+    None and the default spot share the top-level record.
+    """
+    if spot_id is None or spot_id == DEFAULT_SPOT_ID:
+        return state
+    return state.setdefault('spots', {}).setdefault(spot_id, _default_record())
 
 def save_state(state: Dict) -> None:
     """Save alert state to file."""
@@ -36,7 +57,7 @@ def save_state(state: Dict) -> None:
     except IOError as e:
         log.error(f"Error saving state: {e}")
 
-def should_send_alert(current_state: Optional[Dict] = None) -> bool:
+def should_send_alert(current_state: Optional[Dict] = None, spot_id: Optional[str] = None) -> bool:
     """
     Check if we should send an alert based on deduplication rules.
 
@@ -44,34 +65,40 @@ def should_send_alert(current_state: Optional[Dict] = None) -> bool:
     1. Cooldown: 6-hour minimum between alerts
     2. Daily limit: Maximum 4 alerts per day
 
+    Args:
+        current_state: State to check (loaded from file if None)
+        spot_id: Spot whose cooldown and daily count apply (default spot if None)
+
     Returns:
         True if alert should be sent
     """
     if current_state is None:
         current_state = load_state()
+    record = spot_record(current_state, spot_id)
 
     now = datetime.now()
     today = now.date().isoformat()
 
     # Reset daily counter if it's a new day
-    if current_state.get('last_reset_date') != today:
-        current_state['alert_count_today'] = 0
-        current_state['last_reset_date'] = today
+    if record.get('last_reset_date') != today:
+        record['alert_count_today'] = 0
+        record['last_reset_date'] = today
         save_state(current_state)
 
     # Check daily limit
-    if current_state.get('alert_count_today', 0) >= DAILY_ALERT_LIMIT:
-        log.info(f"Daily alert limit reached ({DAILY_ALERT_LIMIT})")
+    if record.get('alert_count_today', 0) >= DAILY_ALERT_LIMIT:
+        log.info(f"Daily alert limit reached ({DAILY_ALERT_LIMIT}){f' for {spot_id}' if spot_id else ''}")
         return False
 
     # Check cooldown period
     try:
-        last_alert = datetime.fromisoformat(current_state.get('last_alert_time', '2000-01-01'))
+        last_alert = datetime.fromisoformat(record.get('last_alert_time', '2000-01-01'))
         hours_since = (now - last_alert).total_seconds() / 3600
 
         if hours_since < ALERT_COOLDOWN_HOURS:
             remaining = ALERT_COOLDOWN_HOURS - hours_since
-            log.info(f"In cooldown period, {remaining:.1f} hours remaining")
+            log.info(f"In cooldown period{f' for {spot_id}' if spot_id else ''}, "
+                     f"{remaining:.1f} hours remaining")
             return False
 
     except (ValueError, TypeError) as e:
@@ -79,24 +106,71 @@ def should_send_alert(current_state: Optional[Dict] = None) -> bool:
 
     return True
 
-def update_state(wind_speed: float, wind_direction: float, message: str = None) -> None:
+def update_state(wind_speed: float, wind_direction: float, message: str = None,
+                 spot_id: Optional[str] = None) -> None:
     """Update state after sending an alert."""
+    update_states([(spot_id, wind_speed, wind_direction, message)])
+
+def update_states(alerts: Iterable[Tuple[Optional[str], float, float, Optional[str]]]) -> None:
+    """
+    Update state after sending alerts for one or more spots.
+
+    Args:
+        alerts: (spot_id, wind speed, wind direction, message) per spot
+            alerted; each counts as one alert against that spot's limits
+    """
     state = load_state()
 
     now = datetime.now()
     today = now.date().isoformat()
 
-    # Reset counter if new day
-    if state.get('last_reset_date') != today:
-        state['alert_count_today'] = 0
-        state['last_reset_date'] = today
+    for spot_id, wind_speed, wind_direction, message in alerts:
+        record = spot_record(state, spot_id)
 
-    state['last_alert_time'] = now.isoformat()
-    state['last_alert_condition'] = f"NW {wind_speed:.1f} km/h"
-    state['alert_count_today'] = state.get('alert_count_today', 0) + 1
+        # Reset counter if new day
+        if record.get('last_reset_date') != today:
+            record['alert_count_today'] = 0
+            record['last_reset_date'] = today
 
-    if message:
-        state['last_message'] = message
+        record['last_alert_time'] = now.isoformat()
+        record['last_alert_condition'] = f"NW {wind_speed:.1f} km/h"
+        record['alert_count_today'] = record.get('alert_count_today', 0) + 1
+
+        if message:
+            record['last_message'] = message
+        log.info(f"State updated{f' for {spot_id}' if spot_id else ''}: "
+                 f"alert #{record['alert_count_today']} today")
 
     save_state(state)
-    log.info(f"State updated: alert #{state['alert_count_today']} today")
\ No newline at end of file
+
+def cooldown_status(current_state: Optional[Dict] = None, spot_id: Optional[str] = None) -> Dict:
+    """
+    Summarize deduplication state without changing it.
+
+    Returns:
+        Dict with the last alert time, today's count and limit, and hours
+        left in the cooldown (0 if none) for the spot
+    """
+    if current_state is None:
+        current_state = load_state()
+    if spot_id is not None and spot_id != DEFAULT_SPOT_ID:
+        current_state = current_state.get('spots', {}).get(spot_id) or _default_record()
+
+    now = datetime.now()
+    alerts_today = current_state.get('alert_count_today', 0)
+    if current_state.get('last_reset_date') != now.date().isoformat():
+        alerts_today = 0
+
+    remaining = 0.0
+    try:
+        last_alert = datetime.fromisoformat(current_state.get('last_alert_time', '2000-01-01'))
+        remaining = max(0.0, ALERT_COOLDOWN_HOURS - (now - last_alert).total_seconds() / 3600)
+    except (ValueError, TypeError) as e:
+        log.warning(f"Error parsing last alert time: {e}")
+
+    return {
+        'last_alert_time': current_state.get('last_alert_time'),
+        'alerts_today': alerts_today,
+        'daily_limit': DAILY_ALERT_LIMIT,
+        'cooldown_remaining_hours': round(remaining, 2)
+    }
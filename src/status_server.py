@@ -0,0 +1,116 @@
+"""
+Built-in status endpoint.
+
+A small HTTP server running alongside the daemon loop serves the latest
+reading, alert decision and cooldown status as JSON. Each cycle publishes
+an immutable snapshot with its body, gzip body and ETag computed once, and
+swaps it in with a single reference assignment, so requests never touch
+the state file or upstream APIs and never see a half-updated status.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from .config import STATUS_HOST
+
+log = logging.getLogger(__name__)
+
+STATUS_PATHS = ('/', '/status')
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Pre-rendered status response."""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+def build_snapshot(status: Dict) -> Snapshot:
+    """Render a status dict into its JSON, gzip and ETag forms."""
+    body = json.dumps(status, sort_keys=True, default=str).encode('utf-8')
+    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+    return Snapshot(body, gzip.compress(body, mtime=0), etag)
+
+
+_snapshot = build_snapshot({'status': 'starting'})
+
+
+def publish_snapshot(status: Dict) -> Snapshot:
+    """Replace the served status (one atomic reference swap)."""
+    global _snapshot
+    _snapshot = build_snapshot(status)
+    return _snapshot
+
+
+def current_snapshot() -> Snapshot:
+    return _snapshot
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Serves the current snapshot; honours If-None-Match and gzip."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, include_body: bool) -> None:
+        if self.path.split('?', 1)[0] not in STATUS_PATHS:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        snapshot = _snapshot
+        if snapshot.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', snapshot.etag)
+            self.end_headers()
+            return
+
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = snapshot.gzip_body if use_gzip else snapshot.body
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', snapshot.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def log_message(self, format, *args):
+        log.debug(f"{self.address_string()} {format % args}")
+
+
+def start_status_server(port: int, host: str = STATUS_HOST) -> ThreadingHTTPServer:
+    """
+    Start serving status in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='status-server', daemon=True)
+    thread.start()
+    log.info(f"Status endpoint listening on http://{host}:{server.server_address[1]}/status")
+    return server
@@ -0,0 +1,201 @@
+"""
+Subscriber matching index.
+
+For each spot and compass point the index keeps subscribers' minimum speeds
+in a sorted array, so "who is satisfied by 38 km/h from 300°" is a bisect
+into one array plus a walk over the k matches: O(log n + k) instead of
+checking every subscriber. A rule is filed under every compass point its
+sectors touch, and the k candidates are then checked in one NumPy pass
+against the rules compiled into an alert_rules.RuleSet (exact sectors as
+in_sectors tests them, maximum speed, hours and days). The RuleSet is
+recompiled only after rules change. Per-sector bitmaps record
+which subscriber slots cover each compass point, so adds and removes touch
+only the sectors a rule actually uses and empty sectors are skipped
+without a lookup.
+
+The index updates incrementally as the registry changes. Rules on a spot's
+own sectors reuse the compass point mask the spot computed at load, and
+each rule's mask is kept so removing it doesn't recompute it.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .alert_rules import RuleSet, compile_rules, parse_rule
+from .spot_registry import COMPASS_POINTS, compass_index, sectors_to_mask
+
+log = logging.getLogger(__name__)
+
+# (min_speed, max_speed, sectors, hour_mask, day_mask); see alert_rules.parse_rule
+Rule = Tuple[float, float, tuple, int, int]
+
+# Sorts after any subscriber id, so bisect_right includes every entry at a threshold
+_MAX_ID = '\uffff'
+
+
+class SubscriberIndex:
+    """Sorted per-(spot, sector) threshold arrays with per-sector bitmaps."""
+
+    def __init__(self):
+        # (spot, point) -> sorted list of (min_speed, subscriber id)
+        self._keys: Dict[Tuple[str, int], List[Tuple[float, str]]] = {}
+        # spot -> one bitmap of subscriber slots per compass point
+        self._sector_bitmaps: Dict[str, List[int]] = {}
+        self._rules: Dict[Tuple[str, str], Rule] = {}
+        self._masks: Dict[Tuple[str, str], int] = {}
+        self._slots: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._rule_counts: Dict[str, int] = {}
+        self._compiled: Optional[RuleSet] = None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _slot(self, subscriber_id: str) -> int:
+        if subscriber_id not in self._slots:
+            self._slots[subscriber_id] = self._free_slots.pop() if self._free_slots else len(self._slots)
+        return self._slots[subscriber_id]
+
+    def add(self, subscriber_id: str, spot_id: str, rule: Rule, sector_mask: Optional[int] = None) -> None:
+        """
+        Index a subscriber's rule for a spot (replacing any previous rule).
+
+        sector_mask is the rule's compass point mask if already known (the
+        spot's own, for rules on the spot's sectors); otherwise it is computed.
+        """
+        if (subscriber_id, spot_id) in self._rules:
+            self.remove(subscriber_id, spot_id)
+
+        min_speed, _, sectors, _, _ = rule
+        if sector_mask is None:
+            sector_mask = sectors_to_mask(sectors)
+        bit = 1 << self._slot(subscriber_id)
+        bitmaps = self._sector_bitmaps.setdefault(spot_id, [0] * COMPASS_POINTS)
+
+        for point in range(COMPASS_POINTS):
+            if sector_mask >> point & 1:
+                insort(self._keys.setdefault((spot_id, point), []), (min_speed, subscriber_id))
+                bitmaps[point] |= bit
+        self._rules[(subscriber_id, spot_id)] = rule
+        self._masks[(subscriber_id, spot_id)] = sector_mask
+        self._rule_counts[subscriber_id] = self._rule_counts.get(subscriber_id, 0) + 1
+        self._compiled = None
+
+    def remove(self, subscriber_id: str, spot_id: str) -> None:
+        """Drop a subscriber's rule for a spot."""
+        rule = self._rules.pop((subscriber_id, spot_id), None)
+        if rule is None:
+            return
+        self._compiled = None
+
+        min_speed = rule[0]
+        sector_mask = self._masks.pop((subscriber_id, spot_id))
+        bit = 1 << self._slots[subscriber_id]
+        bitmaps = self._sector_bitmaps[spot_id]
+
+        for point in range(COMPASS_POINTS):
+            if sector_mask >> point & 1:
+                entries = self._keys[(spot_id, point)]
+                del entries[bisect_left(entries, (min_speed, subscriber_id))]
+                bitmaps[point] &= ~bit
+
+        self._rule_counts[subscriber_id] -= 1
+        if not self._rule_counts[subscriber_id]:
+            # Last rule gone, free the bitmap slot for reuse
+            del self._rule_counts[subscriber_id]
+            self._free_slots.append(self._slots.pop(subscriber_id))
+
+    def query(self, spot_id: str, speed: float, direction: float,
+              when: Optional[datetime] = None) -> List[str]:
+        """
+        Subscribers whose rules are satisfied by a reading.
+
+        Args:
+            spot_id: Spot the reading is for
+            speed: Wind speed in km/h
+            direction: Wind direction in degrees
+            when: If given, also apply the rules' hour and day windows
+
+        Returns:
+            Matching subscriber ids, lowest threshold first
+        """
+        point = compass_index(direction)
+        bitmaps = self._sector_bitmaps.get(spot_id)
+        if not bitmaps or not bitmaps[point]:
+            return []
+
+        entries = self._keys[(spot_id, point)]
+        k = bisect_right(entries, (speed, _MAX_ID))
+        if not k:
+            return []
+
+        compiled = self.compiled()
+        candidates = [subscriber_id for _, subscriber_id in entries[:k]]
+        rows = np.fromiter((compiled.rows[(subscriber_id, spot_id)] for subscriber_id in candidates),
+                           dtype=np.int64, count=k)
+        matched = compiled.match(rows, speed, direction, when)
+        return [subscriber_id for subscriber_id, hit in zip(candidates, matched) if hit]
+
+    def compiled(self) -> RuleSet:
+        """Every indexed rule as a RuleSet, recompiled after rules change."""
+        if self._compiled is None:
+            self._compiled = compile_rules(self._rules.items())
+        return self._compiled
+
+    def sector_members(self, spot_id: str, direction: float) -> int:
+        """Bitmap of subscriber slots with a rule touching a direction's compass point."""
+        bitmaps = self._sector_bitmaps.get(spot_id)
+        return bitmaps[compass_index(direction)] if bitmaps else 0
+
+    def sync(self, registry) -> Tuple[int, int]:
+        """
+        Bring the index in line with a registry, touching only changed rules.
+
+        Returns:
+            (rules added or changed, rules removed)
+        """
+        wanted = {}
+        spot_masks = {}
+        for subscriber in registry.subscribers.values():
+            for spot_id in subscriber.spot_ids:
+                spot = registry.get(spot_id)
+                try:
+                    rule = parse_rule(subscriber.rule, spot.threshold_kmh, spot.sectors)
+                    wanted[(subscriber.id, spot_id)] = rule
+                    if rule[2] == spot.sectors:
+                        spot_masks[(subscriber.id, spot_id)] = spot.sector_mask
+                except ValueError as e:
+                    log.error(f"Skipping rule for subscriber '{subscriber.id}': {e}")
+
+        removed = [key for key in self._rules if key not in wanted]
+        for subscriber_id, spot_id in removed:
+            self.remove(subscriber_id, spot_id)
+
+        changed = 0
+        for (subscriber_id, spot_id), rule in wanted.items():
+            if self._rules.get((subscriber_id, spot_id)) != rule:
+                self.add(subscriber_id, spot_id, rule, spot_masks.get((subscriber_id, spot_id)))
+                changed += 1
+
+        if changed or removed:
+            log.info(f"Subscriber index updated: {changed} rule(s) added/changed, {len(removed)} removed")
+        return changed, len(removed)
+
+
+_indexes: Dict[int, Tuple[int, SubscriberIndex]] = {}
+
+
+def get_index(registry) -> SubscriberIndex:
+    """Index for a registry, synced incrementally whenever it reloads."""
+    cached = _indexes.get(id(registry))
+    if cached is None:
+        cached = (0, SubscriberIndex())
+    version, index = cached
+    if version != registry.version:
+        index.sync(registry)
+        _indexes[id(registry)] = (registry.version, index)
+    return index
@@ -4,6 +4,8 @@ Unit conversion utilities for wind speed.
 As specified in Phase C Section 6: Unit Normalization
 """
 
+from typing import Optional
+
 # Conversion functions as specified in the plan
 CONVERSIONS = {
     'kmh_to_ms': lambda x: x / 3.6,
@@ -45,6 +47,44 @@ def convert_wind_speed(value: float, from_unit: str, to_unit: str) -> float:
     else:
         return kmh_value
 
+# How each convert_wind_speed unit is written in messages
+DISPLAY_LABELS = {'kmh': 'km/h', 'ms': 'm/s', 'knots': 'kn'}
+
+def format_speed(speed_kmh: float, unit: str = 'kmh') -> str:
+    """Write a km/h speed in the given unit for a message (e.g. '38km/h', '21kn')."""
+    return f"{convert_wind_speed(speed_kmh, 'kmh', unit):.0f}{DISPLAY_LABELS[unit]}"
+
+# Unit labels used by data sources, mapped to convert_wind_speed units
+UNIT_LABELS = {
+    'km/h': 'kmh', 'kmh': 'kmh', 'kph': 'kmh',
+    'm/s': 'ms', 'ms': 'ms',
+    'kn': 'knots', 'kt': 'knots', 'knots': 'knots'
+}
+
+def parse_unit_label(label: str) -> str:
+    """
+    Map a source's unit label (e.g. 'km/h', 'kn') to a convert_wind_speed unit.
+
+    Raises:
+        ValueError: If the unit isn't supported
+    """
+    unit = UNIT_LABELS.get(label.strip().lower())
+    if unit is None:
+        raise ValueError(f"Unsupported wind speed unit '{label}'")
+    return unit
+
+# 16-point compass rose
+COMPASS_DEGREES = {
+    'N': 0.0, 'NNE': 22.5, 'NE': 45.0, 'ENE': 67.5,
+    'E': 90.0, 'ESE': 112.5, 'SE': 135.0, 'SSE': 157.5,
+    'S': 180.0, 'SSW': 202.5, 'SW': 225.0, 'WSW': 247.5,
+    'W': 270.0, 'WNW': 292.5, 'NW': 315.0, 'NNW': 337.5
+}
+
+def compass_to_degrees(text: str, default: Optional[float] = None) -> Optional[float]:
+    """Convert a compass point (e.g. 'NW') to degrees, or default if unknown."""
+    return COMPASS_DEGREES.get(text.strip().upper(), default)
+
 # Reference values from the plan:
 # 1 m/s = 3.6 km/h = 1.944 knots
-# 25 km/h = 6.944 m/s = 13.499 knots
\ No newline at end of file
+# 25 km/h = 6.944 m/s = 13.499 knots
@@ -0,0 +1,213 @@
+"""
+Pluggable weather sources.
+
+A source is a WeatherSource subclass registered by name. It declares the
+unit its speeds come in and, for fixed stations (buoys, lighthouses,
+private anemometers), where it is and how far from a spot it may be used.
+Each source has two steps:
+
+    fetch(coordinates)  async; returns the raw payload (JSON, XML, text...)
+    parse(payload)      generator of WindReading in the declared unit,
+                        current reading first
+
+Only the first reading is taken, so a parser that yields as it goes never
+walks the rest of a long series. Sources with a blocking client only need
+to implement fetch_sync(); the default fetch() runs it on a shared thread
+pool so several sources can be awaited concurrently when merging.
+
+Extra sources are added by listing their modules in WEATHER_SOURCE_PLUGINS;
+importing a module is expected to call register_source().
+"""
+
+import asyncio
+import importlib
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import WEATHER_SOURCE_PLUGINS, SOURCE_MERGE, SOURCE_FETCH_WORKERS
+from .readings import Source, WindReading
+from .unit_conversions import convert_wind_speed, parse_unit_label
+
+log = logging.getLogger(__name__)
+
+MERGE_POLICIES = ('first', 'mean')
+
+# Blocking fetches run here rather than on asyncio's default executor, so
+# asyncio.run() doesn't wait for slow sources whose results were not needed
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=SOURCE_FETCH_WORKERS, thread_name_prefix='weather-source')
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance between two (lat, lon) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+class WeatherSource:
+    """
+    Base class for weather source plugins.
+
+    Attributes:
+        name: Registry name, also used for source health
+        kind: Source recorded on readings
+        speed_unit: Unit label of parsed speeds ('km/h', 'm/s', 'kn')
+        location: (lat, lon) of a fixed station, or None if it serves any point
+        max_distance_km: Only use a fixed station for spots this close (None = any)
+        timeout: Seconds allowed for fetch()
+    """
+    name: str = ''
+    kind: Source = Source.STATION
+    speed_unit: str = 'km/h'
+    location: Optional[Tuple[float, float]] = None
+    max_distance_km: Optional[float] = None
+    timeout: float = 10.0
+
+    def serves(self, coordinates: Dict) -> bool:
+        """Check if this source can report for a spot."""
+        if self.location is None or self.max_distance_km is None:
+            return True
+        return distance_km(self.location, (coordinates['lat'], coordinates['lon'])) <= self.max_distance_km
+
+    async def fetch(self, coordinates: Dict) -> Any:
+        """Fetch the raw payload for a spot."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(FETCH_EXECUTOR, self.fetch_sync, coordinates)
+
+    def fetch_sync(self, coordinates: Dict) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} must implement fetch() or fetch_sync()")
+
+    def parse(self, payload: Any) -> Iterator[WindReading]:
+        raise NotImplementedError(f"{type(self).__name__} must implement parse()")
+
+    def first_reading(self, payload: Any) -> WindReading:
+        """
+        Take the current reading from a payload, converted to km/h.
+
+        Raises:
+            ValueError: If the payload holds no reading
+        """
+        for reading in self.parse(payload):
+            unit = parse_unit_label(self.speed_unit)
+            return WindReading(convert_wind_speed(reading.speed, unit, 'kmh'), reading.direction,
+                               reading.source, reading.observed_at)
+        raise ValueError(f"No reading in {self.name} response")
+
+
+_SOURCES: Dict[str, WeatherSource] = {}
+_loaded_plugins = set()
+
+
+def register_source(source: WeatherSource) -> WeatherSource:
+    """Register a source instance under its name (replacing any previous one)."""
+    if not source.name:
+        raise ValueError("Weather sources need a name")
+    parse_unit_label(source.speed_unit)
+    _SOURCES[source.name] = source
+    return source
+
+
+def unregister_source(name: str) -> None:
+    _SOURCES.pop(name, None)
+
+
+def load_plugins(modules: str = WEATHER_SOURCE_PLUGINS) -> None:
+    """Import the configured plugin modules (each only once)."""
+    for module in filter(None, (m.strip() for m in modules.split(','))):
+        if module in _loaded_plugins:
+            continue
+        _loaded_plugins.add(module)
+        try:
+            importlib.import_module(module)
+            log.info(f"Loaded weather source plugin {module}")
+        except Exception as e:
+            log.error(f"Error loading weather source plugin {module}: {e}")
+
+
+def get_source(name: str) -> WeatherSource:
+    load_plugins()
+    try:
+        return _SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown weather source: {name}") from None
+
+
+def registered_sources() -> List[str]:
+    """Names of registered sources, in registration (declared priority) order."""
+    load_plugins()
+    return list(_SOURCES)
+
+
+def merge_readings(readings: Sequence[WindReading]) -> Optional[WindReading]:
+    """
+    Combine readings from several sources: mean speed, circular-mean direction.
+
+    A single reading is returned unchanged.
+    """
+    if not readings:
+        return None
+    if len(readings) == 1:
+        return readings[0]
+    speed = sum(r.speed for r in readings) / len(readings)
+    sin = sum(math.sin(math.radians(r.direction)) for r in readings)
+    cos = sum(math.cos(math.radians(r.direction)) for r in readings)
+    direction = math.degrees(math.atan2(sin, cos)) % 360
+    times = [r.observed_at for r in readings if r.observed_at is not None]
+    return WindReading(speed, direction, Source.MERGED, max(times) if times else None)
+
+
+async def _read_source(source: WeatherSource, coordinates: Dict, health) -> Optional[WindReading]:
+    started = time.monotonic()
+    try:
+        log.info(f"Fetching wind data from {source.name}")
+        payload = await asyncio.wait_for(source.fetch(coordinates), source.timeout)
+        reading = source.first_reading(payload)
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        health.record_failure(source.name, time.monotonic() - started)
+        log.warning(f"{source.name} timed out after {source.timeout:g}s")
+        return None
+    except Exception as e:
+        health.record_failure(source.name, time.monotonic() - started)
+        log.warning(f"{source.name} failed: {e}")
+        return None
+    health.record_success(source.name, time.monotonic() - started)
+    return reading
+
+
+async def fetch_readings(coordinates: Dict, sources: Sequence[WeatherSource], health,
+                         merge: str = SOURCE_MERGE) -> Optional[WindReading]:
+    """
+    Fetch from several sources and merge the results.
+
+    With merge='first' sources are tried one at a time in the given order,
+    each bounded by its own timeout; a lower-ranked source is only requested
+    once every source ahead of it has failed or timed out. With merge='mean'
+    every source starts at once and all successful readings are combined.
+
+    Returns:
+        The merged reading, or None if every source failed
+    """
+    if merge not in MERGE_POLICIES:
+        raise ValueError(f"Unknown source merge policy: {merge}")
+
+    if merge == 'first':
+        for source in sources:
+            reading = await _read_source(source, coordinates, health)
+            if reading is not None:
+                return reading
+        return None
+
+    tasks = [asyncio.create_task(_read_source(source, coordinates, health)) for source in sources]
+    try:
+        return merge_readings([r for r in await asyncio.gather(*tasks) if r is not None])
+    finally:
+        for task in tasks:
+            task.cancel()
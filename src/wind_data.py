@@ -1,41 +1,69 @@
+import asyncio
 import requests
 import xml.etree.ElementTree as ET
 import logging
-from typing import Dict, Optional
-from .config import COORDINATES
+from typing import Dict, Iterator, Optional, Sequence
+from .config import COORDINATES, RESPONSE_CACHE_TTL_SECONDS, WEATHER_SOURCES, ECCC_MAX_DISTANCE_KM
+from .unit_conversions import compass_to_degrees
+from .readings import Source, WindReading
+from .response_cache import get_or_fetch
+from .source_health import load_health
+from .weather_sources import WeatherSource, fetch_readings, get_source, register_source, registered_sources
 
 log = logging.getLogger(__name__)
 
-def parse_openmeteo(data: Dict) -> Dict:
-    """Parse Open-Meteo API response."""
-    try:
-        # Get the first (current) hour data
+class OpenMeteoSource(WeatherSource):
+    """Open-Meteo forecast model data for the spot's own coordinates."""
+    name = 'open-meteo'
+    kind = Source.OPEN_METEO
+    speed_unit = 'km/h'
+
+    def fetch_sync(self, coordinates: Dict) -> Dict:
+        response = requests.get(
+            'https://api.open-meteo.com/v1/forecast',
+            params={
+                'latitude': coordinates['lat'],
+                'longitude': coordinates['lon'],
+                'hourly': 'wind_speed_10m,wind_direction_10m',
+                'wind_speed_unit': 'kmh',
+                'forecast_hours': 1
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def parse(self, data: Dict) -> Iterator[WindReading]:
+        """Yield hourly readings, current hour first."""
         hourly = data.get('hourly', {})
-        wind_speed = hourly.get('wind_speed_10m', [None])[0]
-        wind_direction = hourly.get('wind_direction_10m', [None])[0]
+        for wind_speed, wind_direction in zip(hourly.get('wind_speed_10m', []),
+                                              hourly.get('wind_direction_10m', [])):
+            if wind_speed is None or wind_direction is None:
+                raise ValueError("Missing wind data in response")
+            yield WindReading(float(wind_speed), float(wind_direction), self.kind)
 
-        if wind_speed is None or wind_direction is None:
-            raise ValueError("Missing wind data in response")
 
-        return {
-            'speed': float(wind_speed),
-            'direction': float(wind_direction),
-            'source': 'open-meteo'
-        }
-    except (KeyError, IndexError, ValueError) as e:
-        log.error(f"Error parsing Open-Meteo data: {e}")
-        raise
+class EcccSource(WeatherSource):
+    """
+    Environment Canada MSC Datamart observations from YVR (Vancouver International Airport).
 
-def fetch_eccc_data() -> Dict:
-    """Fetch wind data from Environment Canada MSC Datamart (fallback)."""
-    try:
-        # Using YVR (Vancouver International Airport) as closest reliable station
+    A single fixed station, so it only serves spots within ECCC_MAX_DISTANCE_KM.
+    """
+    name = 'eccc'
+    kind = Source.ECCC
+    speed_unit = 'km/h'
+    location = (49.1947, -123.1839)
+    max_distance_km = ECCC_MAX_DISTANCE_KM
+
+    def fetch_sync(self, coordinates: Dict) -> str:
+        # YVR is the closest reliable station to the spots it serves
         url = "https://dd.weather.gc.ca/observations/xml/BC/hourly/YVR_e.xml"
-        response = requests.get(url, timeout=10)
+        response = requests.get(url, timeout=self.timeout)
         response.raise_for_status()
+        return response.text
 
-        # Parse XML
-        root = ET.fromstring(response.text)
+    def parse(self, text: str) -> Iterator[WindReading]:
+        root = ET.fromstring(text)
 
         # Find wind elements (using XPath)
         wind_speed_elem = root.find(".//windSpeed")
@@ -52,48 +80,100 @@ def fetch_eccc_data() -> Dict:
         if wind_dir_text and wind_dir_text.isdigit():
             wind_direction = float(wind_dir_text)
         else:
-            # Convert compass to degrees (simple mapping for NW winds)
-            compass_to_degrees = {
-                'N': 0, 'NNE': 22.5, 'NE': 45, 'ENE': 67.5,
-                'E': 90, 'ESE': 112.5, 'SE': 135, 'SSE': 157.5,
-                'S': 180, 'SSW': 202.5, 'SW': 225, 'WSW': 247.5,
-                'W': 270, 'WNW': 292.5, 'NW': 315, 'NNW': 337.5
-            }
-            wind_direction = compass_to_degrees.get(wind_dir_text, 0)
-
-        return {
-            'speed': wind_speed,
-            'direction': wind_direction,
-            'source': 'eccc'
-        }
-    except Exception as e:
-        log.error(f"Error fetching ECCC data: {e}")
+            # Convert compass to degrees
+            wind_direction = compass_to_degrees(wind_dir_text or '', default=0)
+
+        yield WindReading(float(wind_speed), float(wind_direction), self.kind)
+
+
+# Built-in sources, registered in declared priority order; the order actually
+# tried adapts to source health
+OPEN_METEO = register_source(OpenMeteoSource())
+ECCC = register_source(EcccSource())
+
+def parse_openmeteo(data: Dict) -> WindReading:
+    """Parse Open-Meteo API response (current hour)."""
+    try:
+        return OPEN_METEO.first_reading(data)
+    except (KeyError, IndexError, ValueError) as e:
+        log.error(f"Error parsing Open-Meteo data: {e}")
         raise
 
-def fetch_wind_data() -> Optional[Dict]:
-    """Fetch wind data from Open-Meteo with ECCC fallback."""
-    # Primary: Open-Meteo
+def fetch_eccc_data() -> WindReading:
+    """Fetch wind data from Environment Canada MSC Datamart (fallback)."""
     try:
-        response = requests.get(
-            'https://api.open-meteo.com/v1/forecast',
-            params={
-                'latitude': COORDINATES['lat'],
-                'longitude': COORDINATES['lon'],
-                'hourly': 'wind_speed_10m,wind_direction_10m',
-                'wind_speed_unit': 'kmh',
-                'forecast_hours': 1
-            },
-            timeout=10
-        )
-        if response.status_code == 200:
-            return parse_openmeteo(response.json())
+        return ECCC.first_reading(ECCC.fetch_sync(COORDINATES))
     except Exception as e:
-        log.warning(f"Open-Meteo failed: {e}")
+        log.error(f"Error fetching ECCC data: {e}")
+        raise
+
+def fetch_wind_data(coordinates: Optional[Dict] = None) -> Optional[WindReading]:
+    """
+    Fetch wind data from the registered sources (Open-Meteo, then ECCC by default).
+
+    Sources are ordered by health (see fetch_wind_data_uncached). Results
+    are shared through the on-disk response cache, so overlapping runs for
+    the same location make a single upstream fetch.
+    """
+    if coordinates is None:
+        coordinates = COORDINATES
+
+    def fetch():
+        reading = fetch_wind_data_uncached(coordinates)
+        return reading.to_dict() if reading else None
+
+    key = f"wind:{coordinates['lat']:.4f},{coordinates['lon']:.4f}"
+    cached = get_or_fetch(key, fetch, RESPONSE_CACHE_TTL_SECONDS)
+    return WindReading.from_dict(cached) if cached else None
+
+def fetch_wind_data_uncached(coordinates: Dict) -> Optional[WindReading]:
+    """
+    Fetch wind data from the upstream sources, bypassing the cache.
+
+    Runs fetch_wind_data_async to completion; see there.
+    """
+    return asyncio.run(fetch_wind_data_async(coordinates))
+
+async def fetch_wind_data_async(coordinates: Dict, names: Optional[Sequence[str]] = None) -> Optional[WindReading]:
+    """
+    Fetch wind data from the upstream sources concurrently, bypassing the cache.
+
+    Sources (WEATHER_SOURCES, or every registered source) that serve the
+    coordinates are ranked by observed cost, skipping any whose circuit
+    breaker is open, and fetched per SOURCE_MERGE: in rank order until one
+    succeeds ('first') or all together ('mean'), each under its own
+    timeout. If every circuit is open, all sources are tried anyway rather
+    than giving up without a reading.
+    """
+    if names is None:
+        names = [n.strip() for n in WEATHER_SOURCES.split(',') if n.strip()] or registered_sources()
+    sources = {}
+    for name in names:
+        try:
+            source = get_source(name)
+        except ValueError as e:
+            log.error(str(e))
+            continue
+        if source.serves(coordinates):
+            sources[name] = source
+
+    health = load_health()
+    ranked = health.ranked(sources)
+    candidates = [name for name in ranked if health.allow(name)]
+    if not candidates:
+        log.warning("All source circuits open, trying every source")
+        candidates = ranked
+
+    for name in ranked:
+        if name not in candidates:
+            log.info(f"Skipping {name} (circuit open)")
 
-    # Fallback: ECCC
     try:
-        log.info("Attempting ECCC fallback")
-        return fetch_eccc_data()
-    except Exception as e:
-        log.error(f"All weather sources failed: {e}")
-        return None
\ No newline at end of file
+        reading = await fetch_readings(coordinates, [sources[name] for name in candidates], health)
+        if reading is None:
+            log.error("All weather sources failed")
+        return reading
+    finally:
+        for name in sources:
+            log.debug(f"Source health {health.summary(name)}")
+        health.save()
@@ -0,0 +1,113 @@
+"""
+Unit tests for per-subscriber alert rules and their compiled matcher.
+"""
+
+import unittest
+import sys
+import os
+import random
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.alert_rules import parse_rule, compile_rules, ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS
+from src.spot_registry import in_sectors
+
+WEST_TO_NORTH = ((247.5, 22.5),)
+
+# Saturday 2025-01-18 at 09:00
+SATURDAY_9AM = datetime(2025, 1, 18, 9, 0)
+
+
+class TestRuleParsing(unittest.TestCase):
+    """Test the rule language."""
+
+    def test_defaults(self):
+        """Test an empty rule uses the spot defaults."""
+        self.assertEqual(parse_rule('', 35, WEST_TO_NORTH), (35, float('inf'), WEST_TO_NORTH, ALL_HOURS, ALL_DAYS))
+
+    def test_full_rule(self):
+        """Test every term in one rule."""
+        min_s, max_s, sectors, hours, days = parse_rule(
+            'speed>=30 speed<=60 dir=W-N hours=6-20 days=sat,sun', 35, WEST_TO_NORTH)
+        self.assertEqual((min_s, max_s), (30, 60))
+        self.assertEqual(sectors, ((270.0, 0.0),))
+        self.assertEqual(hours, sum(1 << h for h in range(6, 20)))
+        self.assertEqual(days, (1 << 5) | (1 << 6))
+
+    def test_wrapping_ranges(self):
+        """Test hour and day ranges that wrap around."""
+        _, _, _, hours, days = parse_rule('hours=22-2 days=fri-mon', 35, WEST_TO_NORTH)
+        self.assertEqual(hours, sum(1 << h for h in (22, 23, 0, 1)))
+        self.assertEqual(days, sum(1 << d for d in (4, 5, 6, 0)))
+
+    def test_direction_list_and_degrees(self):
+        """Test compass lists and degree sectors."""
+        self.assertEqual(parse_rule('dir=NW,W', 35, ())[2], ((303.75, 326.25), (258.75, 281.25)))
+        self.assertEqual(parse_rule('dir=250-20', 35, ())[2], ((250.0, 20.0),))
+
+    def test_sectors_are_continuous(self):
+        """Test rule directions are checked like spot sectors, not by nearest compass point."""
+        sectors = parse_rule('dir=250-20', 35, ())[2]
+        self.assertFalse(in_sectors(245, sectors))  # nearest point W would have matched
+        self.assertTrue(in_sectors(252, sectors))
+        self.assertTrue(in_sectors(100, ALL_DIRECTIONS))
+
+    def test_invalid_rules(self):
+        """Test malformed rules raise ValueError."""
+        for rule in ('wind>=3', 'speed=fast', 'hours=5-30', 'days=funday', 'dir>=W'):
+            with self.assertRaises(ValueError):
+                parse_rule(rule, 35, ALL_DIRECTIONS)
+
+
+class TestRuleSet(unittest.TestCase):
+    """Test the compiled column-array matcher."""
+
+    def compile(self, rules):
+        return compile_rules(((f"s{i}", 'wb'), parse_rule(rule, 35, WEST_TO_NORTH)) for i, rule in enumerate(rules))
+
+    def test_each_criterion_filters(self):
+        """Test speed, direction, hour and day criteria in one pass."""
+        rules = self.compile([
+            '',                        # spot default: >= 35 from W-N
+            'speed>=30',               # lower threshold
+            'speed>=30 speed<=36',     # capped
+            'speed>=30 days=mon-fri',  # weekdays only
+            'speed>=30 hours=10-18',   # later in the day
+            'speed>=30 dir=S',         # wrong direction
+            'speed>=30 dir=S,NW',      # one of several sectors
+        ])
+        matched = rules.match(np.arange(len(rules)), 38, 315, SATURDAY_9AM)
+        self.assertEqual([rules.keys[i][0] for i in np.flatnonzero(matched)], ['s0', 's1', 's6'])
+        self.assertEqual(rules.rows[('s6', 'wb')], 6)
+
+    def test_subset_of_rows(self):
+        """Test only the requested rows are checked, in the order given."""
+        rules = self.compile(['speed>=10', 'speed>=50', 'speed>=20'])
+        self.assertEqual(rules.match(np.array([2, 1]), 30, 315).tolist(), [True, False])
+        self.assertEqual(rules.match(np.array([], dtype=np.int64), 30, 315).tolist(), [])
+
+    def test_vectorized_matches_scalar(self):
+        """Test the NumPy pass agrees with a per-rule Python check."""
+        rng = random.Random(7)
+        rules = []
+        for i in range(5000):
+            lo = rng.uniform(10, 50)
+            sectors = tuple((rng.uniform(0, 360), rng.uniform(0, 360)) for _ in range(rng.randint(0, 3)))
+            rules.append(((f"s{i}", 'wb'), (lo, lo + rng.uniform(0, 40), sectors,
+                                            rng.getrandbits(24), rng.getrandbits(7))))
+        compiled = compile_rules(rules)
+
+        for speed, direction in ((33.0, 300.0), (45.0, 10.0), (25.0, 0.0)):
+            result = compiled.match(np.arange(len(compiled)), speed, direction, SATURDAY_9AM)
+            for i, (_, (lo, hi, sectors, hours, days)) in enumerate(rules):
+                expected = (lo <= speed <= hi and in_sectors(direction, sectors)
+                            and bool(hours >> 9 & 1) and bool(days >> 5 & 1))
+                self.assertEqual(bool(result[i]), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unit tests for the client and resource registry.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import clients
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test lazy creation, reuse and reset of shared clients."""
+
+    def setUp(self):
+        """Start each test with an empty registry."""
+        clients.reset_all_clients()
+        self.addCleanup(clients.reset_all_clients)
+
+    def test_twilio_client_reused(self):
+        """Test the Twilio client is created once and reused."""
+        first = clients.get_twilio_client()
+        self.assertIs(clients.get_twilio_client(), first)
+        self.assertEqual(clients.client_health()['twilio']['uses'], 2)
+
+    def test_reset_creates_new_client(self):
+        """Test reset drops the client so the next call rebuilds it."""
+        first = clients.get_twilio_client()
+        clients.reset_client('twilio')
+        self.assertNotIn('twilio', clients.client_health())
+        self.assertIsNot(clients.get_twilio_client(), first)
+
+    def test_openai_client_rebuilt_on_key_change(self):
+        """Test a different API key gets a new OpenAI client."""
+        first = clients.get_openai_client('sk-one')
+        self.assertIs(clients.get_openai_client('sk-one'), first)
+        self.assertIsNot(clients.get_openai_client('sk-two'), first)
+
+    def test_system_prompt_read_once(self):
+        """Test the prompt file is read from disk only once."""
+        with patch.object(clients.Path, 'read_text', return_value="prompt") as mock_read:
+            self.assertEqual(clients.get_system_prompt(), "prompt")
+            self.assertEqual(clients.get_system_prompt(), "prompt")
+        self.assertEqual(mock_read.call_count, 1)
+
+    def test_error_counts(self):
+        """Test errors are reported by client_health."""
+        clients.get_twilio_client()
+        clients.record_client_error('twilio')
+        self.assertEqual(clients.client_health()['twilio']['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
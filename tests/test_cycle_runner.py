@@ -0,0 +1,191 @@
+"""
+Unit tests for the concurrent multi-spot cycle runner.
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cycle_runner import CycleRunner
+from src.readings import Source, WindReading
+
+
+def make_spot(spot_id, lat=49.26, lon=-123.26):
+    return SimpleNamespace(id=spot_id, name=spot_id.title(), lat=lat, lon=lon, units='kmh')
+
+
+class Harness:
+    """Stage functions that record what the runner asked for."""
+
+    def __init__(self, speed=40.0, delay=0.0, recipients=('+1604',), fail_fetch=(), speeds=None):
+        self.speed = speed
+        self.speeds = speeds or {}
+        self.delay = delay
+        self.recipients = list(recipients)
+        self.fail_fetch = set(fail_fetch)
+        self.fetched = []
+        self.sent = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, spot):
+        with self.lock:
+            self.fetched.append(spot.id)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if spot.id in self.fail_fetch:
+                raise ConnectionError("down")
+            return WindReading(self.speeds.get(spot.id, self.speed), 315.0, Source.OPEN_METEO)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def evaluate(self, spot, reading):
+        return self.recipients if reading.speed >= 35 else None
+
+    def admit(self, spot, reading, recipients):
+        return None
+
+    def send(self, message, to):
+        self.sent.append((to, message))
+        return f'SM{len(self.sent)}'
+
+    def runner(self, **kwargs):
+        kwargs.setdefault('generate', lambda alerts: ','.join(a.spot_id for a in alerts))
+        kwargs.setdefault('digest_window', 0)
+        return CycleRunner(self.fetch, self.evaluate, self.admit, self.send, **kwargs)
+
+
+class TestCycleRunner(unittest.TestCase):
+    """Test running every spot through the stages."""
+
+    def test_spots_fetched_concurrently_within_limit(self):
+        """Test spots are fetched in parallel, bounded by the fetch semaphore."""
+        harness = Harness(delay=0.1)
+        spots = [make_spot(f's{i}', lat=49 + i) for i in range(8)]
+
+        started = time.monotonic()
+        report = harness.runner(limits={'fetch': 8}).run(spots)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(report.fetches, 8)
+
+        harness = Harness(delay=0.05)
+        harness.runner(limits={'fetch': 2}).run(spots)
+        self.assertEqual(harness.peak, 2)
+
+    def test_same_coordinates_share_fetch(self):
+        """Test spots at the same location are fetched once."""
+        harness = Harness()
+        report = harness.runner().run([make_spot('a'), make_spot('b'), make_spot('c', lat=50)])
+        self.assertEqual(report.fetches, 2)
+        self.assertEqual(len(harness.fetched), 2)
+        self.assertEqual(report.outcomes['b'].reading.speed, 40.0)
+
+    def test_one_digest_per_recipient(self):
+        """Test every spot that fired for a recipient goes out in one message."""
+        harness = Harness(recipients=('+1604', '+1778'))
+        report = harness.runner().run([make_spot('a'), make_spot('b', lat=50)])
+
+        self.assertEqual(report.digests, 2)
+        self.assertEqual(sorted(to for to, _ in harness.sent), ['+1604', '+1778'])
+        self.assertEqual(set(harness.sent[0][1].split(',')), {'a', 'b'})
+        self.assertEqual(report.decisions(), {'sent': 2})
+
+    def test_decisions(self):
+        """Test each spot's outcome is recorded."""
+        harness = Harness(fail_fetch={'down'}, speeds={'calm': 10.0})
+        harness.admit = lambda spot, reading, recipients: 'suppressed' if spot.id == 'quiet' else None
+        spots = [make_spot('down', lat=1), make_spot('quiet', lat=2), make_spot('go', lat=3), make_spot('calm', lat=4)]
+
+        report = harness.runner().run(spots)
+        self.assertEqual({s: o.decision for s, o in report.outcomes.items()},
+                         {'down': 'fetch_failed', 'quiet': 'suppressed', 'go': 'sent', 'calm': 'below_criteria'})
+
+    def test_admit_narrows_recipients(self):
+        """Test admit can hold some recipients back and alert the rest."""
+        harness = Harness(recipients=('+1604', '+1778'))
+        harness.admit = lambda spot, reading, recipients: ['+1778']
+        report = harness.runner().run([make_spot('a')])
+        self.assertEqual([to for to, _ in harness.sent], ['+1778'])
+        self.assertEqual(report.outcomes['a'].recipients, ('+1778',))
+
+    def test_force_skips_dedup(self):
+        """Test forced cycles don't consult dedup."""
+        harness = Harness()
+        harness.admit = lambda *args: 'suppressed'
+        self.assertEqual(harness.runner().run([make_spot('a')], force=True).sent, 1)
+
+    def test_send_failure(self):
+        """Test a failed send is reported against the spot."""
+        harness = Harness()
+        harness.send = lambda message, to: None
+        report = harness.runner().run([make_spot('a')])
+        self.assertEqual((report.sent, report.failed), (0, 1))
+        self.assertEqual(report.outcomes['a'].decision, 'send_failed')
+
+    def test_digests_dispatched_by_score(self):
+        """Test digests go through the dispatch queue, highest score first."""
+        harness = Harness(recipients=('+low', '+high', '+mid'))
+        scores = {'+low': 0.1, '+high': 2.0, '+mid': 1.0}
+        runner = harness.runner(score=lambda to, alerts: scores[to], limits={'send': 1})
+        report = runner.run([make_spot('a')])
+
+        self.assertEqual([to for to, _ in harness.sent], ['+high', '+mid', '+low'])
+        self.assertEqual((report.queue['dispatched'], report.queue['max_depth']), (3, 3))
+
+    def test_on_sent_hook(self):
+        """Test each sent digest is reported with its alerts and SID."""
+        harness = Harness()
+        sent = []
+        harness.runner(on_sent=lambda to, alerts, sid: sent.append((to, [a.spot_id for a in alerts], sid))).run(
+            [make_spot('a'), make_spot('b', lat=50)])
+        self.assertEqual(sent, [('+1604', ['a', 'b'], 'SM1')])
+
+    def test_overrun_sheds_and_carries_over(self):
+        """Test an overrunning cycle stops starting spots and checks them first next time."""
+        harness = Harness(delay=0.1)
+        runner = harness.runner(interval_seconds=0.15, limits={'fetch': 1})
+        spots = [make_spot(f's{i}', lat=49 + i) for i in range(5)]
+
+        report = runner.run(spots)
+        self.assertTrue(report.overran)
+        self.assertEqual(report.shed, ['s2', 's3', 's4'])
+        self.assertEqual(report.outcomes['s4'].decision, 'shed')
+
+        harness.fetched.clear()
+        runner.run(spots)
+        self.assertEqual(harness.fetched[:2], ['s2', 's3'])
+
+    def test_windowed_digests_wait(self):
+        """Test alerts inside a digest window are held for a later cycle."""
+        harness = Harness()
+        runner = harness.runner(digest_window=3600)
+        report = runner.run([make_spot('a')])
+        self.assertEqual(report.digests, 0)
+        self.assertEqual(report.outcomes['a'].decision, 'queued')
+        self.assertEqual(len(runner.coalescer), 1)
+
+    def test_delivered_from_earlier_cycle(self):
+        """Test a digest held by its window is reported by the cycle that sends it."""
+        harness = Harness()
+        runner = harness.runner(digest_window=0.05)
+        self.assertEqual(runner.run([make_spot('a')]).delivered, [])
+
+        time.sleep(0.06)
+        harness.speed = 10.0
+        report = runner.run([make_spot('a')])
+        [(to, alerts, message)] = report.delivered
+        self.assertEqual((to, [a.spot_id for a in alerts], message), ('+1604', ['a'], 'a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
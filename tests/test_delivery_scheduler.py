@@ -0,0 +1,137 @@
+"""
+Unit tests for deferred alert delivery.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.delivery_scheduler import (
+    DeliveryScheduler, load_schedule, parse_quiet_hours, quiet_hours_end
+)
+
+
+class TestQuietHours(unittest.TestCase):
+    """Test quiet hours parsing and window checks."""
+
+    def test_parse(self):
+        """Test settings parse to (start, end) and empty disables."""
+        self.assertEqual(parse_quiet_hours('22-7'), (22, 7))
+        self.assertIsNone(parse_quiet_hours(''))
+        for bad in ('22', 'late-early', '25-7', '7-7'):
+            with self.assertRaises(ValueError):
+                parse_quiet_hours(bad)
+
+    def test_wrapping_window(self):
+        """Test a window past midnight ends at the right time and day."""
+        self.assertEqual(quiet_hours_end(datetime(2025, 1, 18, 23, 30), '22-7'),
+                         datetime(2025, 1, 19, 7, 0))
+        self.assertEqual(quiet_hours_end(datetime(2025, 1, 18, 5, 0), '22-7'),
+                         datetime(2025, 1, 18, 7, 0))
+        self.assertIsNone(quiet_hours_end(datetime(2025, 1, 18, 7, 0), '22-7'))
+        self.assertIsNone(quiet_hours_end(datetime(2025, 1, 18, 12, 0), '22-7'))
+
+    def test_same_day_window(self):
+        """Test a window within one day."""
+        self.assertEqual(quiet_hours_end(datetime(2025, 1, 18, 13, 15), '12-14'),
+                         datetime(2025, 1, 18, 14, 0))
+        self.assertIsNone(quiet_hours_end(datetime(2025, 1, 18, 15, 0), '12-14'))
+        self.assertIsNone(quiet_hours_end(datetime(2025, 1, 18, 13, 0), ''))
+
+
+class TestDeliveryScheduler(unittest.TestCase):
+    """Test the pending alert heap."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'schedule.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pop_due_in_fire_order(self):
+        """Test only due alerts are popped, earliest first, up to the limit."""
+        scheduler = DeliveryScheduler(path=self.path)
+        scheduler.schedule(300, '+3', 'wb', 38, 315, 0)
+        scheduler.schedule(100, '+1', 'wb', 38, 315, 0)
+        scheduler.schedule(200, '+2', 'wb', 38, 315, 0)
+
+        self.assertEqual(scheduler.next_fire_time(), 100)
+        due = scheduler.pop_due(250, limit=1)
+        self.assertEqual([e[2] for e in due], ['+1'])
+        due = scheduler.pop_due(250)
+        self.assertEqual([e[2] for e in due], ['+2'])
+        self.assertEqual(len(scheduler), 1)
+
+    def test_no_duplicate_pending(self):
+        """Test a recipient waiting on a spot isn't scheduled twice."""
+        scheduler = DeliveryScheduler(path=self.path)
+        self.assertTrue(scheduler.schedule(100, '+1', 'wb', 38, 315, 0))
+        self.assertFalse(scheduler.schedule(100, '+1', 'wb', 40, 315, 0))
+        self.assertTrue(scheduler.schedule(100, '+1', 'sb', 38, 270, 0))
+        scheduler.pop_due(100)
+        self.assertTrue(scheduler.schedule(200, '+1', 'wb', 38, 315, 0))
+
+    def test_persistence(self):
+        """Test pending alerts survive a save and load."""
+        scheduler = DeliveryScheduler(path=self.path)
+        scheduler.schedule(100, None, 'wb', 38, 315, 0)
+        scheduler.schedule(50, '+1', 'sb', 33, 270, 0)
+        scheduler.save()
+
+        loaded = load_schedule(self.path)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual([e[2] for e in loaded.pop_due(75)], ['+1'])
+        self.assertFalse(loaded.schedule(100, None, 'wb', 38, 315, 0))
+        loaded.schedule(100, '+2', 'wb', 38, 315, 0)
+        self.assertEqual(len({e[1] for e in loaded._heap}), 2)
+
+    def test_load_corrupt_file(self):
+        """Test an unreadable file starts an empty schedule."""
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        self.assertEqual(len(load_schedule(self.path)), 0)
+
+    def test_release_rechecks_and_batches(self):
+        """Test due alerts are delivered per spot only if conditions still hold."""
+        scheduler = DeliveryScheduler(path=self.path)
+        for i in range(5):
+            scheduler.schedule(100, f'+{i}', 'wb', 38, 315, 0)
+        scheduler.schedule(100, '+9', 'sb', 33, 270, 0)
+        scheduler.schedule(500, '+8', 'wb', 38, 315, 0)
+
+        recheck = MagicMock(side_effect=lambda spot_id: (40, 310) if spot_id == 'wb' else None)
+        deliver = MagicMock(return_value=None)
+        delivered, dropped, held = scheduler.release_due(200, recheck, deliver, batch_size=2)
+
+        self.assertEqual((delivered, dropped, held), (5, 1, 0))
+        self.assertEqual(recheck.call_count, 2)
+        recipients = sorted(r for call in deliver.call_args_list for r in call.args[1])
+        self.assertEqual(recipients, [f'+{i}' for i in range(5)])
+        self.assertTrue(all(call.args[2] == (40, 310) for call in deliver.call_args_list))
+        self.assertEqual(len(scheduler), 1)
+
+    def test_held_alerts_stay_pending(self):
+        """Test alerts the sender holds back are kept for the next release, not counted as delivered."""
+        scheduler = DeliveryScheduler(path=self.path)
+        scheduler.schedule(100, '+1', 'wb', 38, 315, 0)
+        scheduler.schedule(100, '+2', 'sb', 33, 270, 0)
+        scheduler.schedule(100, '+3', 'jb', 30, 300, 0)
+        decisions = {'wb': None, 'sb': 'suppressed', 'jb': 'dropped'}
+        deliver = MagicMock(side_effect=lambda spot_id, recipients, reading: decisions[spot_id])
+
+        self.assertEqual(scheduler.release_due(200, lambda spot_id: (40, 310), deliver), (1, 1, 1))
+        self.assertEqual(deliver.call_count, 3)
+        self.assertEqual(len(scheduler), 1)
+        self.assertFalse(scheduler.schedule(300, '+2', 'sb', 33, 270, 0))
+        self.assertEqual([e[2] for e in scheduler.pop_due(200)], ['+2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
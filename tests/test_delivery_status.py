@@ -0,0 +1,152 @@
+"""
+Unit tests for delivery status callbacks.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+import urllib.request
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.delivery_status import (CALLBACK_PATH, CallbackBuffer, DeliveryStore, StatusUpdate, post_test_callbacks,
+                                 start_callback_server, synthetic_callbacks)
+
+
+def update(sid, status, error_code=None):
+    return StatusUpdate(sid, status, error_code, time.time())
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = DeliveryStore(os.path.join(self.tmpdir.name, 'deliveries.db'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+
+class TestDeliveryStore(StoreTestCase):
+    """Test recording sends and applying statuses."""
+
+    def test_status_only_moves_forward(self):
+        """Test a late 'sent' callback doesn't undo 'delivered'."""
+        self.store.record_sent([('SM1', '+1604', [('wreck', 40.0, 315.0)])])
+        self.store.apply_updates([update('SM1', 'delivered')])
+        self.store.apply_updates([update('SM1', 'sent')])
+        self.assertEqual(self.store.status('SM1'), 'delivered')
+
+    def test_callback_before_send_recorded(self):
+        """Test a callback arriving before the send is recorded keeps its status."""
+        self.store.apply_updates([update('SM1', 'undelivered', '30003')])
+        self.store.record_sent([('SM1', '+1604', [('wreck', 40.0, 315.0)])])
+        failed = self.store.take_failed()
+        self.assertEqual([(f.sid, f.recipient, f.alerts) for f in failed],
+                         [('SM1', '+1604', (('wreck', 40.0, 315.0),))])
+
+    def test_failed_taken_once(self):
+        """Test each failure is handed out for retry only once."""
+        self.store.record_sent([('SM1', '+1604', []), ('SM2', '+1778', [])])
+        self.store.apply_updates([update('SM1', 'failed', '30008'), update('SM2', 'delivered')])
+        self.assertEqual([f.sid for f in self.store.take_failed()], ['SM1'])
+        self.assertEqual(self.store.take_failed(), [])
+
+    def test_permanent_and_retried_not_retried(self):
+        """Test permanent errors and failed retries aren't retried."""
+        self.store.record_sent([('SM1', '+1604', [])])
+        self.store.record_sent([('SM2', '+1778', [])], attempt=1)
+        self.store.apply_updates([update('SM1', 'undelivered', '30006'), update('SM2', 'failed')])
+        self.assertEqual(self.store.take_failed(max_attempt=0), [])
+
+    def test_status_counts(self):
+        """Test messages are counted by latest status."""
+        self.store.record_sent([('SM1', '+1604', []), ('SM2', '+1604', [])])
+        self.store.apply_updates([update('SM1', 'delivered')])
+        self.assertEqual(self.store.status_counts(), {'delivered': 1, None: 1})
+
+
+class TestCallbackBuffer(StoreTestCase):
+    """Test buffering and batched writes."""
+
+    def test_coalesced_per_message(self):
+        """Test a message's burst of callbacks becomes one row write."""
+        buffer = CallbackBuffer(self.store, flush_rows=100, flush_seconds=60)
+        for status in ('queued', 'delivered', 'sent'):
+            buffer.add(update('SM1', status))
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.store.status('SM1'), 'delivered')
+        self.assertEqual(buffer.metrics(), {'received': 3, 'written': 1, 'batches': 1, 'pending': 0})
+
+    def test_writer_flushes_full_batches(self):
+        """Test the writer thread flushes once a batch fills, without waiting for the interval."""
+        buffer = CallbackBuffer(self.store, flush_rows=10, flush_seconds=60).start()
+        self.addCleanup(buffer.stop)
+        for i in range(10):
+            buffer.add(update(f'SM{i}', 'sent'))
+        deadline = time.monotonic() + 2
+        while buffer.metrics()['written'] < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(buffer.metrics()['written'], 10)
+
+    def test_stop_flushes(self):
+        """Test stopping writes whatever is still buffered."""
+        buffer = CallbackBuffer(self.store, flush_rows=100, flush_seconds=60).start()
+        buffer.add(update('SM1', 'sent'))
+        buffer.stop()
+        self.assertEqual(self.store.status('SM1'), 'sent')
+
+
+class TestCallbackServer(StoreTestCase):
+    """Test the HTTP receiver."""
+
+    def start(self, **kwargs):
+        buffer = CallbackBuffer(self.store, flush_seconds=0.05).start()
+        server = start_callback_server(buffer, 0, host='127.0.0.1', **kwargs)
+        self.addCleanup(buffer.stop)
+        self.addCleanup(server.shutdown)
+        return buffer, f"http://127.0.0.1:{server.server_address[1]}{CALLBACK_PATH}"
+
+    def post(self, url, fields):
+        request = urllib.request.Request(url, urlencode(fields).encode(), method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status
+        except HTTPError as e:
+            return e.code
+
+    def test_synthetic_callbacks(self):
+        """Test posted callbacks end up in the store."""
+        buffer, url = self.start(public_url='', auth_token=None)
+        bodies = synthetic_callbacks(40, failure_rate=0.1)
+        accepted, _ = post_test_callbacks(url, bodies, concurrency=4)
+        buffer.stop()
+
+        self.assertEqual(accepted, 120)
+        self.assertEqual(self.store.status_counts(), {'delivered': 36, 'undelivered': 4})
+
+    def test_bad_requests(self):
+        """Test unknown paths and incomplete callbacks are rejected."""
+        _, url = self.start(public_url='', auth_token=None)
+        self.assertEqual(self.post(url + 'x', {'MessageSid': 'SM1', 'MessageStatus': 'sent'}), 404)
+        self.assertEqual(self.post(url, {'MessageSid': 'SM1'}), 400)
+
+    def test_signature_checked(self):
+        """Test callbacks must be signed with the auth token when one is configured."""
+        public_url = 'https://alerts.example.com/twilio/status'
+        buffer, url = self.start(public_url=public_url, auth_token='secret')
+        fields = {'MessageSid': 'SM1', 'MessageStatus': 'delivered'}
+
+        self.assertEqual(self.post(url, fields), 403)
+        accepted, _ = post_test_callbacks(url, [fields], concurrency=1, auth_token='secret', signed_url=public_url)
+        self.assertEqual(accepted, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
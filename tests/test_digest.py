@@ -0,0 +1,122 @@
+"""
+Unit tests for per-recipient alert digests.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.digest import DigestCoalescer, PendingAlert, build_digest_message
+from src.sms_encoding import segment_info
+
+
+def make_spot(spot_id, name):
+    spot = MagicMock()
+    spot.id = spot_id
+    spot.name = name
+    spot.units = 'kmh'
+    return spot
+
+
+class TestDigest(unittest.TestCase):
+    """Test digest building and coalescing."""
+
+    def test_single_alert_uses_normal_message(self):
+        """Test a lone alert goes through the regular message generator."""
+        alert = PendingAlert('+1', 'wb', 'Wreck Beach', 38, 315, 0)
+        with patch('src.digest.generate_alert_message', return_value='Crikey! NW 38km/h') as gen:
+            self.assertEqual(build_digest_message([alert]), 'Crikey! NW 38km/h')
+        gen.assert_called_once_with(38, 315, 'Wreck Beach', 'kmh')
+
+    def test_single_alert_names_its_spot(self):
+        """Test a lone alert for another spot doesn't mention Wreck Beach."""
+        alert = PendingAlert('+1', 'sb', 'Spanish Banks', 38, 315, 0)
+        with patch('src.message_generator.MESSAGE_MODE', 'local'):
+            message = build_digest_message([alert])
+        self.assertIn('Spanish Banks', message)
+        self.assertNotIn('Wreck', message)
+
+    def test_lines_use_spot_units(self):
+        """Test each digest line shows the speed in its spot's units."""
+        alerts = [
+            PendingAlert('+1', 'sb', 'Spanish Banks', 37.04, 270, 0, 'knots'),
+            PendingAlert('+1', 'wb', 'Wreck Beach', 38, 315, 0),
+        ]
+        message = build_digest_message(alerts)
+        self.assertIn('Spanish Banks W 20kn', message)
+        self.assertIn('Wreck Beach NW 38km/h', message)
+
+    def test_multiple_alerts_one_segment(self):
+        """Test several spots are listed strongest first within one segment."""
+        alerts = [
+            PendingAlert('+1', 'sb', 'Spanish Banks', 32, 270, 0),
+            PendingAlert('+1', 'wb', 'Wreck Beach', 38, 315, 0),
+        ]
+        with patch('src.digest.generate_alert_message') as gen:
+            message = build_digest_message(alerts)
+        gen.assert_not_called()
+        self.assertLess(message.index('Wreck Beach NW 38km/h'), message.index('Spanish Banks W 32km/h'))
+        self.assertEqual(segment_info(message).segments, 1)
+
+    def test_many_alerts_shortened(self):
+        """Test a long digest is cut down to fit, noting the spots left out."""
+        alerts = [PendingAlert('+1', f's{i}', f'Very Long Spot Name Number {i}', 30 + i, 270, 0)
+                  for i in range(12)]
+        message = build_digest_message(alerts)
+        self.assertEqual(segment_info(message).segments, 1)
+        self.assertIn('more', message)
+        self.assertIn('41km/h', message)
+
+    def test_coalesces_per_recipient(self):
+        """Test alerts for the same recipient become one send."""
+        coalescer = DigestCoalescer(window_seconds=0)
+        coalescer.add('+1', make_spot('wb', 'Wreck Beach'), 38, 315, now=100)
+        coalescer.add('+1', make_spot('sb', 'Spanish Banks'), 32, 270, now=100)
+        coalescer.add('+2', make_spot('wb', 'Wreck Beach'), 38, 315, now=100)
+        self.assertEqual(len(coalescer), 3)
+
+        send = MagicMock(return_value='SM123')
+        with patch('src.digest.generate_alert_message', return_value='NW 38km/h'):
+            results = coalescer.send_due(send, now=100, force=True)
+
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(sorted(len(alerts) for alerts, _ in results), [1, 2])
+        self.assertEqual(len(coalescer), 0)
+
+    def test_window_holds_until_due(self):
+        """Test alerts wait for the window unless forced."""
+        coalescer = DigestCoalescer(window_seconds=60)
+        coalescer.add('+1', make_spot('wb', 'Wreck Beach'), 38, 315, now=100)
+        coalescer.add('+1', make_spot('sb', 'Spanish Banks'), 32, 270, now=130)
+
+        self.assertEqual(coalescer.flush(now=150), [])
+        released = coalescer.flush(now=160)
+        self.assertEqual(len(released), 1)
+        self.assertEqual(len(released[0][2]), 2)
+
+    def test_newer_reading_replaces_spot(self):
+        """Test a second alert for the same spot updates it but keeps its queue time."""
+        coalescer = DigestCoalescer(window_seconds=60)
+        coalescer.add('+1', make_spot('wb', 'Wreck Beach'), 36, 315, now=100)
+        coalescer.add('+1', make_spot('wb', 'Wreck Beach'), 40, 315, now=140)
+        self.assertEqual(len(coalescer), 1)
+
+        with patch('src.digest.generate_alert_message', return_value='x') as gen:
+            coalescer.flush(now=160)
+        gen.assert_called_once_with(40, 315, 'Wreck Beach', 'kmh')
+
+    def test_send_failure_reported(self):
+        """Test a failed send yields no SID instead of raising."""
+        coalescer = DigestCoalescer(window_seconds=0)
+        coalescer.add('+1', make_spot('wb', 'Wreck Beach'), 38, 315, now=100)
+        with patch('src.digest.generate_alert_message', return_value='x'):
+            results = coalescer.send_due(MagicMock(side_effect=Exception('down')), force=True)
+        self.assertIsNone(results[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
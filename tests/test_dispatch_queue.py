@@ -0,0 +1,106 @@
+"""
+Unit tests for the priority dispatch queue.
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dispatch_queue import DispatchQueue, alert_score, direction_quality
+from src.spot_registry import build_spot
+
+WRECK = build_spot({'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 30,
+                    'sectors': [[247.5, 22.5]]})
+
+
+class TestScoring(unittest.TestCase):
+    """Test alert scores."""
+
+    def test_direction_quality(self):
+        """Test quality peaks mid-sector and is zero at the edge and outside."""
+        self.assertAlmostEqual(direction_quality(WRECK, 315), 1.0)
+        self.assertAlmostEqual(direction_quality(WRECK, 247.5), 0.0)
+        self.assertAlmostEqual(direction_quality(WRECK, 281.25), 0.5)
+        self.assertEqual(direction_quality(WRECK, 120), 0.0)
+
+    def test_score_ordering(self):
+        """Test margin, direction and tier all raise the score."""
+        base = alert_score(WRECK, 33, 280)
+        self.assertGreater(alert_score(WRECK, 45, 280), base)
+        self.assertGreater(alert_score(WRECK, 33, 315), base)
+        self.assertGreater(alert_score(WRECK, 33, 280, tier=1), base)
+        self.assertEqual(alert_score(WRECK, 20, 315), alert_score(WRECK, 30, 315))
+
+
+class TestDispatchQueue(unittest.TestCase):
+    """Test queue ordering, pacing and metrics."""
+
+    def test_drains_highest_score_first(self):
+        """Test sends go out by score, ties in insertion order."""
+        queue = DispatchQueue(rate_per_second=0)
+        queue.push('+low', 'm', 0.1)
+        queue.push('+high', 'm', 2.0)
+        queue.push('+mid1', 'm', 1.0)
+        queue.push('+mid2', 'm', 1.0)
+
+        send = MagicMock(return_value='SM1')
+        results = queue.drain(send)
+        self.assertEqual([item.recipient for item, _ in results], ['+high', '+mid1', '+mid2', '+low'])
+        self.assertEqual(send.call_args_list[0].args, ('m', '+high'))
+        self.assertEqual(len(queue), 0)
+
+    def test_metrics(self):
+        """Test depth, counts and waits are reported."""
+        queue = DispatchQueue(rate_per_second=0)
+        queue.push('+1', 'm', 1.0, now=0)
+        queue.push('+2', 'm', 2.0, now=0)
+        self.assertEqual(queue.metrics()['depth'], 2)
+        self.assertIsNone(queue.metrics()['wait_p95'])
+
+        queue.drain(MagicMock(side_effect=['SM1', Exception('down')]))
+        metrics = queue.metrics()
+        self.assertEqual(metrics['depth'], 0)
+        self.assertEqual(metrics['max_depth'], 2)
+        self.assertEqual((metrics['dispatched'], metrics['failed']), (1, 1))
+        self.assertGreater(metrics['wait_max'], 0)
+
+    def test_rate_limit_paces_sends(self):
+        """Test sends are spaced out when a rate is set."""
+        queue = DispatchQueue(rate_per_second=2)
+        for i in range(3):
+            queue.push(f'+{i}', 'm', 1.0)
+        sleep = MagicMock()
+        queue.drain(MagicMock(return_value='SM1'), sleep=sleep)
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertTrue(all(0 < call.args[0] <= 0.5 for call in sleep.call_args_list))
+
+    def test_workers_start_in_priority_order(self):
+        """Test concurrent workers overlap sends but start them highest score first."""
+        queue = DispatchQueue(rate_per_second=0)
+        for i in range(8):
+            queue.push(f'+{i}', 'm', float(i))
+        started, lock = [], threading.Lock()
+
+        def send(message, to):
+            with lock:
+                started.append(to)
+            time.sleep(0.05)
+            return 'SM1'
+
+        began = time.monotonic()
+        results = queue.drain(send, workers=4)
+        self.assertLess(time.monotonic() - began, 0.3)
+        self.assertEqual(started, [f'+{i}' for i in range(7, -1, -1)])
+        self.assertEqual(len(results), 8)
+        self.assertEqual(queue.metrics()['dispatched'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
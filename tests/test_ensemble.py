@@ -0,0 +1,161 @@
+"""
+Unit tests for the multi-model ensemble consensus.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import ensemble
+from src.ensemble import Consensus, consensus_from_arrays, parse_ensemble, parse_models
+from src.readings import Source
+from src.source_health import SourceHealth
+
+MODELS = ('ecmwf_ifs025', 'gfs_seamless', 'icon_seamless')
+
+
+def response_for(speeds, directions, times=('2025-01-18T09:00', '2025-01-18T10:00')):
+    hourly = {'time': list(times)}
+    for model, speed, direction in zip(MODELS, speeds, directions):
+        hourly[f'wind_speed_10m_{model}'] = speed
+        hourly[f'wind_direction_10m_{model}'] = direction
+    return {'hourly': hourly}
+
+
+class TestConsensus(unittest.TestCase):
+    """Test the vectorised per-hour reduction."""
+
+    def test_speed_statistics(self):
+        """Test mean, median and spread are computed per hour across models."""
+        consensus = consensus_from_arrays([[30, 10], [36, 20], [42, 60]],
+                                          [[315, 300], [320, 300], [310, 300]])
+        np.testing.assert_allclose(consensus.mean_speed, [36, 30])
+        np.testing.assert_allclose(consensus.median_speed, [36, 20])
+        self.assertAlmostEqual(consensus.speed_spread[0], np.std([30, 36, 42]))
+        self.assertEqual(list(consensus.model_count), [3, 3])
+
+    def test_circular_direction(self):
+        """Test directions either side of north average to north, not south."""
+        consensus = consensus_from_arrays([[30], [30]], [[350], [10]])
+        self.assertAlmostEqual(np.cos(np.radians(consensus.direction[0])), 1, places=6)
+        self.assertGreater(consensus.direction_agreement[0], 0.98)
+
+        opposed = consensus_from_arrays([[30], [30]], [[90], [270]])
+        self.assertAlmostEqual(opposed.direction_agreement[0], 0, places=6)
+
+    def test_missing_values_skipped(self):
+        """Test models with no value for an hour are left out of that hour."""
+        consensus = consensus_from_arrays([[30, np.nan], [40, np.nan], [np.nan, np.nan]],
+                                          [[315, 315], [315, np.nan], [315, 315]])
+        self.assertEqual(list(consensus.model_count), [2, 0])
+        self.assertAlmostEqual(consensus.mean_speed[0], 35)
+        self.assertTrue(np.isnan(consensus.median_speed[1]))
+
+    def test_agreement_gate(self):
+        """Test alerts are only allowed when the models agree."""
+        agree = consensus_from_arrays([[38], [40], [42]], [[310], [315], [320]])
+        self.assertTrue(agree.agrees(max_spread=8, min_agreement=0.8))
+
+        outlier = consensus_from_arrays([[38], [40], [12]], [[310], [315], [320]])
+        self.assertFalse(outlier.agrees(max_spread=8, min_agreement=0.8))
+
+        veering = consensus_from_arrays([[38], [40], [42]], [[315], [45], [200]])
+        self.assertFalse(veering.agrees(max_spread=8, min_agreement=0.8))
+
+        single = consensus_from_arrays([[38], [np.nan], [np.nan]], [[315], [315], [315]])
+        self.assertFalse(single.agrees(max_spread=8, min_agreement=0.8))
+
+    def test_reading_and_round_trip(self):
+        """Test the consensus reading and its cached dict form."""
+        consensus = consensus_from_arrays([[30], [36], [42]], [[315], [320], [310]],
+                                          times=['2025-01-18T09:00'], models=MODELS)
+        reading = consensus.reading()
+        self.assertEqual(reading.speed, 36)
+        self.assertIs(reading.source, Source.OPEN_METEO)
+
+        self.assertEqual(reading.observed_at, np.datetime64('2025-01-18T09:00', 's').astype(np.int64))
+
+        rebuilt = Consensus.from_dict(consensus.to_dict())
+        self.assertEqual(rebuilt.models, MODELS)
+        np.testing.assert_allclose(rebuilt.direction, consensus.direction)
+
+    def test_readings_series(self):
+        """Test the whole series comes out as one batch, untimed without times."""
+        consensus = consensus_from_arrays([[30, 10], [36, 20], [42, 60]],
+                                          [[315, 300], [320, 300], [310, 300]])
+        batch = consensus.readings()
+        self.assertEqual(len(batch), 2)
+        np.testing.assert_allclose(batch.speeds, [36, 20])
+        self.assertTrue(np.isnan(batch.times).all())
+        self.assertIsNone(batch[1].observed_at)
+
+
+class TestParseEnsemble(unittest.TestCase):
+    """Test parsing multi-model responses."""
+
+    def test_parse(self):
+        """Test per-model columns are stacked, with nulls and absent models skipped."""
+        data = response_for([[30, 32], [34, None]], [[315, 320], [310, None]])
+        consensus = parse_ensemble(data, MODELS)
+        self.assertEqual(list(consensus.model_count), [2, 1])
+        self.assertAlmostEqual(consensus.mean_speed[0], 32)
+        self.assertEqual(consensus.times, ('2025-01-18T09:00', '2025-01-18T10:00'))
+
+    def test_no_model_data(self):
+        """Test a response without any model columns is rejected."""
+        with self.assertRaises(ValueError):
+            parse_ensemble({'hourly': {'time': ['2025-01-18T09:00']}}, MODELS)
+
+    def test_parse_models(self):
+        """Test the configured model list is parsed."""
+        self.assertEqual(parse_models(' gfs_seamless, icon_seamless ,,'), ('gfs_seamless', 'icon_seamless'))
+        self.assertEqual(parse_models(''), ())
+
+
+class TestFetchConsensus(unittest.TestCase):
+    """Test fetching the ensemble in one request."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.health = SourceHealth({}, os.path.join(self.tmpdir.name, 'health.json'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fetch(self, mock_get):
+        with patch.object(ensemble, 'load_health', return_value=self.health), \
+                patch.object(ensemble, 'get_or_fetch', side_effect=lambda key, fetch, ttl: fetch()):
+            return ensemble.fetch_consensus({'lat': 49.26, 'lon': -123.26}, MODELS)
+
+    @patch('src.ensemble.requests.get')
+    def test_single_request(self, mock_get):
+        """Test every model comes from one request."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = response_for([[38], [40], [42]], [[310], [315], [320]],
+                                                       times=['2025-01-18T09:00'])
+        mock_get.return_value = mock_response
+
+        consensus = self.fetch(mock_get)
+
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs['params']['models'], ','.join(MODELS))
+        self.assertTrue(consensus.agrees())
+        self.assertEqual(self.health.success_rate('open-meteo'), 1.0)
+
+    @patch('src.ensemble.requests.get')
+    def test_failure_returns_none(self, mock_get):
+        """Test a failed request returns None and counts against Open-Meteo."""
+        mock_get.side_effect = ConnectionError("offline")
+        self.assertIsNone(self.fetch(mock_get))
+        self.assertEqual(self.health.success_rate('open-meteo'), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
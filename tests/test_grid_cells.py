@@ -0,0 +1,70 @@
+"""
+Unit tests for model grid cell planning.
+"""
+
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cycle_runner import CycleRunner
+from src.grid_cells import cell_coordinates, cell_for, fetch_coordinates, fetch_key
+from src.readings import Source, WindReading
+
+WRECK = {'lat': 49.2611, 'lon': -123.2614}
+TOWERS = {'lat': 49.2580, 'lon': -123.2550}
+JERICHO = {'lat': 49.2733, 'lon': -123.1936}
+
+
+def make_spot(spot_id, coordinates):
+    return SimpleNamespace(id=spot_id, name=spot_id, coordinates=coordinates, **coordinates)
+
+
+class TestGridCells(unittest.TestCase):
+    """Test mapping locations to model grid cells."""
+
+    def test_nearest_grid_point(self):
+        """Test a location maps to the grid point nearest to it."""
+        self.assertEqual(cell_for(WRECK, 0.25), (197, -493))
+        self.assertEqual(cell_coordinates((197, -493), 0.25), {'lat': 49.25, 'lon': -123.25})
+        self.assertEqual(fetch_coordinates(WRECK, 0.25), {'lat': 49.25, 'lon': -123.25})
+
+    def test_nearby_spots_share_cell(self):
+        """Test spots closer than the grid spacing share a cell, and finer grids split them."""
+        self.assertEqual(cell_for(WRECK, 0.25), cell_for(JERICHO, 0.25))
+        self.assertEqual(cell_for(WRECK, 0.025), cell_for(TOWERS, 0.025))
+        self.assertNotEqual(cell_for(WRECK, 0.025), cell_for(JERICHO, 0.025))
+
+    def test_longitude_wraps(self):
+        """Test longitudes either side of the antimeridian land in the same cell."""
+        self.assertEqual(cell_for({'lat': 0, 'lon': 180.0}, 0.25), cell_for({'lat': 0, 'lon': -180.0}, 0.25))
+
+    def test_disabled(self):
+        """Test locations are fetched as-is with planning off."""
+        self.assertIsNone(cell_for(WRECK, 0))
+        self.assertIs(fetch_coordinates(WRECK, 0), WRECK)
+        self.assertEqual(fetch_key(make_spot('wreck', WRECK), 0), (49.2611, -123.2614))
+
+    def test_cycle_fetches_once_per_cell(self):
+        """Test a cycle fetches each cell once and fans the reading out to its spots."""
+        fetched = []
+
+        def fetch(spot):
+            fetched.append(spot.id)
+            return WindReading(40.0, 315.0, Source.OPEN_METEO)
+
+        spots = [make_spot('wreck', WRECK), make_spot('towers', TOWERS), make_spot('jericho', JERICHO)]
+        runner = CycleRunner(fetch, lambda spot, reading: None, lambda *args: None, lambda message, to: 'SM1',
+                             digest_window=0, fetch_key=lambda spot: fetch_key(spot, 0.025))
+        report = runner.run(spots)
+
+        self.assertEqual(report.fetches, 2)
+        self.assertEqual(fetched, ['wreck', 'jericho'])
+        self.assertEqual(report.outcomes['towers'].reading.speed, 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
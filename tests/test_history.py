@@ -0,0 +1,125 @@
+"""
+Unit tests for the history journal and columnar export.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.history import PartitionedWriter, record_cycle, export_history, open_history_day
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+def make_status(checked_at, speed, decision='below_criteria', message=None):
+    return {
+        'checked_at': checked_at,
+        'spot': 'wreck-beach',
+        'speed_kmh': speed,
+        'direction_deg': 315,
+        'source': 'open-meteo',
+        'decision': decision,
+        'message': message,
+        'timings': {'fetch': 0.42, 'total': 0.5},
+        'cooldown': {'alerts_today': 0}
+    }
+
+
+class TestHistoryJournal(unittest.TestCase):
+    """Test journal recording."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmpdir.name, 'history.jsonl')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_record_cycle_appends_flat_row(self):
+        """Test each cycle appends one flat row with stage timings."""
+        record_cycle(make_status('2025-01-18T09:00:00', 38, 'sent', 'Crikey! NW 38km/h'), self.journal)
+        record_cycle(make_status('2025-01-18T09:30:00', 20), self.journal)
+
+        with open(self.journal) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['message'], 'Crikey! NW 38km/h')
+        self.assertEqual(rows[0]['fetch_s'], 0.42)
+        self.assertIsNone(rows[0]['send_s'])
+        self.assertNotIn('cooldown', rows[0])
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class TestHistoryExport(unittest.TestCase):
+    """Test day-partitioned Arrow/Parquet export."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmpdir.name, 'history.jsonl')
+        self.out_dir = os.path.join(self.tmpdir.name, 'export')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_partitions_by_day(self):
+        """Test rows land in their day's Arrow and Parquet files, in batches."""
+        for hour in range(5):
+            record_cycle(make_status(f'2025-01-18T{hour:02d}:00:00', 30 + hour), self.journal)
+        record_cycle(make_status('2025-01-19T08:00:00', 41, 'sent', 'Go go go!'), self.journal)
+        with open(self.journal, 'a') as f:
+            f.write('not json\n')
+
+        rows = export_history(self.journal, self.out_dir, batch_rows=2)
+        self.assertEqual(rows, 6)
+        self.assertEqual(sorted(os.listdir(self.out_dir)), ['date=2025-01-18', 'date=2025-01-19'])
+
+        table = open_history_day(self.out_dir, '2025-01-18')
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column('speed_kmh').to_pylist(), [30, 31, 32, 33, 34])
+
+        parquet = pq.read_table(os.path.join(self.out_dir, 'date=2025-01-19', 'history.parquet'))
+        self.assertEqual(parquet.column('message').to_pylist(), ['Go go go!'])
+        self.assertEqual(parquet.column('decision').to_pylist(), ['sent'])
+
+    def test_one_day_open_at_a_time(self):
+        """Test each day is closed before the next opens, however many days the journal holds."""
+        for day in range(1, 29):
+            for hour in range(0, 24, 6):
+                record_cycle(make_status(f'2025-02-{day:02d}T{hour:02d}:00:00', 20 + hour), self.journal)
+
+        open_when_opening = []
+        original_open = PartitionedWriter._open
+
+        def tracking_open(writer, key):
+            open_when_opening.append(len(writer._writers))
+            return original_open(writer, key)
+
+        with patch.object(PartitionedWriter, '_open', tracking_open):
+            rows = export_history(self.journal, self.out_dir)
+
+        self.assertEqual(rows, 28 * 4)
+        self.assertEqual(len(open_when_opening), 28)
+        self.assertEqual(max(open_when_opening), 0)
+        self.assertEqual(open_history_day(self.out_dir, '2025-02-28').num_rows, 4)
+
+    def test_single_format(self):
+        """Test only the requested format is written."""
+        record_cycle(make_status('2025-01-18T09:00:00', 38), self.journal)
+        export_history(self.journal, self.out_dir, formats=('arrow',))
+        self.assertEqual(os.listdir(os.path.join(self.out_dir, 'date=2025-01-18')), ['history.arrow'])
+
+        with self.assertRaises(ValueError):
+            export_history(self.journal, self.out_dir, formats=('csv',))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Unit tests for the streaming historical archive importer.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.history_import import detect_format, import_history, iter_eccc_csv, iter_openmeteo_archive
+from src.readings import ReadingBatch, Source
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+ECCC_HEADER = ('﻿"Longitude (x)","Latitude (y)","Station Name","Date/Time (LST)",'
+               '"Temp (°C)","Wind Dir (10s deg)","Wind Spd (km/h)"\n')
+
+
+def eccc_row(when, direction, speed):
+    return f'"-123.18","49.19","VANCOUVER INTL A","{when}","3.1","{direction}","{speed}"\n'
+
+
+def collect(chunks):
+    chunks = list(chunks)
+    times, speeds, dirs = (np.concatenate([getattr(c, name) for c in chunks])
+                           for name in ('times', 'speeds', 'directions'))
+    return times, speeds, dirs
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class TestArchiveReaders(unittest.TestCase):
+    """Test chunked parsing and normalisation."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_eccc_csv(self):
+        """Test tens-of-degrees directions are scaled and blank rows skipped."""
+        path = self.write('eccc.csv', ECCC_HEADER
+                          + eccc_row('2023-01-01 00:00', 32, 28)
+                          + eccc_row('2023-01-01 01:00', '', '')
+                          + eccc_row('2023-01-01 02:00', 36, 41))
+        times, speeds, dirs = collect(iter_eccc_csv(path))
+
+        self.assertEqual(list(speeds), [28, 41])
+        self.assertEqual(list(dirs), [320, 0])
+        self.assertEqual(int(times[0]), int(np.datetime64('2023-01-01T00:00', 's').astype(np.int64)))
+
+    def test_eccc_compass_and_units(self):
+        """Test compass directions and non-km/h speed columns are normalised."""
+        path = self.write('compass.csv', '"Date/Time (LST)","Wind Dir","Wind Spd (knots)"\n'
+                          '"2023-01-01 00:00","NW","10"\n'
+                          '"2023-01-01 01:00","CALM","0"\n'
+                          '"2023-01-01 02:00"," wsw ","20"\n')
+        _, speeds, dirs = collect(iter_eccc_csv(path))
+        self.assertEqual(list(dirs), [315, 247.5])
+        self.assertAlmostEqual(speeds[0], 18.52)
+
+    def test_eccc_missing_columns(self):
+        """Test a CSV without wind columns is rejected."""
+        path = self.write('other.csv', '"Date/Time (LST)","Temp (°C)"\n"2023-01-01 00:00","3"\n')
+        with self.assertRaises(ValueError):
+            list(iter_eccc_csv(path))
+
+    def test_openmeteo_archive_chunks(self):
+        """Test arrays are read in lockstep chunks with units converted."""
+        doc = {
+            'latitude': 49.26,
+            'hourly_units': {'time': 'iso8601', 'wind_speed_10m': 'm/s', 'wind_direction_10m': '°'},
+            'hourly': {
+                'time': [f'2023-01-01T{h:02d}:00' for h in range(5)],
+                'wind_speed_10m': [10, None, 12.5, 8, 9],
+                'wind_direction_10m': [300, 310, 320, 370, 290]
+            },
+            'daily': {'time': ['2023-01-01']}
+        }
+        path = self.write('archive.json', json.dumps(doc))
+        chunks = list(iter_openmeteo_archive(path, chunk_rows=2))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertIsInstance(chunks[0], ReadingBatch)
+        self.assertIs(chunks[0][0].source, Source.OPEN_METEO)
+        times, speeds, dirs = collect(chunks)
+        self.assertEqual(len(times), 4)
+        self.assertAlmostEqual(speeds[1], 45.0)
+        self.assertEqual(list(dirs), [300, 320, 10, 290])
+
+    def test_openmeteo_unixtime(self):
+        """Test unix timestamps are accepted."""
+        doc = {'hourly': {'time': [1672531200, 1672534800],
+                          'wind_speed_10m': [20, 30], 'wind_direction_10m': [315, 320]}}
+        path = self.write('unix.json', json.dumps(doc, indent=2))
+        times, speeds, _ = collect(iter_openmeteo_archive(path))
+        self.assertEqual(list(times), [1672531200, 1672534800])
+        self.assertEqual(list(speeds), [20, 30])
+
+    def test_openmeteo_mismatched_arrays(self):
+        """Test arrays of different lengths are rejected."""
+        doc = {'hourly': {'time': ['2023-01-01T00:00', '2023-01-01T01:00'],
+                          'wind_speed_10m': [20], 'wind_direction_10m': [315, 320]}}
+        path = self.write('bad.json', json.dumps(doc))
+        with self.assertRaises(ValueError):
+            list(iter_openmeteo_archive(path))
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class TestImportHistory(unittest.TestCase):
+    """Test writing imports into the columnar store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.out_dir = os.path.join(self.tmpdir.name, 'store')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_import_partitions_by_month(self):
+        """Test rows from both formats land in monthly partitions."""
+        csv_path = os.path.join(self.tmpdir.name, 'eccc.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(ECCC_HEADER + eccc_row('2023-01-31 23:00', 32, 28) + eccc_row('2023-02-01 00:00', 31, 30))
+        json_path = os.path.join(self.tmpdir.name, 'archive.json')
+        with open(json_path, 'w') as f:
+            json.dump({'hourly': {'time': ['2023-02-01T01:00'], 'wind_speed_10m': [35],
+                                  'wind_direction_10m': [315]}}, f)
+
+        rows = import_history([csv_path, json_path], spot_id='wb', out_dir=self.out_dir)
+        self.assertEqual(rows, 3)
+
+        readings = os.path.join(self.out_dir, 'readings')
+        self.assertEqual(sorted(os.listdir(readings)), ['month=2023-01', 'month=2023-02'])
+        february = pq.read_table(os.path.join(readings, 'month=2023-02', 'readings.parquet'))
+        self.assertEqual(february.column('source').to_pylist(), ['eccc'])
+        self.assertEqual(february.column('spot').to_pylist(), ['wb'])
+        second = pq.read_table(os.path.join(readings, 'month=2023-02', 'readings-1.parquet'))
+        self.assertEqual(second.column('source').to_pylist(), ['open-meteo'])
+
+    def test_detect_format(self):
+        """Test archive format is chosen by extension."""
+        self.assertEqual(detect_format('yvr_2023.CSV'), 'eccc')
+        self.assertEqual(detect_format('archive.json'), 'open-meteo')
+        with self.assertRaises(ValueError):
+            detect_format('archive.xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for alert message generation.
+"""
+
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.message_generator import (
+    collect_streamed_message,
+    truncate_to_sms,
+    generate_alert_message,
+    generate_surfer_message,
+    SMS_CHAR_LIMIT
+)
+from src.sms_encoding import segment_info
+
+
+class FakeStream:
+    """Stand-in for an OpenAI stream that records how far it was read."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreamedMessage(unittest.TestCase):
+    """Test early cut-off of streamed completions."""
+
+    def test_stops_after_complete_sentence_with_stats(self):
+        """Test the stream stops once a sentence has direction and speed."""
+        stream = FakeStream(["Crikey! ", "NW ", "38km/h ", "at Wreck! ", "Grab ", "your ", "board ", "mate!"])
+        message = collect_streamed_message(stream, "NW", "38")
+        self.assertEqual(message, "Crikey! NW 38km/h at Wreck!")
+        self.assertLess(stream.consumed, len(stream.pieces))
+        self.assertTrue(stream.closed)
+
+    def test_waits_for_required_stats(self):
+        """Test sentences without the stats don't end the stream."""
+        stream = FakeStream(["Oi legend! ", "It's ", "pumping. ", "W ", "30km/h! ", "Go!"])
+        message = collect_streamed_message(stream, "W", "30")
+        self.assertEqual(message, "Oi legend! It's pumping. W 30km/h!")
+
+    def test_full_stream_without_sentence_end(self):
+        """Test text without terminators is returned whole at stream end."""
+        stream = FakeStream(["NW 38km/h ", "firing"])
+        self.assertEqual(collect_streamed_message(stream, "NW", "38"), "NW 38km/h firing")
+
+    def test_overlong_stream_cut(self):
+        """Test a stream running past the limit is stopped and truncated."""
+        stream = FakeStream(["a" * 100, "b" * 100, "c" * 100])
+        message = collect_streamed_message(stream, "NW", "38")
+        self.assertLessEqual(len(message), SMS_CHAR_LIMIT)
+        self.assertEqual(stream.consumed, 2)
+
+    def test_truncate_to_sms(self):
+        """Test truncation prefers sentence boundaries."""
+        message = "NW 38km/h go! " + "x" * 200
+        self.assertEqual(truncate_to_sms(message), "NW 38km/h go!")
+        self.assertEqual(truncate_to_sms("short!"), "short!")
+
+
+class TestAlertMessage(unittest.TestCase):
+    """Test the final alert message."""
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': ''})
+    def test_fallback_is_single_gsm7_segment(self):
+        """Test fallback messages are optimized to a single segment."""
+        for speed in (26, 31, 40):
+            message = generate_alert_message(speed, 315)
+            self.assertEqual(segment_info(message).segments, 1)
+            self.assertIn("NW", message)
+            self.assertIn(f"{speed}km/h", message)
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-live'})
+    def test_prompt_names_spot(self):
+        """Test the OpenAI prompt names the alert's spot, not Wreck Beach."""
+        stream = FakeStream(["NW 38km/h at Spanish Banks!"])
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=None)))
+        with patch('src.message_generator.get_openai_client', return_value=client), \
+                patch('src.message_generator.get_system_prompt', return_value='prompt'), \
+                patch.object(client.chat.completions, 'create', return_value=stream, create=True) as create:
+            message = generate_surfer_message(38, 315, 'Spanish Banks')
+        user_message = create.call_args.kwargs['messages'][1]['content']
+        self.assertIn('Spanish Banks', user_message)
+        self.assertNotIn('Wreck', user_message)
+        self.assertEqual(message, "NW 38km/h at Spanish Banks!")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the local message synthesizer.
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.message_synth import synthesize_message, speed_band, variety
+from src.message_generator import create_fallback_message
+from src.sms_encoding import segment_info
+
+
+class TestMessageSynth(unittest.TestCase):
+    """Test synthesized alerts."""
+
+    def test_always_includes_stats(self):
+        """Test every message has the direction and speed."""
+        rng = random.Random(1)
+        for direction in ("N", "NNW", "W", "WSW"):
+            for speed in (25, 32, 48, 105):
+                message = synthesize_message(speed, direction, rng)
+                self.assertIn(direction, message)
+                self.assertIn(f"{speed}km/h", message)
+
+    def test_single_gsm7_segment(self):
+        """Test messages fit one GSM-7 segment."""
+        rng = random.Random(2)
+        for _ in range(500):
+            info = segment_info(synthesize_message(rng.uniform(25, 120), "NNW", rng))
+            self.assertEqual((info.encoding, info.segments), ('GSM-7', 1))
+
+    def test_variety(self):
+        """Test repeated alerts produce many distinct messages."""
+        rng = random.Random(3)
+        messages = {synthesize_message(38, "NW", rng) for _ in range(200)}
+        self.assertGreater(len(messages), 150)
+        self.assertGreater(variety(), 1000)
+
+    def test_spot_name_filled_in(self):
+        """Test every template names the given spot instead of Wreck Beach."""
+        rng = random.Random(3)
+        for speed in (26, 32, 40):
+            for _ in range(50):
+                message = synthesize_message(speed, "NNW", rng, spot_name="Spanish Banks")
+                self.assertIn("Spanish Banks", message)
+                self.assertNotIn("Wreck", message)
+                self.assertEqual(segment_info(message).segments, 1)
+
+    def test_speed_in_spot_units(self):
+        """Test a knots spot gets its speed in knots."""
+        rng = random.Random(5)
+        for _ in range(50):
+            message = synthesize_message(37.04, "NW", rng, spot_name="Spanish Banks", units='knots')
+            self.assertIn("20kn", message)
+            self.assertNotIn("km/h", message)
+            self.assertEqual(segment_info(message).segments, 1)
+
+    def test_speed_bands(self):
+        """Test the speed band cut-offs."""
+        self.assertEqual(speed_band(29.9), 'solid')
+        self.assertEqual(speed_band(30), 'pumping')
+        self.assertEqual(speed_band(35), 'firing')
+
+    def test_fallback_uses_synth(self):
+        """Test the fallback message comes from the synthesizer."""
+        message = create_fallback_message(38, 315)
+        self.assertIn("NW", message)
+        self.assertIn("38km/h", message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+"""
+Unit tests for the pipelined alert path.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wind_alert
+from src.spot_registry import SpotRegistry
+from src.delivery_scheduler import DeliveryScheduler, load_schedule
+from src.cycle_runner import CycleReport
+from src.digest import PendingAlert
+from src.delivery_status import FailedDelivery
+
+
+def slow(result, delay=0.2):
+    """Return a function that sleeps before returning result."""
+    def fn(*args, **kwargs):
+        time.sleep(delay)
+        return result
+    return fn
+
+
+class TestAlertPipeline(unittest.TestCase):
+    """Test speculative message generation."""
+
+    def setUp(self):
+        """Don't touch Twilio."""
+        patcher = patch.object(wind_alert, 'prepare_sms_client')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stages_overlap(self):
+        """Test generation runs concurrently with the dedup check."""
+        with patch.object(wind_alert, 'should_send_alert', slow(True)), \
+                patch.object(wind_alert, 'generate_alert_message', slow("NW 38km/h go!")):
+            started = time.monotonic()
+            allowed, message = wind_alert.run_alert_pipeline(False, 38, 315)
+            elapsed = time.monotonic() - started
+
+        self.assertTrue(allowed)
+        self.assertEqual(message, "NW 38km/h go!")
+        self.assertLess(elapsed, 0.35)
+
+    def test_suppressed_alert_discards_message(self):
+        """Test a deduplicated alert returns no message."""
+        with patch.object(wind_alert, 'should_send_alert', return_value=False), \
+                patch.object(wind_alert, 'generate_alert_message', slow("NW 38km/h go!")):
+            self.assertEqual(wind_alert.run_alert_pipeline(False, 38, 315), (False, None))
+
+    def test_force_alert_skips_dedup(self):
+        """Test force_alert bypasses the dedup check."""
+        with patch.object(wind_alert, 'should_send_alert') as mock_dedup, \
+                patch.object(wind_alert, 'generate_alert_message', return_value="msg"):
+            self.assertEqual(wind_alert.run_alert_pipeline(True, 38, 315), (True, "msg"))
+        mock_dedup.assert_not_called()
+
+
+class TestSpotEvaluation(unittest.TestCase):
+    """Test who a reading alerts."""
+
+    def registry(self, subscribers):
+        registry = SpotRegistry(None)
+        registry._load({
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 35, 'sectors': [[270, 337.5]]}],
+            'subscribers': subscribers
+        })
+        return registry
+
+    def evaluate(self, registry, speed, direction):
+        return wind_alert.evaluate_spot(registry, registry.get('wb'), speed, direction, sustained=False)
+
+    def test_rules_replace_spot_conditions(self):
+        """Test a rule below the spot threshold or outside its sectors still fires."""
+        registry = self.registry([
+            {'id': 'keen', 'phone': '+1', 'spots': ['wb'], 'rule': 'speed>=30'},
+            {'id': 'south', 'phone': '+2', 'spots': ['wb'], 'rule': 'speed>=30 dir=180-260'},
+            {'id': 'default', 'phone': '+3', 'spots': ['wb']}
+        ])
+        self.assertEqual(self.evaluate(registry, 32, 300), ['+1'])
+        self.assertEqual(self.evaluate(registry, 32, 200), ['+2'])
+        self.assertEqual(sorted(self.evaluate(registry, 40, 300)), ['+1', '+3'])
+        self.assertIsNone(self.evaluate(registry, 20, 300))
+
+    def test_default_rule_uses_spot_sectors_exactly(self):
+        """Test a default rule uses the spot's sector edges, as the spot condition does."""
+        registry = self.registry([{'id': 'default', 'phone': '+3', 'spots': ['wb']}])
+        self.assertEqual(self.evaluate(registry, 40, 272), ['+3'])
+        self.assertIsNone(self.evaluate(registry, 40, 265))
+
+    def test_no_subscribers_uses_spot_condition(self):
+        """Test a spot without subscribers alerts ALERT_PHONE_TO when its own conditions hold."""
+        registry = self.registry([])
+        self.assertEqual(self.evaluate(registry, 40, 300), [None])
+        self.assertIsNone(self.evaluate(registry, 30, 300))
+
+    def test_spot_met_but_no_rule_matches(self):
+        """Test [] when the spot's conditions hold but every rule excludes the reading."""
+        registry = self.registry([{'id': 'calm', 'phone': '+1', 'spots': ['wb'], 'rule': 'speed>=30 speed<=36'}])
+        self.assertEqual(self.evaluate(registry, 40, 300), [])
+
+
+class TestQuietHours(unittest.TestCase):
+    """Test deferring per recipient."""
+
+    def test_split_by_subscriber_quiet_hours(self):
+        """Test each recipient is deferred by their own quiet hours, others by QUIET_HOURS."""
+        registry = SpotRegistry(None)
+        registry._load({
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26}],
+            'subscribers': [{'id': 'owl', 'phone': '+1', 'spots': ['wb'], 'quiet_hours': ''},
+                            {'id': 'early', 'phone': '+2', 'spots': ['wb'], 'quiet_hours': '21-6'},
+                            {'id': 'default', 'phone': '+3', 'spots': ['wb']}]
+        })
+        now = datetime(2025, 1, 18, 23, 30)
+        with patch('src.spot_registry.QUIET_HOURS', '22-7'):
+            awake, quiet = wind_alert.split_quiet_recipients(registry, ['+1', '+2', '+3', None], now)
+        self.assertEqual(awake, ['+1'])
+        self.assertEqual(quiet, {datetime(2025, 1, 19, 6): ['+2'], datetime(2025, 1, 19, 7): ['+3', None]})
+
+
+class TestDeferredRelease(unittest.TestCase):
+    """Test releasing alerts held over quiet hours."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'schedule.json')
+        self.registry = SpotRegistry(None)
+        self.registry._load({
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 35, 'sectors': [[270, 337.5]]},
+                      {'id': 'sb', 'lat': 49.28, 'lon': -123.18, 'threshold': 35, 'sectors': [[270, 337.5]]}],
+            'subscribers': [{'id': 'a', 'phone': '+1', 'spots': ['wb', 'sb']}]
+        })
+        scheduler = DeliveryScheduler(path=self.path)
+        scheduler.schedule(0, '+1', 'wb', 40, 300, 0)
+        scheduler.schedule(0, '+1', 'sb', 45, 300, 0)
+        scheduler.save()
+
+        for name, value in (('DRY_RUN', False), ('generate_alert_message', lambda speed, direction, spot_name, units: f"{speed}")):
+            patcher = patch.object(wind_alert, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def release(self):
+        readings = {'wb': (40, 300), 'sb': (45, 300)}
+        return wind_alert.release_deferred_alerts(self.registry, readings, path=self.path)
+
+    def test_every_spot_released_with_one_state_update(self):
+        """Test each spot gets its own dedup check and state is updated once per spot."""
+        with patch.object(wind_alert, 'should_send_alert', return_value=True) as dedup, \
+                patch.object(wind_alert, 'dispatch_alert', return_value=['SM1']) as dispatch, \
+                patch.object(wind_alert, 'update_states') as update:
+            self.assertEqual(self.release(), 2)
+        self.assertEqual(sorted(c.kwargs['spot_id'] for c in dedup.call_args_list), ['sb', 'wb'])
+        self.assertEqual(dispatch.call_count, 2)
+        update.assert_called_once()
+        self.assertEqual(sorted(update.call_args.args[0]), [('sb', 45, 300, '45'), ('wb', 40, 300, '40')])
+        self.assertEqual(len(load_schedule(self.path)), 0)
+
+    def test_cooldown_on_one_spot_keeps_others(self):
+        """Test a spot in cooldown holds only its own alerts."""
+        with patch.object(wind_alert, 'should_send_alert', lambda spot_id: spot_id != 'wb'), \
+                patch.object(wind_alert, 'dispatch_alert', return_value=['SM1']), \
+                patch.object(wind_alert, 'update_states'):
+            self.assertEqual(self.release(), 1)
+        self.assertEqual([entry[3] for entry in load_schedule(self.path).pop_due(float('inf'))], ['wb'])
+
+    def test_suppressed_alerts_kept(self):
+        """Test alerts held back by deduplication stay scheduled."""
+        with patch.object(wind_alert, 'should_send_alert', return_value=False), \
+                patch.object(wind_alert, 'dispatch_alert') as dispatch, \
+                patch.object(wind_alert, 'update_states') as update:
+            self.assertEqual(self.release(), 0)
+        dispatch.assert_not_called()
+        update.assert_not_called()
+        self.assertEqual(len(load_schedule(self.path)), 2)
+
+
+
+class TestDeliveryRetry(unittest.TestCase):
+    """Test resending failed deliveries."""
+
+    def test_retry_to_default_recipient(self):
+        """Test a failed ALERT_PHONE_TO delivery for a spot without subscribers is resent."""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        registry = SpotRegistry(None)
+        registry._load({
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 35, 'sectors': [[270, 337.5]]}],
+            'subscribers': []
+        })
+        store = MagicMock()
+        store.__enter__.return_value.take_failed.return_value = [
+            FailedDelivery('SM1', '+15550000', (('wb', 40, 300),), 0, '30003')]
+
+        with patch.object(wind_alert, 'DeliveryStore', return_value=store), \
+                patch.object(wind_alert, 'ALERT_PHONE_TO', '+15550000'), \
+                patch.object(wind_alert, 'RETRY_SCHEDULE_PATH', os.path.join(tmpdir.name, 'retry.json')), \
+                patch.object(wind_alert, 'DELIVERY_RETRY_DELAY_SECONDS', -1), \
+                patch.object(wind_alert, 'generate_alert_message', return_value='msg'), \
+                patch.object(wind_alert, 'dispatch_alert', return_value=['SM2']) as dispatch:
+            self.assertEqual(wind_alert.retry_failed_deliveries(registry, {'wb': (40, 300)}), 1)
+        self.assertEqual(dispatch.call_args.args[2], ['+15550000'])
+        self.assertEqual(dispatch.call_args.kwargs['attempt'], 1)
+
+
+class TestAllSpots(unittest.TestCase):
+    """Test multi-spot cycle bookkeeping."""
+
+    def test_state_updated_per_delivered_spot(self):
+        """Test each delivered spot is counted once, from its strongest alert."""
+        report = CycleReport(started_at=0, interval=60)
+        report.delivered = [
+            ('+1', [PendingAlert('+1', 'wb', 'Wreck Beach', 38, 300, 0),
+                    PendingAlert('+1', 'sb', 'Spanish Banks', 41, 290, 0)], 'digest'),
+            ('+2', [PendingAlert('+2', 'wb', 'Wreck Beach', 44, 310, 0)], 'solo'),
+        ]
+        runner = SimpleNamespace(run=lambda spots, force: report)
+        with patch.object(wind_alert, 'DRY_RUN', False), \
+                patch.object(wind_alert, 'get_registry', return_value=SpotRegistry(None)), \
+                patch.object(wind_alert, 'release_deferred_alerts'), \
+                patch.object(wind_alert, 'retry_failed_deliveries'), \
+                patch.object(wind_alert, 'record_spot_cycle'), \
+                patch.object(wind_alert, 'update_states') as update:
+            self.assertEqual(wind_alert.run_all_spots(runner), 0)
+        self.assertEqual(sorted(update.call_args.args[0]),
+                         [('sb', 41, 290, 'digest'), ('wb', 44, 310, 'solo')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for run profiling.
+"""
+
+import unittest
+import sys
+import os
+import pstats
+import tempfile
+import tracemalloc
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.profiling import RunProfiler, profiled_call
+
+
+def busy_work(n):
+    return sum(i * i for i in range(n))
+
+
+def allocate(n):
+    return [str(i) * 4 for i in range(n)]
+
+
+class TestRunProfiler(unittest.TestCase):
+    """Test profiling runs to stats files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_cpu_stats_file(self):
+        """Test CPU stats are written in pstats format and summarised."""
+        with RunProfiler('cpu', label='test', out_dir=self.tmpdir.name, top_n=5) as profiler:
+            busy_work(10000)
+
+        self.assertTrue(profiler.path.endswith('.prof'))
+        stats = pstats.Stats(profiler.path)
+        self.assertIn('busy_work', {name for _, _, name in stats.stats})
+        self.assertIn('busy_work', profiler.summary)
+
+    def test_mem_snapshot_file(self):
+        """Test memory snapshots are written and tracing is stopped afterwards."""
+        with RunProfiler('mem', label='test', out_dir=self.tmpdir.name, top_n=5) as profiler:
+            kept = allocate(20000)
+
+        self.assertEqual(len(kept), 20000)
+        self.assertFalse(tracemalloc.is_tracing())
+        snapshot = tracemalloc.Snapshot.load(profiler.path)
+        top = snapshot.statistics('lineno')[0]
+        self.assertEqual(os.path.basename(top.traceback[0].filename), 'test_profiling.py')
+        self.assertIn('peak', profiler.summary)
+
+    def test_written_when_run_fails(self):
+        """Test stats are still written if the profiled block raises."""
+        with self.assertRaises(RuntimeError):
+            with RunProfiler('cpu', out_dir=self.tmpdir.name) as profiler:
+                raise RuntimeError("boom")
+        self.assertTrue(os.path.exists(profiler.path))
+
+    def test_unknown_mode(self):
+        """Test unknown modes are rejected."""
+        with self.assertRaises(ValueError):
+            RunProfiler('gpu')
+
+    def test_profiled_call(self):
+        """Test profiled_call returns the result, only profiling when asked."""
+        self.assertEqual(profiled_call(None, busy_work, 4), 14)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Unit tests for typed wind readings.
+"""
+
+import unittest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.readings import ReadingBatch, Source, WindReading
+from src import wind_data
+
+
+class TestWindReading(unittest.TestCase):
+    """Test the reading record."""
+
+    def test_immutable_and_slotted(self):
+        """Test readings can't be changed or grow attributes."""
+        reading = WindReading(30.0, 315.0, Source.OPEN_METEO)
+        with self.assertRaises(AttributeError):
+            reading.speed = 40.0
+        self.assertFalse(hasattr(reading, '__dict__'))
+
+    def test_dict_round_trip(self):
+        """Test the JSON form rebuilds an equal reading with the shared enum member."""
+        reading = WindReading(30.0, 315.0, Source.ECCC, 1700000000.0)
+        data = json.loads(json.dumps(reading.to_dict()))
+        self.assertEqual(data['source'], 'eccc')
+        rebuilt = WindReading.from_dict(data)
+        self.assertEqual(rebuilt, reading)
+        self.assertIs(rebuilt.source, Source.ECCC)
+
+    def test_source_compares_as_string(self):
+        """Test sources still compare and format as their names."""
+        self.assertEqual(Source.TEST, 'test')
+        self.assertEqual(f"{Source.OPEN_METEO}", 'open-meteo')
+
+
+class TestReadingBatch(unittest.TestCase):
+    """Test the struct-of-arrays container."""
+
+    def test_append_and_index(self):
+        """Test readings come back out as they went in, growing as needed."""
+        batch = ReadingBatch(capacity=1)
+        batch.append(WindReading(20.0, 300.0, Source.ECCC, 100.0))
+        batch.append(WindReading(35.0, 315.0, Source.OPEN_METEO))
+        batch.append(WindReading(40.0, 320.0, Source.TEST, 300.0))
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch[0], WindReading(20.0, 300.0, Source.ECCC, 100.0))
+        self.assertIsNone(batch[1].observed_at)
+        self.assertEqual(batch[-1].source, Source.TEST)
+        self.assertEqual(batch.latest(), batch[2])
+        with self.assertRaises(IndexError):
+            batch[3]
+
+    def test_columns(self):
+        """Test columns are exposed as arrays of the stored length."""
+        batch = ReadingBatch.from_readings(WindReading(float(s), 315.0, Source.OPEN_METEO) for s in range(10))
+        self.assertEqual(batch.speeds.dtype, np.float32)
+        self.assertEqual(float(batch.speeds.max()), 9.0)
+        self.assertEqual(len(list(batch)), 10)
+
+    def test_from_arrays_footprint(self):
+        """Test a large batch stays at 17 bytes per reading."""
+        n = 200_000
+        batch = ReadingBatch.from_arrays(np.arange(n), np.full(n, 30.0), np.full(n, 315.0), Source.OPEN_METEO)
+        self.assertEqual(len(batch), n)
+        self.assertEqual(batch.nbytes, 17 * n)
+        self.assertEqual(batch[n - 1].observed_at, n - 1)
+        self.assertIs(batch[0].source, Source.OPEN_METEO)
+
+
+class TestFetchReadings(unittest.TestCase):
+    """Test fetching returns typed readings through the cache."""
+
+    def test_cached_fetch_returns_reading(self):
+        """Test the cache stores a dict but callers get a WindReading."""
+        stored = {}
+
+        def fake_get_or_fetch(key, fetch, ttl):
+            stored[key] = fetch()
+            return stored[key]
+
+        reading = WindReading(30.0, 315.0, Source.OPEN_METEO)
+        with patch.object(wind_data, 'get_or_fetch', side_effect=fake_get_or_fetch), \
+                patch.object(wind_data, 'fetch_wind_data_uncached', return_value=reading):
+            result = wind_data.fetch_wind_data({'lat': 49.26, 'lon': -123.26})
+
+        self.assertEqual(result, reading)
+        self.assertIsInstance(next(iter(stored.values())), dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
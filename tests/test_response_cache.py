@@ -0,0 +1,90 @@
+"""
+Unit tests for the cross-process response cache.
+"""
+
+import unittest
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.response_cache import get_or_fetch, read_cached, write_cached
+
+
+def _slow_fetch_worker(cache_dir, counter_path, results):
+    """Fetch through the cache, recording each upstream call."""
+    def fetch():
+        with open(counter_path, 'a') as f:
+            f.write('x')
+        time.sleep(0.3)
+        return {'speed': 30.0, 'direction': 315.0, 'source': 'open-meteo'}
+
+    results.put(get_or_fetch('wind:test', fetch, ttl=60, cache_dir=cache_dir))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test caching, expiry and single-flight fetching."""
+
+    def setUp(self):
+        """Use a fresh cache directory per test."""
+        self.cache_dir = tempfile.mkdtemp()
+
+    def test_hit_skips_fetch(self):
+        """Test a fresh entry is returned without fetching."""
+        write_cached('k', {'speed': 20.0}, self.cache_dir)
+        result = get_or_fetch('k', lambda: self.fail("fetch should not be called"),
+                              ttl=60, cache_dir=self.cache_dir)
+        self.assertEqual(result, {'speed': 20.0})
+
+    def test_expired_entry_ignored(self):
+        """Test entries older than the TTL are refetched."""
+        write_cached('k', {'speed': 20.0}, self.cache_dir)
+        self.assertIsNone(read_cached('k', ttl=-1, cache_dir=self.cache_dir))
+        time.sleep(0.01)
+        self.assertIsNone(read_cached('k', ttl=0.001, cache_dir=self.cache_dir))
+
+    def test_none_not_cached(self):
+        """Test failed fetches (None) aren't stored."""
+        self.assertIsNone(get_or_fetch('k', lambda: None, ttl=60, cache_dir=self.cache_dir))
+        self.assertIsNone(read_cached('k', ttl=60, cache_dir=self.cache_dir))
+
+    def test_ttl_zero_disables_cache(self):
+        """Test a TTL of 0 always fetches."""
+        calls = []
+        for _ in range(2):
+            get_or_fetch('k', lambda: calls.append(1) or {'v': 1}, ttl=0, cache_dir=self.cache_dir)
+        self.assertEqual(len(calls), 2)
+
+    def test_corrupt_entry_refetched(self):
+        """Test a corrupt cache file is treated as a miss."""
+        write_cached('k', {'v': 1}, self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                with open(os.path.join(self.cache_dir, name), 'w') as f:
+                    f.write('{truncated')
+        self.assertEqual(get_or_fetch('k', lambda: {'v': 2}, ttl=60, cache_dir=self.cache_dir), {'v': 2})
+
+    def test_concurrent_processes_single_flight(self):
+        """Test overlapping processes coalesce onto one upstream fetch."""
+        ctx = multiprocessing.get_context('fork')
+        counter_path = os.path.join(self.cache_dir, 'calls.txt')
+        results = ctx.Queue()
+        workers = [ctx.Process(target=_slow_fetch_worker, args=(self.cache_dir, counter_path, results))
+                   for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+
+        values = [results.get(timeout=5) for _ in workers]
+        with open(counter_path) as f:
+            self.assertEqual(f.read(), 'x')
+        self.assertTrue(all(v['speed'] == 30.0 for v in values))
+
+
+if __name__ == '__main__':
+    unittest.main()
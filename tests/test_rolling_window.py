@@ -0,0 +1,150 @@
+"""
+Unit tests for the rolling-window sustained wind detector.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rolling_window import RollingWindow, load_windows, save_windows
+from src.conditions import check_alert_condition, sustained_reading
+from src.config import WIND_SPEED_THRESHOLD_KMH
+
+
+class TestRollingWindow(unittest.TestCase):
+    """Test ring buffer statistics and eviction."""
+
+    def test_mean_and_max(self):
+        """Test rolling mean and gust over a few samples."""
+        window = RollingWindow(capacity=4)
+        for i, speed in enumerate([20.0, 30.0, 25.0]):
+            window.push(i * 60, speed, 315)
+        self.assertAlmostEqual(window.mean_speed, 25.0)
+        self.assertEqual(window.max_speed, 30.0)
+        self.assertEqual(len(window), 3)
+
+    def test_capacity_eviction_updates_stats(self):
+        """Test the oldest sample leaves the mean and max when full."""
+        window = RollingWindow(capacity=2)
+        window.push(0, 50.0, 315)
+        window.push(60, 20.0, 315)
+        window.push(120, 30.0, 315)
+        self.assertEqual(len(window), 2)
+        self.assertAlmostEqual(window.mean_speed, 25.0)
+        self.assertEqual(window.max_speed, 30.0)
+
+    def test_min_follows_eviction(self):
+        """Test the rolling min drops a lull once it leaves the window."""
+        window = RollingWindow(capacity=3)
+        for i, speed in enumerate([10.0, 30.0, 20.0, 40.0]):
+            window.push(i * 60, speed, 315)
+        self.assertEqual(window.min_speed, 20.0)
+        window.push(240, 50.0, 315)
+        window.push(300, 60.0, 315)
+        self.assertEqual(window.min_speed, 40.0)
+
+    def test_speed_held_fraction(self):
+        """Test the speed held by a share of the samples."""
+        window = RollingWindow(capacity=8)
+        for i, speed in enumerate([20.0, 40.0, 30.0, 50.0]):
+            window.push(i * 60, speed, 315)
+        self.assertEqual(window.speed_held(), 20.0)
+        self.assertEqual(window.speed_held(0.75), 30.0)
+        self.assertEqual(window.speed_held(0.5), 40.0)
+
+    def test_expire_keeps_sample_at_cutoff(self):
+        """Test expiry keeps the newest sample at or before the cutoff."""
+        window = RollingWindow(capacity=8)
+        for t in (0, 1800, 3600, 5400):
+            window.push(t, 30.0, 315)
+        window.expire(5400 - 3600)
+        self.assertEqual(window.oldest_time, 1800)
+        self.assertEqual(window.span_seconds, 3600)
+
+    def test_direction_wraparound(self):
+        """Test circular mean across north (350° and 10°)."""
+        window = RollingWindow(capacity=4)
+        window.push(0, 30.0, 350)
+        window.push(60, 30.0, 10)
+        self.assertAlmostEqual(min(window.mean_direction, 360 - window.mean_direction), 0, places=3)
+        self.assertGreater(window.direction_consistency, 0.95)
+
+    def test_inconsistent_direction(self):
+        """Test opposing directions give low consistency."""
+        window = RollingWindow(capacity=4)
+        window.push(0, 30.0, 90)
+        window.push(60, 30.0, 270)
+        self.assertLess(window.direction_consistency, 0.01)
+
+    def test_persistence_round_trip(self):
+        """Test windows survive a save/load cycle."""
+        path = os.path.join(tempfile.mkdtemp(), 'windows.bin')
+        window = RollingWindow(capacity=4)
+        window.push(100.0, 22.5, 300)
+        window.push(200.0, 35.0, 320)
+        save_windows({'wreck-beach': window}, path)
+
+        loaded = load_windows(path, capacity=4)
+        self.assertIn('wreck-beach', loaded)
+        self.assertEqual(list(loaded['wreck-beach'].samples()), list(window.samples()))
+
+    def test_load_corrupt_file(self):
+        """Test a corrupt window file falls back to empty."""
+        path = os.path.join(tempfile.mkdtemp(), 'windows.bin')
+        with open(path, 'wb') as f:
+            f.write(b'garbage')
+        self.assertEqual(load_windows(path), {})
+
+
+def check_sustained_condition(window, duration_minutes):
+    """Whether the window's held reading meets the default alert criteria."""
+    reading = sustained_reading(window, duration_minutes)
+    return reading is not None and check_alert_condition(*reading)
+
+
+class TestSustainedCondition(unittest.TestCase):
+    """Test sustained alert criteria."""
+
+    def test_single_spike_does_not_alert(self):
+        """Test one strong sample alone is not sustained."""
+        window = RollingWindow(capacity=8)
+        window.push(0, WIND_SPEED_THRESHOLD_KMH + 20, 315)
+        self.assertFalse(check_sustained_condition(window, 60))
+
+    def test_sustained_wind_alerts(self):
+        """Test steady strong wind over the period alerts."""
+        window = RollingWindow(capacity=8)
+        for t in (0, 1800, 3600):
+            window.push(t, WIND_SPEED_THRESHOLD_KMH + 2, 315)
+        self.assertTrue(check_sustained_condition(window, 60))
+
+    def test_spike_in_weak_window_does_not_alert(self):
+        """Test a spike doesn't lift a weak window's mean over threshold."""
+        window = RollingWindow(capacity=8)
+        for t, speed in ((0, 10.0), (1800, 10.0), (3600, WIND_SPEED_THRESHOLD_KMH + 5)):
+            window.push(t, speed, 315)
+        self.assertFalse(check_sustained_condition(window, 60))
+
+    def test_high_mean_with_lulls_does_not_alert(self):
+        """Test one big reading can't lift lulls over threshold through the mean."""
+        window = RollingWindow(capacity=8)
+        for t, speed in ((0, 20.0), (1800, 20.0), (3600, 80.0)):
+            window.push(t, speed, 315)
+        self.assertGreater(window.mean_speed, WIND_SPEED_THRESHOLD_KMH)
+        self.assertFalse(check_sustained_condition(window, 60))
+
+    def test_fraction_allows_a_lull(self):
+        """Test a configured fraction lets one lull through."""
+        window = RollingWindow(capacity=8)
+        for t, speed in ((0, 40.0), (1200, 20.0), (2400, 40.0), (3600, 40.0)):
+            window.push(t, speed, 315)
+        self.assertEqual(sustained_reading(window, 60)[0], 20.0)
+        self.assertEqual(sustained_reading(window, 60, fraction=0.75)[0], 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
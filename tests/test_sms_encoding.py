@@ -0,0 +1,69 @@
+"""
+Unit tests for SMS encoding and segment calculation.
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sms_encoding import segment_info, optimize_for_sms, to_gsm7, is_gsm7
+
+
+class TestSegmentInfo(unittest.TestCase):
+    """Test GSM-7 and UCS-2 segment counting."""
+
+    def test_gsm7_single_segment(self):
+        """Test 160 GSM-7 characters fit one segment."""
+        info = segment_info("a" * 160)
+        self.assertEqual((info.encoding, info.units, info.segments), ('GSM-7', 160, 1))
+
+    def test_gsm7_concatenated(self):
+        """Test 161 GSM-7 characters need two 153-unit segments."""
+        self.assertEqual(segment_info("a" * 161).segments, 2)
+        self.assertEqual(segment_info("a" * 307).segments, 3)
+
+    def test_extended_characters_count_double(self):
+        """Test extension table characters take two units."""
+        info = segment_info("€" + "a" * 159)
+        self.assertEqual(info.encoding, 'GSM-7')
+        self.assertEqual(info.units, 161)
+        self.assertEqual(info.segments, 2)
+
+    def test_emoji_forces_ucs2(self):
+        """Test an emoji switches to UCS-2 and counts as two code units."""
+        info = segment_info("🌊 " + "a" * 68)
+        self.assertEqual(info.encoding, 'UCS-2')
+        self.assertEqual(info.units, 71)
+        self.assertEqual(info.segments, 2)
+
+
+class TestOptimizer(unittest.TestCase):
+    """Test swapping and stripping characters to save segments."""
+
+    def test_fallback_style_message_fits_one_segment(self):
+        """Test an emoji alert becomes one GSM-7 segment."""
+        message = "🌊 NW wind 38km/h absolutely FIRING at Wreck Beach! Drop everything and get here NOW legend!"
+        self.assertEqual(segment_info(message).segments, 2)
+        optimized = optimize_for_sms(message)
+        self.assertEqual(segment_info(optimized), ('GSM-7', len(optimized), 1))
+        self.assertTrue(optimized.startswith("NW wind 38km/h"))
+
+    def test_lookalikes_swapped(self):
+        """Test smart quotes, dashes and ellipses get GSM-7 equivalents."""
+        self.assertEqual(to_gsm7("It’s “pumping” — go…"), 'It\'s "pumping" - go...')
+        self.assertTrue(is_gsm7(to_gsm7("Café naïve 🏄")))
+
+    def test_gsm7_unchanged(self):
+        """Test GSM-7 text is left alone."""
+        self.assertEqual(optimize_for_sms("W 30km/h go!"), "W 30km/h go!")
+
+    def test_short_ucs2_kept(self):
+        """Test emoji are kept when they don't cost an extra segment."""
+        self.assertEqual(optimize_for_sms("🌊 NW 38km/h!"), "🌊 NW 38km/h!")
+
+
+if __name__ == '__main__':
+    unittest.main()
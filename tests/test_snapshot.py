@@ -0,0 +1,109 @@
+"""
+Unit tests for the warm-start snapshot.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.snapshot import pack, read_snapshot, restore_snapshot, unpack, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test bundling state files and restoring them."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot = self.path('snapshot.bin')
+        self.cache_dir = self.path('cache')
+        self.members = {'state': self.path('state.json'), 'windows': self.path('window.bin'),
+                        'schedule': self.path('schedule.json')}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_pack_round_trip(self):
+        """Test members come back byte for byte, including empty ones."""
+        members = {'state': b'{"count": 2}', 'windows': bytes(range(256)), 'empty': b''}
+        self.assertEqual(unpack(pack(members)), members)
+
+    def test_rejects_other_files(self):
+        """Test files that aren't snapshots, or are a different version, are rejected."""
+        with self.assertRaises(ValueError):
+            unpack(b'{"not": "a snapshot"}')
+        data = bytearray(pack({'state': b'{}'}))
+        data[6] = 99
+        with self.assertRaises(ValueError):
+            unpack(bytes(data))
+
+    def test_corrupt_member_skipped(self):
+        """Test a member failing its checksum is dropped and the rest kept."""
+        data = bytearray(pack({'state': b'{"count": 2}', 'windows': b'\x01\x02'}))
+        data[-1] ^= 0xff
+        self.assertEqual(unpack(bytes(data)), {'state': b'{"count": 2}'})
+
+    def test_cold_run_restored(self):
+        """Test a fresh runner gets back every file from the previous run."""
+        self.write(self.members['state'], b'{"count": 2}')
+        self.write(self.members['windows'], b'\x00\x01\x02')
+        self.write(os.path.join(self.cache_dir, 'abc.json'), b'{"value": 1}')
+        self.write(os.path.join(self.cache_dir, 'abc.lock'), b'')
+
+        self.assertEqual(write_snapshot(self.snapshot, self.members, self.cache_dir, cache_ttl=60)[0], 3)
+        self.assertEqual(set(read_snapshot(self.snapshot)), {'state', 'windows', 'cache/abc.json'})
+
+        # New runner: empty disk except the snapshot
+        os.remove(self.members['state'])
+        os.remove(self.members['windows'])
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+
+        self.assertEqual(restore_snapshot(self.snapshot, self.members, self.cache_dir), 3)
+        self.assertEqual(self.read(self.members['state']), b'{"count": 2}')
+        self.assertEqual(self.read(self.members['windows']), b'\x00\x01\x02')
+        self.assertEqual(os.listdir(self.cache_dir), ['abc.json'])
+        self.assertFalse(os.path.exists(self.members['schedule']))
+
+    def test_expired_cache_left_out(self):
+        """Test cache entries past their TTL aren't carried over."""
+        entry = os.path.join(self.cache_dir, 'old.json')
+        self.write(entry, b'{}')
+        os.utime(entry, (time.time() - 600, time.time() - 600))
+        write_snapshot(self.snapshot, {}, self.cache_dir, cache_ttl=300)
+        self.assertEqual(read_snapshot(self.snapshot), {})
+
+    def test_local_files_win(self):
+        """Test restoring never overwrites a file that already exists."""
+        self.write(self.members['state'], b'{"count": 1}')
+        write_snapshot(self.snapshot, self.members, self.cache_dir)
+        self.write(self.members['state'], b'{"count": 5}')
+
+        self.assertEqual(restore_snapshot(self.snapshot, self.members, self.cache_dir), 0)
+        self.assertEqual(self.read(self.members['state']), b'{"count": 5}')
+
+    def test_unreadable_snapshot_starts_cold(self):
+        """Test a missing or garbage snapshot restores nothing without raising."""
+        self.assertEqual(restore_snapshot(self.snapshot, self.members, self.cache_dir), 0)
+        self.write(self.snapshot, b'garbage')
+        self.assertEqual(restore_snapshot(self.snapshot, self.members, self.cache_dir), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for source health tracking and the circuit breaker.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.source_health import SourceHealth, load_health, CLOSED, OPEN, HALF_OPEN, PROBE_TIMEOUT_SECONDS
+from src.config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_OPEN_SECONDS
+from src import wind_data
+from src.readings import Source
+
+
+class TestSourceHealth(unittest.TestCase):
+    """Test health statistics and breaker transitions."""
+
+    def setUp(self):
+        """Use a temporary health file."""
+        self.path = os.path.join(tempfile.mkdtemp(), 'health.json')
+        self.health = SourceHealth(path=self.path)
+
+    def test_success_rate_and_p95(self):
+        """Test rolling success rate and p95 latency."""
+        for latency in [0.1] * 18 + [2.0, 3.0]:
+            self.health.record_success('a', latency)
+        self.health.record_failure('a', 10.0)
+        self.assertAlmostEqual(self.health.success_rate('a'), 19 / 20)
+        self.assertEqual(self.health.p95_latency('a'), 3.0)
+
+    def test_circuit_opens_after_threshold(self):
+        """Test consecutive failures open the circuit."""
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            self.assertTrue(self.health.allow('a', now=0))
+            self.health.record_failure('a', 10.0, now=0)
+        self.assertEqual(self.health.records['a']['state'], OPEN)
+        self.assertFalse(self.health.allow('a', now=1))
+
+    def test_half_open_probe(self):
+        """Test an open circuit lets one probe through after the cooldown."""
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            self.health.record_failure('a', 10.0, now=0)
+        self.assertTrue(self.health.allow('a', now=CIRCUIT_OPEN_SECONDS))
+        self.assertEqual(self.health.records['a']['state'], HALF_OPEN)
+
+        # A failed probe reopens immediately
+        self.health.record_failure('a', 10.0, now=CIRCUIT_OPEN_SECONDS)
+        self.assertEqual(self.health.records['a']['state'], OPEN)
+        self.assertFalse(self.health.allow('a', now=CIRCUIT_OPEN_SECONDS + 1))
+
+        # A successful probe closes it
+        self.health.allow('a', now=2 * CIRCUIT_OPEN_SECONDS)
+        self.health.record_success('a', 0.2)
+        self.assertEqual(self.health.records['a']['state'], CLOSED)
+
+    def test_half_open_allows_one_probe(self):
+        """Test only one caller probes a half-open circuit until it resolves or times out."""
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            self.health.record_failure('a', 10.0, now=0)
+        self.assertTrue(self.health.allow('a', now=CIRCUIT_OPEN_SECONDS))
+        self.assertFalse(self.health.allow('a', now=CIRCUIT_OPEN_SECONDS + 1))
+
+        # A probe that never reports is given up on
+        later = CIRCUIT_OPEN_SECONDS + PROBE_TIMEOUT_SECONDS
+        self.assertTrue(self.health.allow('a', now=later))
+        self.assertFalse(self.health.allow('a', now=later + 1))
+
+        self.health.record_success('a', 0.2)
+        self.assertTrue(self.health.allow('a', now=later + 2))
+        self.assertIsNone(self.health.records['a']['probe_started_at'])
+
+    def test_ranking_by_latency(self):
+        """Test faster healthy sources are tried first."""
+        self.health.record_success('slow', 4.0)
+        self.health.record_success('fast', 0.3)
+        self.assertEqual(self.health.ranked(['slow', 'fast', 'unmeasured']),
+                         ['fast', 'slow', 'unmeasured'])
+
+    def test_persistence(self):
+        """Test health survives a save/load cycle."""
+        self.health.record_success('a', 0.5)
+        self.health.save()
+        loaded = load_health(self.path)
+        self.assertEqual(loaded.success_rate('a'), 1.0)
+
+    def test_concurrent_saves(self):
+        """Test threads recording and saving at once neither fail nor lose each other's updates."""
+        def fetch(i):
+            health = load_health(self.path)
+            health.record_success(f'source{i % 8}', 0.1)
+            health.save()
+
+        with patch('src.source_health.log') as log, ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(fetch, range(160)))
+        log.error.assert_not_called()
+
+        with open(self.path) as f:
+            records = json.load(f)
+        self.assertEqual(sorted(records), [f'source{i}' for i in range(8)])
+        self.assertEqual(sum(len(r['outcomes']) for r in records.values()), 160)
+        self.assertEqual([name for name in os.listdir(os.path.dirname(self.path))], ['health.json'])
+
+
+ECCC_XML = '<xml><windSpeed>20</windSpeed><windDirection>NW</windDirection></xml>'
+
+
+class TestSourceOrdering(unittest.TestCase):
+    """Test fetch_wind_data_uncached uses the breaker."""
+
+    def setUp(self):
+        """Start each test with empty health."""
+        self.health = SourceHealth(path=os.path.join(tempfile.mkdtemp(), 'health.json'))
+        patcher = patch.object(wind_data, 'load_health', return_value=self.health)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_open_circuit_skipped(self):
+        """Test a source with an open circuit isn't called."""
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            self.health.record_failure('open-meteo', 10.0)
+        with patch.object(wind_data.OPEN_METEO, 'fetch_sync') as mock_om, \
+                patch.object(wind_data.ECCC, 'fetch_sync', return_value=ECCC_XML):
+            result = wind_data.fetch_wind_data_uncached({'lat': 49.26, 'lon': -123.26})
+        mock_om.assert_not_called()
+        self.assertIs(result.source, Source.ECCC)
+
+    def test_failure_falls_back_and_is_recorded(self):
+        """Test a failing primary falls back and records the failure."""
+        with patch.object(wind_data.OPEN_METEO, 'fetch_sync', side_effect=Exception("down")), \
+                patch.object(wind_data.ECCC, 'fetch_sync', return_value=ECCC_XML):
+            result = wind_data.fetch_wind_data_uncached({'lat': 49.26, 'lon': -123.26})
+        self.assertIs(result.source, Source.ECCC)
+        self.assertEqual(self.health.success_rate('open-meteo'), 0.0)
+        self.assertEqual(self.health.success_rate('eccc'), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Unit tests for the spot and subscriber registry.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import dataclasses
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spot_registry import SpotRegistry, build_spot, build_subscriber, compass_index, sectors_to_mask
+from src.conditions import check_alert_condition, is_good_wind_direction
+from src.config import DEFAULT_SPOT_ID
+
+
+class TestSpotRegistry(unittest.TestCase):
+    """Test registry parsing, derived values and reloading."""
+
+    def setUp(self):
+        """Write a registry file to a temporary directory."""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'spots.json')
+        self.data = {
+            'spots': [
+                {'id': 'wreck-beach', 'lat': 49.2611, 'lon': -123.2614, 'threshold': 35},
+                {'id': 'spanish-banks', 'lat': 49.2768, 'lon': -123.2205,
+                 'threshold': 18, 'units': 'knots', 'sectors': [[270, 337.5]]}
+            ],
+            'subscribers': [
+                {'id': 'a', 'phone': '+16040000001', 'spots': ['wreck-beach', 'spanish-banks']},
+                {'id': 'b', 'phone': '+16040000002', 'spots': ['wreck-beach']}
+            ]
+        }
+        self._write(self.data)
+
+    def _write(self, data, mtime=None):
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_lookup_and_subscribers(self):
+        """Test spot lookup by id and subscribers per spot."""
+        registry = SpotRegistry(self.path)
+        self.assertEqual(registry.get('wreck-beach').threshold_kmh, 35)
+        self.assertIsNone(registry.get('missing'))
+        self.assertEqual([s.id for s in registry.subscribers_for('wreck-beach')], ['a', 'b'])
+        self.assertEqual([s.id for s in registry.subscribers_for('spanish-banks')], ['a'])
+
+    def test_unit_conversion(self):
+        """Test knots thresholds are converted to km/h once."""
+        spot = SpotRegistry(self.path).get('spanish-banks')
+        self.assertAlmostEqual(spot.threshold_kmh, 18 * 1.852, places=3)
+        self.assertEqual(spot.units, 'knots')
+
+    def test_sector_mask_precomputed(self):
+        """Test each spot carries its sectors' compass point mask."""
+        registry = SpotRegistry(self.path)
+        for spot in registry.spots.values():
+            self.assertEqual(spot.sector_mask, sectors_to_mask(spot.sectors))
+
+    def test_reload_swaps_whole_snapshot(self):
+        """Test a reload replaces every table at once and the tables are read-only."""
+        self._write(self.data, mtime=1000)
+        registry = SpotRegistry(self.path)
+        before = registry._snapshot
+        self.data['subscribers'].append({'id': 'c', 'phone': '+16040000003', 'spots': ['spanish-banks']})
+        self._write(self.data, mtime=2000)
+        self.assertTrue(registry.reload_if_changed())
+
+        self.assertIsNot(registry._snapshot, before)
+        self.assertEqual(len(before.subscribers), 2)
+        self.assertEqual([s.id for s in registry.subscribers_for('spanish-banks')], ['a', 'c'])
+        self.assertEqual(registry.version, before.version + 1)
+        with self.assertRaises(TypeError):
+            registry.spots['new'] = registry.get('wreck-beach')
+
+    def test_spots_are_immutable(self):
+        """Test spots can't be modified after parsing."""
+        spot = SpotRegistry(self.path).get('wreck-beach')
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            spot.threshold_kmh = 10
+        self.assertFalse(hasattr(spot, '__dict__'))
+
+    def test_default_sectors_match_conditions(self):
+        """Test the default sectors agree with is_good_wind_direction."""
+        spot = SpotRegistry(self.path).get('wreck-beach')
+        for degrees in range(0, 360, 5):
+            self.assertEqual(spot.is_good_direction(degrees), is_good_wind_direction(degrees))
+
+    def test_sector_mask(self):
+        """Test compass point masks for a wrapping sector."""
+        mask = sectors_to_mask([(337.5, 22.5)])
+        self.assertEqual(mask, (1 << 15) | (1 << 0) | (1 << 1))
+        self.assertEqual(compass_index(315), 14)
+        self.assertEqual(compass_index(359), 0)
+
+    def test_spot_condition(self):
+        """Test alert conditions use the spot's threshold and sectors."""
+        spot = SpotRegistry(self.path).get('spanish-banks')
+        self.assertTrue(check_alert_condition(34.0, 300, spot))
+        self.assertFalse(check_alert_condition(34.0, 10, spot))
+        self.assertFalse(check_alert_condition(30.0, 300, spot))
+
+    def test_reload_only_on_mtime_change(self):
+        """Test the file is only re-parsed when its mtime changes."""
+        self._write(self.data, mtime=1000)
+        registry = SpotRegistry(self.path)
+        self.assertFalse(registry.reload_if_changed())
+
+        self.data['spots'][0]['threshold'] = 40
+        self._write(self.data, mtime=2000)
+        self.assertTrue(registry.reload_if_changed())
+        self.assertEqual(registry.get('wreck-beach').threshold_kmh, 40)
+
+    def test_bad_reload_keeps_previous(self):
+        """Test an invalid file doesn't replace the loaded registry."""
+        self._write(self.data, mtime=1000)
+        registry = SpotRegistry(self.path)
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        os.utime(self.path, (2000, 2000))
+        self.assertFalse(registry.reload_if_changed())
+        self.assertIsNotNone(registry.get('wreck-beach'))
+
+    def test_unknown_spot_rejected(self):
+        """Test subscribers can't follow undefined spots."""
+        self.data['subscribers'][0]['spots'] = ['nowhere']
+        self._write(self.data)
+        with self.assertRaises(ValueError):
+            SpotRegistry(self.path)
+
+    def test_toml_registry(self):
+        """Test TOML registry files are supported."""
+        path = os.path.join(self.dir, 'spots.toml')
+        with open(path, 'w') as f:
+            f.write('[[spots]]\nid = "wreck-beach"\nlat = 49.26\nlon = -123.26\n')
+        registry = SpotRegistry(path)
+        self.assertEqual(registry.default_spot().id, 'wreck-beach')
+
+    def test_default_registry(self):
+        """Test the environment config gives a single default spot."""
+        registry = SpotRegistry(None)
+        self.assertEqual(registry.default_spot().id, DEFAULT_SPOT_ID)
+
+    def test_invalid_units(self):
+        """Test unknown speed units are rejected."""
+        with self.assertRaises(ValueError):
+            build_spot({'id': 'x', 'lat': 0, 'lon': 0, 'units': 'mph'})
+
+    def test_subscriber_quiet_hours(self):
+        """Test subscribers' own quiet hours override QUIET_HOURS, which covers everyone else."""
+        self.data['subscribers'][0]['quiet_hours'] = '22-7'
+        self.data['subscribers'][1]['quiet_hours'] = ''
+        self._write(self.data)
+        registry = SpotRegistry(self.path)
+        with patch('src.spot_registry.QUIET_HOURS', '23-6'):
+            self.assertEqual(registry.quiet_hours_for('+16040000001'), '22-7')
+            self.assertEqual(registry.quiet_hours_for('+16040000002'), '')
+            self.assertEqual(registry.quiet_hours_for(None), '23-6')
+
+    def test_invalid_quiet_hours(self):
+        """Test malformed subscriber quiet hours are rejected."""
+        with self.assertRaises(ValueError):
+            build_subscriber({'id': 'x', 'phone': '+1', 'quiet_hours': 'late'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,13 @@ import os
 import json
 import tempfile
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.state_manager import load_state, save_state, should_send_alert, update_state
+from src.state_manager import (load_state, save_state, should_send_alert, update_state, update_states,
+                               cooldown_status)
 from src import config
 
 
@@ -118,6 +120,54 @@ class TestStateManager(unittest.TestCase):
         self.assertEqual(state['alert_count_today'], 1)
         self.assertEqual(state['last_message'], 'Test message')
 
+    def test_cooldown_status(self):
+        """Test cooldown summary reports remaining hours and today's count."""
+        now = datetime.now()
+        state = {
+            'last_alert_time': (now - timedelta(hours=3)).isoformat(),
+            'alert_count_today': 2,
+            'last_reset_date': now.date().isoformat()
+        }
+        status = cooldown_status(state)
+        self.assertEqual(status['alerts_today'], 2)
+        self.assertAlmostEqual(status['cooldown_remaining_hours'], config.ALERT_COOLDOWN_HOURS - 3, places=1)
+
+        state['last_reset_date'] = (now - timedelta(days=1)).date().isoformat()
+        self.assertEqual(cooldown_status(state)['alerts_today'], 0)
+
+
+
+class TestSpotState(unittest.TestCase):
+    """Test cooldown and daily limits are kept per spot."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch('src.state_manager.STATE_FILE_PATH', os.path.join(self.tmpdir.name, 'state.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cooldown_is_per_spot(self):
+        """Test an alert for one spot doesn't hold back another."""
+        update_state(40, 300, 'wb', spot_id='wb')
+        self.assertFalse(should_send_alert(spot_id='wb'))
+        self.assertTrue(should_send_alert(spot_id='sb'))
+        self.assertEqual(cooldown_status(spot_id='sb')['alerts_today'], 0)
+
+    def test_default_spot_uses_top_level_record(self):
+        """Test the default spot shares the single-spot layout."""
+        update_state(40, 300, spot_id=config.DEFAULT_SPOT_ID)
+        self.assertEqual(load_state()['alert_count_today'], 1)
+        self.assertFalse(should_send_alert())
+
+    def test_update_states_counts_each_spot_once(self):
+        """Test one update covers several spots, each against its own count."""
+        update_states([('wb', 40, 300, 'a'), ('sb', 45, 300, 'b')])
+        state = load_state()
+        self.assertEqual(state['spots']['wb']['alert_count_today'], 1)
+        self.assertEqual(state['spots']['sb']['last_message'], 'b')
+        self.assertEqual(state['alert_count_today'], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Unit tests for the status endpoint.
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import urllib.error
+import urllib.request
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.status_server import build_snapshot, current_snapshot, publish_snapshot, start_status_server
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test snapshot rendering."""
+
+    def test_precomputed_forms(self):
+        """Test the body, gzip body and ETag agree."""
+        snapshot = build_snapshot({'speed_kmh': 38.0, 'decision': 'sent'})
+        self.assertEqual(json.loads(snapshot.body), {'speed_kmh': 38.0, 'decision': 'sent'})
+        self.assertEqual(gzip.decompress(snapshot.gzip_body), snapshot.body)
+        self.assertEqual(snapshot.etag, build_snapshot({'decision': 'sent', 'speed_kmh': 38.0}).etag)
+        self.assertNotEqual(snapshot.etag, build_snapshot({'decision': 'suppressed'}).etag)
+
+    def test_publish_swaps(self):
+        """Test publishing replaces the current snapshot."""
+        published = publish_snapshot({'decision': 'below_criteria'})
+        self.assertIs(current_snapshot(), published)
+
+
+class TestStatusServer(unittest.TestCase):
+    """Test HTTP responses."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = start_status_server(0, host='127.0.0.1')
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path='/status', headers=None):
+        request = urllib.request.Request(self.url + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), b''
+
+    def test_serves_json(self):
+        """Test the latest snapshot is served as JSON."""
+        publish_snapshot({'decision': 'sent', 'speed_kmh': 41.2})
+        status, headers, body = self.get()
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(body)['speed_kmh'], 41.2)
+
+    def test_gzip(self):
+        """Test clients accepting gzip get the compressed body."""
+        snapshot = publish_snapshot({'decision': 'sent'})
+        status, headers, body = self.get(headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(headers.get('Content-Encoding'), 'gzip')
+        self.assertEqual(gzip.decompress(body), snapshot.body)
+
+    def test_not_modified(self):
+        """Test a matching ETag gets 304 until the snapshot changes."""
+        snapshot = publish_snapshot({'decision': 'suppressed'})
+        status, _, _ = self.get(headers={'If-None-Match': snapshot.etag})
+        self.assertEqual(status, 304)
+
+        publish_snapshot({'decision': 'sent'})
+        status, _, _ = self.get(headers={'If-None-Match': snapshot.etag})
+        self.assertEqual(status, 200)
+
+    def test_unknown_path(self):
+        """Test other paths are 404."""
+        status, _, _ = self.get('/secrets')
+        self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
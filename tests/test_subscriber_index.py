@@ -0,0 +1,127 @@
+"""
+Unit tests for the subscriber matching index.
+"""
+
+import unittest
+import sys
+import os
+import random
+from datetime import datetime
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.subscriber_index import SubscriberIndex, get_index
+from src.alert_rules import ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS
+from src.spot_registry import SpotRegistry, in_sectors, sectors_to_mask
+
+NW_ONLY = ((303.75, 326.25),)
+SATURDAY_9AM = datetime(2025, 1, 18, 9, 0)
+
+
+class TestSubscriberIndex(unittest.TestCase):
+    """Test index queries and incremental updates."""
+
+    def test_query_threshold_and_sector(self):
+        """Test only subscribers with a low enough threshold and matching sector are returned."""
+        index = SubscriberIndex()
+        index.add('low', 'wb', (20, float('inf'), ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS))
+        index.add('high', 'wb', (40, float('inf'), ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS))
+        index.add('nw', 'wb', (30, float('inf'), NW_ONLY, ALL_HOURS, ALL_DAYS))
+        index.add('capped', 'wb', (30, 35, ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS))
+
+        self.assertEqual(index.query('wb', 38, 315), ['low', 'nw'])
+        self.assertEqual(index.query('wb', 38, 180), ['low'])
+        self.assertEqual(index.query('wb', 33, 180), ['low', 'capped'])
+        self.assertEqual(index.query('other', 38, 315), [])
+
+    def test_exact_threshold_matches(self):
+        """Test a speed equal to the threshold matches."""
+        index = SubscriberIndex()
+        index.add('a', 'wb', (38, float('inf'), ALL_DIRECTIONS, ALL_HOURS, ALL_DAYS))
+        self.assertEqual(index.query('wb', 38, 0), ['a'])
+
+    def test_time_windows(self):
+        """Test hour and day windows apply when a time is given."""
+        index = SubscriberIndex()
+        index.add('weekday', 'wb', (20, float('inf'), ALL_DIRECTIONS, ALL_HOURS, 0b11111))
+        self.assertEqual(index.query('wb', 30, 0), ['weekday'])
+        self.assertEqual(index.query('wb', 30, 0, SATURDAY_9AM), [])
+
+    def test_remove_and_slot_reuse(self):
+        """Test removing rules clears bitmaps and frees slots."""
+        index = SubscriberIndex()
+        index.add('a', 'wb', (20, float('inf'), NW_ONLY, ALL_HOURS, ALL_DAYS))
+        self.assertNotEqual(index.sector_members('wb', 315), 0)
+        index.remove('a', 'wb')
+        self.assertEqual(index.sector_members('wb', 315), 0)
+        self.assertEqual(index.query('wb', 50, 315), [])
+        index.add('b', 'wb', (20, float('inf'), NW_ONLY, ALL_HOURS, ALL_DAYS))
+        self.assertEqual(index.sector_members('wb', 315), 1)
+
+    def test_matches_brute_force(self):
+        """Test queries agree with checking every rule."""
+        rng = random.Random(11)
+        index, rules = SubscriberIndex(), {}
+        for i in range(2000):
+            lo = rng.uniform(10, 50)
+            start = rng.uniform(0, 360)
+            sectors = ((start, (start + rng.uniform(5, 200)) % 360),)
+            rule = (lo, lo + rng.uniform(0, 30), sectors, ALL_HOURS, ALL_DAYS)
+            rules[f"s{i}"] = rule
+            index.add(f"s{i}", 'wb', rule)
+        for _ in range(50):
+            speed, direction = rng.uniform(0, 80), rng.uniform(0, 360)
+            expected = {sub for sub, (lo, hi, sectors, _, _) in rules.items()
+                        if lo <= speed <= hi and in_sectors(direction, sectors)}
+            self.assertEqual(set(index.query('wb', speed, direction)), expected)
+
+    def test_sync_is_incremental(self):
+        """Test registry reloads only touch changed rules."""
+        registry = SpotRegistry(None)
+        data = {
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 35}],
+            'subscribers': [
+                {'id': 'a', 'phone': '+1', 'spots': ['wb'], 'rule': 'speed>=30'},
+                {'id': 'b', 'phone': '+2', 'spots': ['wb']}
+            ]
+        }
+        registry._load(data)
+        index = get_index(registry)
+        self.assertEqual(index.query('wb', 32, 315), ['a'])
+
+        data['subscribers'][1]['rule'] = 'speed>=25'
+        del data['subscribers'][0]
+        registry._load(data)
+        self.assertEqual(index.sync(registry), (1, 1))
+        self.assertEqual(index.query('wb', 32, 315), ['b'])
+        self.assertEqual(index.sync(registry), (0, 0))
+
+    def test_spot_mask_reused(self):
+        """Test default rules take the spot's precomputed mask instead of recomputing it."""
+        registry = SpotRegistry(None)
+        registry._load({
+            'spots': [{'id': 'wb', 'lat': 49.26, 'lon': -123.26, 'threshold': 35}],
+            'subscribers': [{'id': 'a', 'phone': '+1', 'spots': ['wb']},
+                            {'id': 'b', 'phone': '+2', 'spots': ['wb'], 'rule': 'dir=180-260'}]
+        })
+        with patch('src.subscriber_index.sectors_to_mask', wraps=sectors_to_mask) as compute:
+            index = SubscriberIndex()
+            index.sync(registry)
+            index.remove('a', 'wb')
+            index.remove('b', 'wb')
+        compute.assert_called_once_with(((180.0, 260.0),))
+
+    def test_sector_edges_exact(self):
+        """Test directions just outside a rule's sector don't match via the shared compass point."""
+        index = SubscriberIndex()
+        index.add('w-n', 'wb', (20, float('inf'), ((250.0, 20.0),), ALL_HOURS, ALL_DAYS))
+        self.assertEqual(index.query('wb', 30, 252), ['w-n'])
+        self.assertEqual(index.query('wb', 30, 245), [])
+        self.assertEqual(index.query('wb', 30, 20), ['w-n'])
+        self.assertEqual(index.query('wb', 30, 25), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Unit tests for pluggable weather sources.
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.readings import Source, WindReading
+from src.source_health import SourceHealth
+from src.wind_data import ECCC
+from src.weather_sources import (WeatherSource, distance_km, fetch_readings, get_source, load_plugins,
+                                 merge_readings, register_source, registered_sources, unregister_source)
+
+SPOT = {'lat': 49.2611, 'lon': -123.2614}
+
+
+class FakeSource(WeatherSource):
+    """Async source returning a fixed payload after a delay."""
+
+    def __init__(self, name, payload=None, delay=0.0, error=None, **attrs):
+        self.name = name
+        self.payload = payload
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        for key, value in attrs.items():
+            setattr(self, key, value)
+
+    async def fetch(self, coordinates):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.payload
+
+    def parse(self, payload):
+        for speed, direction in payload:
+            yield WindReading(speed, direction, self.kind)
+
+
+class TestWeatherSource(unittest.TestCase):
+    """Test the source contract."""
+
+    def test_declared_units_converted(self):
+        """Test readings are converted from the declared unit to km/h."""
+        buoy = FakeSource('buoy', speed_unit='kn')
+        reading = buoy.first_reading([(20, 315)])
+        self.assertAlmostEqual(reading.speed, 37.04)
+        self.assertIs(reading.source, Source.STATION)
+
+    def test_parse_stops_after_first_reading(self):
+        """Test only the current reading is parsed from a streaming payload."""
+        def payload():
+            yield (30, 315)
+            raise AssertionError("parsed past the current reading")
+        self.assertEqual(FakeSource('gauge').first_reading(payload()).speed, 30)
+
+    def test_empty_payload(self):
+        """Test a payload without readings is an error."""
+        with self.assertRaises(ValueError):
+            FakeSource('gauge').first_reading([])
+
+    def test_location_limits_use(self):
+        """Test fixed stations only serve nearby spots."""
+        station = FakeSource('lighthouse', location=(49.3301, -123.2650), max_distance_km=10)
+        self.assertAlmostEqual(distance_km(station.location, (SPOT['lat'], SPOT['lon'])), 7.7, places=1)
+        self.assertTrue(station.serves(SPOT))
+        self.assertFalse(station.serves({'lat': 49.9, 'lon': -123.2}))
+        self.assertTrue(FakeSource('model').serves({'lat': 0, 'lon': 0}))
+
+    def test_eccc_only_serves_nearby_spots(self):
+        """Test the YVR station serves Vancouver spots but not distant ones."""
+        self.assertTrue(ECCC.serves(SPOT))
+        self.assertFalse(ECCC.serves({'lat': 50.7, 'lon': -120.3}))
+
+
+class TestRegistry(unittest.TestCase):
+    """Test registering and loading sources."""
+
+    def test_register_and_lookup(self):
+        """Test sources are found by name after the built-ins."""
+        source = register_source(FakeSource('test-anemometer'))
+        self.addCleanup(unregister_source, 'test-anemometer')
+        self.assertIs(get_source('test-anemometer'), source)
+        self.assertEqual(registered_sources()[-1], 'test-anemometer')
+        with self.assertRaises(ValueError):
+            get_source('nowhere')
+
+    def test_invalid_source(self):
+        """Test sources need a name and a known unit."""
+        with self.assertRaises(ValueError):
+            register_source(FakeSource(''))
+        with self.assertRaises(ValueError):
+            register_source(FakeSource('furlongs', speed_unit='furlongs/fortnight'))
+
+    def test_load_plugins(self):
+        """Test plugin modules register on import, and bad modules are logged not raised."""
+        plugin_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(plugin_dir.cleanup)
+        with open(os.path.join(plugin_dir.name, 'test_buoy_plugin.py'), 'w') as f:
+            f.write("from src.weather_sources import WeatherSource, register_source\n"
+                    "class Buoy(WeatherSource):\n"
+                    "    name = 'test-buoy'\n"
+                    "    speed_unit = 'm/s'\n"
+                    "register_source(Buoy())\n")
+        sys.path.insert(0, plugin_dir.name)
+        self.addCleanup(sys.path.remove, plugin_dir.name)
+        self.addCleanup(sys.modules.pop, 'test_buoy_plugin', None)
+        self.addCleanup(unregister_source, 'test-buoy')
+
+        load_plugins('test_buoy_plugin, no_such_plugin_module')
+        self.assertEqual(get_source('test-buoy').speed_unit, 'm/s')
+
+
+class TestFetchReadings(unittest.TestCase):
+    """Test concurrent fetching and merging."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.health = SourceHealth(path=os.path.join(self.tmpdir.name, 'health.json'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fetch(self, sources, merge):
+        return asyncio.run(fetch_readings(SPOT, sources, self.health, merge=merge))
+
+    def test_fetched_concurrently(self):
+        """Test sources are fetched at the same time, not one after another."""
+        sources = [FakeSource(f's{i}', [(30 + i, 315)], delay=0.2) for i in range(4)]
+        started = time.monotonic()
+        reading = self.fetch(sources, 'mean')
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertAlmostEqual(reading.speed, 31.5)
+        self.assertIs(reading.source, Source.MERGED)
+
+    def test_first_prefers_order_and_falls_back(self):
+        """Test 'first' takes the highest-ranked success, even if it is slower."""
+        primary = FakeSource('primary', [(40, 315)], delay=0.1)
+        backup = FakeSource('backup', [(20, 300)])
+        self.assertEqual(self.fetch([primary, backup], 'first').speed, 40)
+        self.assertEqual(backup.calls, 0)
+
+        broken = FakeSource('broken', error=ConnectionError("down"))
+        self.assertEqual(self.fetch([broken, backup], 'first').speed, 20)
+        self.assertEqual(self.health.success_rate('broken'), 0.0)
+        self.assertEqual(backup.calls, 1)
+
+    def test_first_falls_back_after_timeout(self):
+        """Test 'first' requests the next source once the primary times out."""
+        slow = FakeSource('slow', [(40, 315)], delay=1.0, timeout=0.05)
+        backup = FakeSource('backup', [(20, 300)])
+        self.assertEqual(self.fetch([slow, backup], 'first').speed, 20)
+        self.assertEqual(self.health.success_rate('slow'), 0.0)
+
+    def test_timeout_is_a_failure(self):
+        """Test a source over its timeout is dropped and recorded as failed."""
+        slow = FakeSource('slow', [(40, 315)], delay=1.0, timeout=0.05)
+        fast = FakeSource('fast', [(25, 315)])
+        reading = self.fetch([slow, fast], 'mean')
+        self.assertEqual(reading.speed, 25)
+        self.assertEqual(self.health.success_rate('slow'), 0.0)
+        self.assertEqual(self.health.success_rate('fast'), 1.0)
+
+    def test_all_fail(self):
+        """Test None is returned when every source fails."""
+        self.assertIsNone(self.fetch([FakeSource('a', error=ValueError("bad"))], 'first'))
+
+    def test_unknown_merge(self):
+        """Test unknown merge policies are rejected."""
+        with self.assertRaises(ValueError):
+            self.fetch([], 'vote')
+
+    def test_merge_directions_circularly(self):
+        """Test directions either side of north merge to north."""
+        merged = merge_readings([WindReading(30, 350, Source.ECCC), WindReading(40, 10, Source.OPEN_METEO)])
+        self.assertAlmostEqual(merged.speed, 35)
+        self.assertTrue(merged.direction > 359.9 or merged.direction < 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.conditions import is_northwest, check_alert_condition
-from src.unit_conversions import convert_wind_speed, CONVERSIONS
+from src.unit_conversions import convert_wind_speed, CONVERSIONS, compass_to_degrees, parse_unit_label
 
 
 class TestWindCalculations(unittest.TestCase):
@@ -81,6 +81,21 @@ class TestWindCalculations(unittest.TestCase):
         back_to_kmh = convert_wind_speed(knots_value, 'knots', 'kmh')
         self.assertAlmostEqual(original, back_to_kmh, places=1)
 
+    def test_unit_labels(self):
+        """Test source unit labels map to conversion units."""
+        self.assertEqual(parse_unit_label('km/h'), 'kmh')
+        self.assertEqual(parse_unit_label('kn'), 'knots')
+        self.assertEqual(parse_unit_label(' M/S '), 'ms')
+        with self.assertRaises(ValueError):
+            parse_unit_label('mp/h')
+
+    def test_compass_to_degrees(self):
+        """Test compass points convert to degrees."""
+        self.assertEqual(compass_to_degrees('NW'), 315.0)
+        self.assertEqual(compass_to_degrees('wsw'), 247.5)
+        self.assertIsNone(compass_to_degrees('CALM'))
+        self.assertEqual(compass_to_degrees('', default=0), 0)
+
     def test_alert_condition_with_exact_threshold(self):
         """Test alert condition at exact threshold (25 km/h)."""
         # Exactly at threshold should trigger
@@ -11,6 +11,7 @@ from unittest.mock import patch, MagicMock
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.wind_data import parse_openmeteo, fetch_wind_data
+from src.readings import Source, WindReading
 
 
 class TestWindData(unittest.TestCase):
@@ -25,9 +26,9 @@ class TestWindData(unittest.TestCase):
             }
         }
         result = parse_openmeteo(data)
-        self.assertEqual(result['speed'], 15.5)
-        self.assertEqual(result['direction'], 310)
-        self.assertEqual(result['source'], 'open-meteo')
+        self.assertEqual(result.speed, 15.5)
+        self.assertEqual(result.direction, 310)
+        self.assertIs(result.source, Source.OPEN_METEO)
 
     def test_parse_openmeteo_missing_data(self):
         """Test parsing Open-Meteo response with missing data."""
@@ -67,9 +68,9 @@ class TestWindData(unittest.TestCase):
 
         result = fetch_wind_data()
         self.assertIsNotNone(result)
-        self.assertEqual(result['speed'], 25.0)
-        self.assertEqual(result['direction'], 315.0)
-        self.assertEqual(result['source'], 'open-meteo')
+        self.assertEqual(result.speed, 25.0)
+        self.assertEqual(result.direction, 315.0)
+        self.assertIs(result.source, Source.OPEN_METEO)
 
     @patch('wind_data.requests.get')
     def test_fetch_wind_data_fallback(self, mock_get):
@@ -81,14 +82,10 @@ class TestWindData(unittest.TestCase):
         ]
 
         with patch('wind_data.fetch_eccc_data') as mock_eccc:
-            mock_eccc.return_value = {
-                'speed': 20.0,
-                'direction': 315.0,
-                'source': 'eccc'
-            }
+            mock_eccc.return_value = WindReading(20.0, 315.0, Source.ECCC)
             result = fetch_wind_data()
             self.assertIsNotNone(result)
-            self.assertEqual(result['source'], 'eccc')
+            self.assertIs(result.source, Source.ECCC)
             mock_eccc.assert_called_once()
 
     @patch('wind_data.requests.get')
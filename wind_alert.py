@@ -8,25 +8,389 @@ when north-westerly winds exceed 25 km/h.
 
 import argparse
 import logging
+import sqlite3
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from src.logger import setup_logging
 from src.wind_data import fetch_wind_data
-from src.conditions import check_alert_condition
-from src.state_manager import should_send_alert, update_state
+from src.ensemble import fetch_consensus
+from src.readings import Source, WindReading
+from src.conditions import check_alert_condition, sustained_reading
+from src.state_manager import should_send_alert, update_state, update_states, cooldown_status, load_state
 from src.sms_sender import send_sms
-from src.config import DRY_RUN
+from src.clients import get_twilio_client, client_health
+from src.config import DRY_RUN, SUSTAINED_WINDOW_MINUTES, CHECK_INTERVAL_MINUTES, PIPELINE_MODE, STATUS_PORT
+from src.config import HISTORY_EXPORT_DIR, DEFAULT_SPOT_ID, PROFILE_SAMPLE_EVERY, ENSEMBLE_MODELS
+from src.config import (ALERT_PHONE_TO, CALLBACK_PORT, DELIVERY_DB_PATH, DELIVERY_RETRY_DELAY_SECONDS,
+                        RETRY_SCHEDULE_PATH, SCHEDULE_PATH, SNAPSHOT_PATH)
+from src.rolling_window import RollingWindow, load_windows, save_windows
 from src.message_generator import generate_alert_message
+from src.message_synth import DEFAULT_SPOT_NAME
+from src.spot_registry import get_registry
+from src.subscriber_index import get_index
+from src.delivery_scheduler import load_schedule, quiet_hours_end
+from src.dispatch_queue import DispatchQueue, alert_score
+from src.status_server import publish_snapshot, start_status_server
+from src.history import record_cycle, export_history
+from src.history_import import import_history
+from src.profiling import MODES as PROFILE_MODES, profiled_call
+from src.cycle_runner import CycleRunner, CycleReport
+from src.delivery_status import (CALLBACK_PATH, CallbackBuffer, DeliveryStore, post_test_callbacks,
+                                 start_callback_server, synthetic_callbacks)
+from src.snapshot import restore_snapshot, write_snapshot
+from src.grid_cells import fetch_coordinates, fetch_key
 
 # Setup logging
 log = setup_logging()
 
 
+def update_window(spot, wind_speed: float, wind_direction: float) -> RollingWindow:
+    """
+    Add the reading to the spot's rolling window, dropping readings older
+    than SUSTAINED_WINDOW_MINUTES.
+
+    Args:
+        spot: Registry Spot the reading belongs to
+        wind_speed: Wind speed in km/h
+        wind_direction: Wind direction in degrees
+
+    Returns:
+        The spot's updated window
+    """
+    now = time.time()
+    windows = load_windows()
+    window = windows.setdefault(spot.id, RollingWindow())
+    window.push(now, wind_speed, wind_direction)
+    window.expire(now - SUSTAINED_WINDOW_MINUTES * 60)
+    save_windows(windows)
+
+    stats = window.summary()
+    log.info(f"Rolling window: {stats['samples']} samples over {stats['span_minutes']:.0f} min, "
+             f"mean {stats['mean_speed']:.1f} km/h @ {stats['mean_direction']:.0f}°, "
+             f"gust {stats['gust']:.1f} km/h, consistency {stats['consistency']:.2f}")
+
+    return window
+
+
+def select_recipients(registry, spot, wind_speed: float, wind_direction: float) -> List[Optional[str]]:
+    """
+    Who a reading should alert.
+
+    Subscriber rules are matched on their own terms (a rule's threshold and
+    directions replace the spot's, rather than narrowing them); the spot's
+    own conditions only decide for spots without subscribers.
+
+    Args:
+        registry: SpotRegistry holding the subscribers
+        spot: Spot the reading belongs to
+        wind_speed: Wind speed in km/h
+        wind_direction: Wind direction in degrees
+
+    Returns:
+        Phone numbers of subscribers whose rules match; for a spot with no
+        subscribers, [None] (ALERT_PHONE_TO) if its conditions are met
+    """
+    if not registry.subscribers_for(spot.id):
+        return [None] if check_alert_condition(wind_speed, wind_direction, spot) else []
+
+    matches = get_index(registry).query(spot.id, wind_speed, wind_direction, datetime.now())
+    return [registry.subscribers[sub_id].phone for sub_id in matches]
+
+
+def evaluate_spot(registry, spot, wind_speed: float, wind_direction: float,
+                  sustained: bool = True) -> Optional[List[Optional[str]]]:
+    """
+    Check a spot's new reading against its subscribers' rules.
+
+    In sustained mode the reading is added to the spot's rolling window and
+    the rules are matched against the window's mean once it has held steady
+    for SUSTAINED_WINDOW_MINUTES.
+
+    Args:
+        registry: SpotRegistry holding the spot and its subscribers
+        spot: Spot the reading belongs to
+        wind_speed: Wind speed in km/h
+        wind_direction: Wind direction in degrees
+        sustained: Use the rolling window when sustained mode is on
+
+    Returns:
+        Recipients to alert; [] if the spot's own conditions are met but no
+        subscriber rule matches; None if nothing is met
+    """
+    if sustained and SUSTAINED_WINDOW_MINUTES > 0:
+        reading = sustained_reading(update_window(spot, wind_speed, wind_direction), SUSTAINED_WINDOW_MINUTES)
+        if reading is None:
+            return None
+        wind_speed, wind_direction = reading
+
+    recipients = select_recipients(registry, spot, wind_speed, wind_direction)
+    if recipients or check_alert_condition(wind_speed, wind_direction, spot):
+        return recipients
+    return None
+
+
+def recipient_number(to: Optional[str]) -> Optional[str]:
+    """The number a recipient stands for (None is ALERT_PHONE_TO)."""
+    return to or ALERT_PHONE_TO
+
+
+def track_deliveries(messages: Sequence[Tuple[str, Optional[str], Sequence[Tuple[str, float, float]]]],
+                     attempt: int = 0) -> None:
+    """
+    Record sent messages so their status callbacks can be matched up
+    (skipped in dry run).
+
+    Args:
+        messages: (SID, recipient, [(spot id, speed, direction), ...]) per message
+        attempt: 0 for first sends, 1 for retries
+    """
+    if DRY_RUN:
+        return
+    try:
+        with DeliveryStore(DELIVERY_DB_PATH) as store:
+            store.record_sent([(sid, recipient_number(to), alerts) for sid, to, alerts in messages], attempt)
+    except sqlite3.Error as e:
+        log.error(f"Error recording sent messages: {e}")
+
+
+def dispatch_alert(registry, spot, recipients: Sequence[Optional[str]], message: str,
+                   wind_speed: float, wind_direction: float, attempt: int = 0) -> List[Optional[str]]:
+    """
+    Send a message to each recipient through the priority dispatch queue.
+
+    Higher-tier subscribers go first; across spots, stronger and better
+    aligned wind ranks higher. Sent messages are recorded for delivery
+    tracking as the given attempt.
+
+    Returns:
+        Message SIDs (None for failed sends) in send order
+    """
+    tiers = {s.phone: s.tier for s in registry.subscribers_for(spot.id)}
+    queue = DispatchQueue()
+    for to in recipients:
+        queue.push(to, message, alert_score(spot, wind_speed, wind_direction, tiers.get(to, 0)), spot.id)
+
+    results = queue.drain(send_sms)
+    metrics = queue.metrics()
+    log.info(f"Dispatch queue: {metrics['dispatched']} sent, {metrics['failed']} failed, "
+             f"max depth {metrics['max_depth']}, p95 wait {metrics['wait_p95'] or 0:.2f}s")
+    track_deliveries([(sid, item.recipient, [(spot.id, wind_speed, wind_direction)])
+                      for item, sid in results if sid], attempt)
+    return [sid for _, sid in results]
+
+
+def defer_alerts(spot, recipients: Sequence[Optional[str]], wind_speed: float,
+                 wind_direction: float, until: datetime) -> int:
+    """
+    Hold alerts until quiet hours end.
+
+    Returns:
+        Number of alerts newly scheduled (recipients already waiting on the
+        spot are not scheduled twice)
+    """
+    scheduler = load_schedule()
+    queued = sum(scheduler.schedule(until.timestamp(), to, spot.id, wind_speed, wind_direction, time.time())
+                 for to in recipients)
+    scheduler.save()
+    return queued
+
+
+def split_quiet_recipients(registry, recipients: Sequence[Optional[str]],
+                           now: datetime) -> Tuple[List[Optional[str]], Dict[datetime, List[Optional[str]]]]:
+    """
+    Separate recipients inside their quiet hours (their own if set, else QUIET_HOURS).
+
+    Returns:
+        (recipients to alert now, quiet recipients grouped by when their quiet hours end)
+    """
+    awake, quiet = [], {}
+    for to in recipients:
+        until = quiet_hours_end(now, registry.quiet_hours_for(to))
+        if until is None:
+            awake.append(to)
+        else:
+            quiet.setdefault(until, []).append(to)
+    return awake, quiet
+
+
+def defer_quiet_recipients(spot, quiet: Dict[datetime, List[Optional[str]]],
+                           wind_speed: float, wind_direction: float) -> int:
+    """Defer each group of quiet recipients until its quiet hours end; returns alerts newly scheduled."""
+    return sum(defer_alerts(spot, recipients, wind_speed, wind_direction, until)
+               for until, recipients in quiet.items())
+
+
+def release_deferred_alerts(registry, readings: Dict[str, Tuple[float, float]],
+                            path: str = SCHEDULE_PATH, retry: bool = False) -> int:
+    """
+    Send deferred alerts that are due, if their spot's conditions still hold.
+
+    Deduplication is checked once per spot for the whole release; alerts it
+    holds back stay scheduled and are tried again on the next run.
+
+    Args:
+        registry: SpotRegistry the alerts' spots belong to
+        readings: Readings already fetched this run (spot id -> (speed, direction));
+            other spots are fetched fresh
+        path: Schedule to release from
+        retry: These are resends of failed deliveries, which already passed
+            deduplication and are not retried again
+
+    Returns:
+        Number of alerts released
+    """
+    scheduler = load_schedule(path)
+    if not len(scheduler):
+        return 0
+
+    def recheck(spot_id):
+        spot = registry.get(spot_id)
+        if spot is None:
+            return None
+        reading = readings.get(spot_id)
+        if reading is None:
+            wind_data = fetch_wind_data(fetch_coordinates(spot.coordinates))
+            reading = (wind_data.speed, wind_data.direction) if wind_data else None
+        if reading is not None and select_recipients(registry, spot, *reading):
+            return reading
+        return None
+
+    # One dedup decision and one state update per spot for the whole release,
+    # so the first batch sent doesn't start a cooldown that suppresses the rest
+    allowed = {}
+    sent = {}
+
+    def deliver(spot_id, recipients, reading):
+        # Only recipients whose own rules still match; retries are stored under
+        # ALERT_PHONE_TO where the spot's recipients come back as None
+        still_met = set(map(recipient_number, select_recipients(registry, registry.get(spot_id), *reading)))
+        recipients = [to for to in recipients if recipient_number(to) in still_met]
+        if not recipients:
+            log.info(f"Deferred alert for {spot_id} dropped, recipients' conditions no longer met")
+            return 'dropped'
+        if spot_id not in allowed:
+            allowed[spot_id] = retry or should_send_alert(spot_id=spot_id)
+        if not allowed[spot_id]:
+            log.info(f"Deferred alert for {spot_id} held back by deduplication rules")
+            return 'suppressed'
+        spot = registry.get(spot_id)
+        message = generate_alert_message(*reading, spot.name, spot.units)
+        message_sids = dispatch_alert(registry, spot, recipients, message, *reading,
+                                      attempt=int(retry))
+        if any(message_sids) and (spot_id not in sent or reading[0] > sent[spot_id][0]):
+            sent[spot_id] = (*reading, message)
+        return None
+
+    delivered, dropped, held = scheduler.release_due(time.time(), recheck, deliver)
+    if delivered or dropped or held:
+        scheduler.save()
+    if sent and not DRY_RUN and not retry:
+        update_states((spot_id, *alert) for spot_id, alert in sent.items())
+    return delivered
+
+
+def retry_failed_deliveries(registry, readings: Dict[str, Tuple[float, float]]) -> int:
+    """
+    Resend alerts whose delivery failed, once each.
+
+    Failures reported by status callbacks are scheduled DELIVERY_RETRY_DELAY_SECONDS
+    after they're noticed, then released like deferred alerts: only if the
+    spot's conditions still hold. Permanent failures (invalid or landline
+    numbers, unsubscribed) are not retried.
+
+    Args:
+        registry: SpotRegistry the alerts' spots belong to
+        readings: Readings already fetched this run (spot id -> (speed, direction))
+
+    Returns:
+        Number of alerts resent
+    """
+    try:
+        with DeliveryStore(DELIVERY_DB_PATH) as store:
+            failed = store.take_failed(max_attempt=0)
+    except sqlite3.Error as e:
+        log.error(f"Error reading delivery statuses: {e}")
+        return 0
+
+    if failed:
+        scheduler = load_schedule(RETRY_SCHEDULE_PATH)
+        fire_at = time.time() + DELIVERY_RETRY_DELAY_SECONDS
+        queued = sum(scheduler.schedule(fire_at, f.recipient, spot_id, speed, direction, f.sent_at)
+                     for f in failed for spot_id, speed, direction in f.alerts)
+        scheduler.save()
+        log.info(f"{len(failed)} failed deliveries, {queued} alert(s) scheduled for retry")
+
+    return release_deferred_alerts(registry, readings, path=RETRY_SCHEDULE_PATH, retry=True)
+
+
+def prepare_sms_client() -> None:
+    """Set up the Twilio client ahead of sending (skipped in dry run)."""
+    if DRY_RUN:
+        return
+    try:
+        get_twilio_client()
+    except Exception as e:
+        # send_sms will report the problem if it is still there at send time
+        log.debug(f"Twilio client setup failed: {e}")
+
+
+def run_alert_pipeline(force_alert: bool, wind_speed: float, wind_direction: float, spot=None):
+    """
+    Generate the message speculatively while deduplication runs.
+
+    Message generation and Twilio client setup start in worker threads as
+    soon as conditions are met, while the dedup check reads state on this
+    thread. If the alert is suppressed the message is discarded.
+
+    Args:
+        force_alert: Bypass deduplication
+        wind_speed: Wind speed in km/h
+        wind_direction: Wind direction in degrees
+        spot: Spot the alert is for (the default spot if None)
+
+    Returns:
+        Tuple of (alert allowed, message or None)
+    """
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='alert-pipeline')
+    try:
+        spot_name, units = (spot.name, spot.units) if spot is not None else (DEFAULT_SPOT_NAME, 'kmh')
+        message_future = pool.submit(generate_alert_message, wind_speed, wind_direction, spot_name, units)
+        pool.submit(prepare_sms_client)
+
+        if not (force_alert or should_send_alert(spot_id=spot.id if spot is not None else None)):
+            log.info("Discarding speculatively generated message")
+            return False, None
+
+        return True, message_future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _lap(timings: Dict[str, float], stage: str, started: float) -> float:
+    """Record a stage's duration and return the time the next stage starts."""
+    now = time.monotonic()
+    timings[stage] = round(now - started, 3)
+    return now
+
+
+def publish_cycle_status(status: Dict) -> None:
+    """Publish this cycle's outcome, plus cooldown status, to the status endpoint."""
+    try:
+        status['cooldown'] = cooldown_status(spot_id=status.get('spot'))
+        publish_snapshot(status)
+    except Exception as e:
+        log.warning(f"Could not publish status: {e}")
+
+
 def main(force_alert: bool = False,
          test_wind_speed: Optional[float] = None,
-         test_wind_direction: Optional[float] = None) -> int:
+         test_wind_direction: Optional[float] = None,
+         pipelined: bool = PIPELINE_MODE) -> int:
     """
     Main execution function.
 
@@ -34,6 +398,7 @@ def main(force_alert: bool = False,
         force_alert: Force sending an alert (for testing)
         test_wind_speed: Override wind speed for testing
         test_wind_direction: Override wind direction for testing
+        pipelined: Overlap message generation with dedup and Twilio setup
 
     Returns:
         Exit code (0 for success, 1 for error)
@@ -44,58 +409,119 @@ def main(force_alert: bool = False,
     if DRY_RUN:
         log.info("Running in DRY RUN mode")
 
+    status = {'checked_at': datetime.now().isoformat(timespec='seconds'), 'decision': 'error', 'timings': {}}
+    timings = status['timings']
+    cycle_started = stage_started = time.monotonic()
+
     try:
+        registry = get_registry()
+        spot = registry.default_spot()
+        consensus = None
+
         # Fetch wind data (or use test data)
         if test_wind_speed is not None and test_wind_direction is not None:
             log.info(f"Using test wind data: {test_wind_speed} km/h @ {test_wind_direction}°")
-            wind_data = {
-                'speed': test_wind_speed,
-                'direction': test_wind_direction,
-                'source': 'test'
-            }
+            wind_data = WindReading(test_wind_speed, test_wind_direction, Source.TEST)
         else:
             log.info("Fetching wind data...")
-            wind_data = fetch_wind_data()
+            # Ensemble mode: one multi-model request, falling back to the single-model sources
+            # Spots fetch at their model grid point when GRID_CELL_DEGREES is set
+            coordinates = fetch_coordinates(spot.coordinates)
+            consensus = fetch_consensus(coordinates) if ENSEMBLE_MODELS else None
+            if consensus is not None and consensus.model_count[0] > 0:
+                log.info(f"Ensemble consensus: {consensus.summary()}")
+                status['ensemble'] = consensus.summary()
+                wind_data = consensus.reading()
+            else:
+                consensus = None
+                wind_data = fetch_wind_data(coordinates)
 
             if wind_data is None:
                 log.error("Failed to fetch wind data from all sources")
+                status['decision'] = 'fetch_failed'
                 return 1
 
-        wind_speed = wind_data['speed']
-        wind_direction = wind_data['direction']
-        source = wind_data['source']
+        stage_started = _lap(timings, 'fetch', stage_started)
+        wind_speed = wind_data.speed
+        wind_direction = wind_data.direction
+        source = wind_data.source
 
         log.info(f"Wind data from {source}: {wind_speed:.1f} km/h @ {wind_direction:.0f}°")
+        status.update(spot=spot.id, speed_kmh=round(wind_speed, 1),
+                      direction_deg=round(wind_direction), source=source.value)
+
+        # Release alerts held over from quiet hours, and retry failed deliveries,
+        # if conditions still hold
+        release_deferred_alerts(registry, {spot.id: (wind_speed, wind_direction)})
+        retry_failed_deliveries(registry, {spot.id: (wind_speed, wind_direction)})
+
+        # Match subscriber rules (over the rolling window when sustained mode is on)
+        recipients = evaluate_spot(registry, spot, wind_speed, wind_direction, sustained=source is not Source.TEST)
+        meets_criteria = bool(recipients)
+        if recipients == []:
+            log.info("Wind conditions meet spot criteria but no subscriber rules match")
+            status['decision'] = 'no_matching_subscribers'
+
+        if meets_criteria and consensus is not None and not consensus.agrees():
+            log.info("Wind conditions meet alert criteria but the models disagree")
+            status['decision'] = 'models_disagree'
+            meets_criteria = False
+
+        # Recipients in their quiet hours are deferred; the rest are alerted now
+        if meets_criteria and not force_alert:
+            recipients, quiet = split_quiet_recipients(registry, recipients, datetime.now())
+            if quiet:
+                quiet_until = max(quiet)
+                status.update(decision='deferred', deferred_until=quiet_until.isoformat(timespec='minutes'))
+                if DRY_RUN:
+                    log.info(f"Quiet hours, would defer {sum(map(len, quiet.values()))} alert(s) "
+                             f"until {quiet_until:%H:%M} at the latest")
+                else:
+                    queued = defer_quiet_recipients(spot, quiet, wind_speed, wind_direction)
+                    log.info(f"Quiet hours, {queued} alert(s) deferred until {quiet_until:%H:%M} at the latest")
+        stage_started = _lap(timings, 'evaluate', stage_started)
 
-        # Check alert conditions
-        meets_criteria = check_alert_condition(wind_speed, wind_direction)
-
-        if meets_criteria:
+        if meets_criteria and not recipients:
+            log.info("Every recipient is in quiet hours, nothing to send now")
+        elif meets_criteria:
             log.info("✅ Wind conditions meet alert criteria")
+            alert_started = time.monotonic()
 
-            # Check deduplication
-            if force_alert or should_send_alert():
-                log.info("Sending alert...")
+            # Check deduplication and generate message (with AI or fallback)
+            if pipelined:
+                allowed, message = run_alert_pipeline(force_alert, wind_speed, wind_direction, spot)
+            else:
+                allowed = force_alert or should_send_alert(spot_id=spot.id)
+                message = generate_alert_message(wind_speed, wind_direction, spot.name, spot.units) if allowed else None
+            stage_started = _lap(timings, 'message', stage_started)
+            status['message'] = message
 
-                # Generate message (with AI or fallback)
-                message = generate_alert_message(wind_speed, wind_direction)
+            if allowed:
+                log.info("Sending alert...")
 
-                # Send SMS
-                message_sid = send_sms(message)
+                # Send SMS to each matching subscriber (ALERT_PHONE_TO by default)
+                message_sids = dispatch_alert(registry, spot, recipients, message, wind_speed, wind_direction)
+                _lap(timings, 'send', stage_started)
 
-                if message_sid:
+                if any(message_sids):
                     log.info(f"Alert sent successfully! Message: {message}")
+                    log.info(f"Time to SMS: {time.monotonic() - alert_started:.2f}s")
+                    status['decision'] = 'sent'
 
                     # Update state
                     if not DRY_RUN:
-                        update_state(wind_speed, wind_direction, message)
+                        update_state(wind_speed, wind_direction, message, spot_id=spot.id)
                 else:
                     log.error("Failed to send SMS")
+                    status['decision'] = 'send_failed'
                     return 1
             else:
                 log.info("Alert suppressed due to deduplication rules")
+                status['decision'] = 'suppressed'
         else:
             log.info("❌ Wind conditions do not meet alert criteria")
+            if status['decision'] == 'error':
+                status['decision'] = 'below_criteria'
 
         log.info("=== Wind Alert Check Complete ===")
         return 0
@@ -103,6 +529,267 @@ def main(force_alert: bool = False,
     except Exception as e:
         log.error(f"Unexpected error: {e}", exc_info=True)
         return 1
+    finally:
+        _lap(timings, 'total', cycle_started)
+        publish_cycle_status(status)
+        record_cycle(status)
+
+def build_cycle_runner(registry, interval_minutes: float = CHECK_INTERVAL_MINUTES) -> CycleRunner:
+    """
+    Set up a CycleRunner that checks every registry spot with the same rules as main().
+
+    Args:
+        registry: SpotRegistry whose spots are checked (reloads are picked up)
+        interval_minutes: Check interval; a cycle running longer sheds work
+    """
+    consensus = {}
+
+    # Called once per grid cell (or location); spots in the cell share the result
+    def fetch(spot):
+        key = fetch_key(spot)
+        coordinates = fetch_coordinates(spot.coordinates)
+        if ENSEMBLE_MODELS:
+            result = fetch_consensus(coordinates)
+            if result is not None and result.model_count[0] > 0:
+                consensus[key] = result
+                return result.reading()
+        consensus.pop(key, None)
+        return fetch_wind_data(coordinates)
+
+    def evaluate(spot, reading):
+        recipients = evaluate_spot(registry, spot, reading.speed, reading.direction)
+        if not recipients:
+            return recipients
+        result = consensus.get(fetch_key(spot))
+        if result is not None and not result.agrees():
+            log.info(f"{spot.id}: wind conditions meet alert criteria but the models disagree")
+            return None
+        return recipients
+
+    def admit(spot, reading, recipients):
+        awake, quiet = split_quiet_recipients(registry, recipients, datetime.now())
+        if quiet and not DRY_RUN:
+            defer_quiet_recipients(spot, quiet, reading.speed, reading.direction)
+        if not awake:
+            return 'deferred'
+        if not should_send_alert(spot_id=spot.id):
+            return 'suppressed'
+        return awake if quiet else None
+
+    # A digest ranks by its best alert for the recipient's tier on that spot
+    def score(recipient, alerts):
+        best = 0.0
+        for alert in alerts:
+            spot = registry.get(alert.spot_id)
+            if spot is None:
+                continue
+            tiers = {s.phone: s.tier for s in registry.subscribers_for(spot.id)}
+            best = max(best, alert_score(spot, alert.speed, alert.direction, tiers.get(recipient, 0)))
+        return best
+
+    def on_sent(recipient, alerts, sid):
+        track_deliveries([(sid, recipient, [(a.spot_id, a.speed, a.direction) for a in alerts])])
+
+    return CycleRunner(fetch, evaluate, admit, send_sms, interval_seconds=interval_minutes * 60,
+                       on_sent=on_sent, score=score)
+
+
+def record_spot_cycle(report: CycleReport) -> None:
+    """Publish a multi-spot cycle's status and add one history row per spot."""
+    checked_at = datetime.fromtimestamp(report.started_at).isoformat(timespec='seconds')
+    state = load_state()
+    spots = {}
+    for spot_id, outcome in report.outcomes.items():
+        reading = outcome.reading
+        spots[spot_id] = {
+            'decision': outcome.decision,
+            'speed_kmh': round(reading.speed, 1) if reading else None,
+            'direction_deg': round(reading.direction) if reading else None,
+            'source': reading.source.value if reading else None
+        }
+        record_cycle({'checked_at': checked_at, 'spot': spot_id, **spots[spot_id],
+                      'timings': {'total': round(report.duration, 3)}})
+        spots[spot_id]['cooldown'] = cooldown_status(state, spot_id)
+
+    publish_cycle_status({
+        'checked_at': checked_at,
+        'decision': 'sent' if report.sent else 'checked',
+        'spots': spots,
+        'timings': {**{stage: round(seconds, 3) for stage, seconds in report.stage_seconds.items()},
+                    'total': round(report.duration, 3)},
+        'cycle': {'fetches': report.fetches, 'digests': report.digests, 'sent': report.sent,
+                  'failed': report.failed, 'shed': report.shed, 'overran': report.overran}
+    })
+
+
+def run_all_spots(runner: Optional[CycleRunner] = None, force_alert: bool = False) -> int:
+    """
+    Check every spot in the registry in one concurrent cycle.
+
+    Alerts are coalesced into one digest per subscriber. Deduplication is
+    per spot, so each spot's alert state is updated once per cycle that
+    delivers it, from its strongest alert delivered.
+
+    Args:
+        runner: Runner to use (keep one across daemon cycles); built if None
+        force_alert: Bypass deduplication and quiet hours
+
+    Returns:
+        Exit code (0 for success, 1 if any digest failed to send)
+    """
+    log.info("=== Starting multi-spot wind alert cycle ===")
+    registry = get_registry()
+    runner = runner or build_cycle_runner(registry)
+
+    try:
+        report = runner.run(registry.spots.values(), force=force_alert)
+
+        readings = {spot_id: (o.reading.speed, o.reading.direction)
+                    for spot_id, o in report.outcomes.items() if o.reading is not None}
+        release_deferred_alerts(registry, readings)
+        retry_failed_deliveries(registry, readings)
+
+        # From the digests that actually went out, which with a digest window
+        # can hold alerts queued in earlier cycles
+        strongest = {}
+        for _, alerts, message in report.delivered:
+            for alert in alerts:
+                if alert.spot_id not in strongest or alert.speed > strongest[alert.spot_id][0].speed:
+                    strongest[alert.spot_id] = (alert, message)
+        if strongest and not DRY_RUN:
+            update_states((spot_id, alert.speed, alert.direction, message)
+                          for spot_id, (alert, message) in strongest.items())
+
+        record_spot_cycle(report)
+        return 1 if report.failed else 0
+    except Exception as e:
+        log.error(f"Unexpected error: {e}", exc_info=True)
+        return 1
+
+
+def run_daemon(interval_minutes: float, status_port: int = STATUS_PORT,
+               profile: Optional[str] = None, profile_every: int = PROFILE_SAMPLE_EVERY,
+               all_spots: bool = False, callback_port: int = CALLBACK_PORT, **kwargs) -> int:
+    """
+    Run checks in a loop instead of once per process.
+
+    The spot registry is reloaded between cycles when its file changes.
+
+    Args:
+        interval_minutes: Minutes between the start of each check
+        status_port: Serve the latest status on this port (0 disables)
+        profile: Profile sampled cycles with 'cpu' or 'mem' (None disables)
+        profile_every: Profile one cycle in every N
+        all_spots: Check every registry spot each cycle (run_all_spots)
+        callback_port: Receive Twilio status callbacks on this port (0 disables)
+        **kwargs: Passed through to main() (only force_alert with all_spots)
+
+    Returns:
+        Exit code once interrupted
+    """
+    log.info(f"Starting daemon mode, checking every {interval_minutes:g} minutes")
+    registry = get_registry()
+    server = start_status_server(status_port) if status_port else None
+    callbacks = None
+    if callback_port:
+        buffer = CallbackBuffer(DeliveryStore(DELIVERY_DB_PATH)).start()
+        callbacks = start_callback_server(buffer, callback_port)
+
+    runner = build_cycle_runner(registry, interval_minutes) if all_spots else None
+    cycle = 0
+
+    try:
+        while True:
+            started = time.monotonic()
+            if registry.reload_if_changed():
+                log.info("Spot registry file changed, reloaded")
+
+            sampled = profile if profile and cycle % max(1, profile_every) == 0 else None
+            if runner is not None:
+                profiled_call(sampled, run_all_spots, runner, label=f'cycle-{cycle}',
+                              force_alert=kwargs.get('force_alert', False))
+            else:
+                profiled_call(sampled, main, label=f'cycle-{cycle}', **kwargs)
+            cycle += 1
+            log.debug(f"Client health: {client_health()}")
+
+            elapsed = time.monotonic() - started
+            time.sleep(max(0.0, interval_minutes * 60 - elapsed))
+    except KeyboardInterrupt:
+        log.info("Daemon stopped")
+        return 0
+    finally:
+        if server is not None:
+            server.shutdown()
+        if callbacks is not None:
+            callbacks.shutdown()
+            callbacks.buffer.stop()
+            log.info(f"Status callbacks: {callbacks.buffer.metrics()}")
+            callbacks.buffer.store.close()
+
+def run_export(out_dir: str) -> int:
+    """
+    Export the history journal to day-partitioned Arrow/Parquet files.
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    try:
+        rows = export_history(out_dir=out_dir)
+    except (ImportError, OSError) as e:
+        log.error(f"History export failed: {e}")
+        return 1
+    log.info(f"History export complete: {rows} row(s) in {out_dir}")
+    return 0
+
+def run_import(paths: List[str], spot_id: str) -> int:
+    """
+    Import ECCC hourly CSV / Open-Meteo archive JSON files into the history store.
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    try:
+        import_history(paths, spot_id=spot_id)
+    except (ImportError, OSError, ValueError) as e:
+        log.error(f"History import failed: {e}")
+        return 1
+    return 0
+
+def run_callback_test(url: Optional[str], count: int) -> int:
+    """
+    Post synthetic status callbacks for count messages and report throughput.
+
+    With no URL a receiver is started locally against a scratch database,
+    so the whole path (HTTP, buffering, batched writes) is measured.
+
+    Returns:
+        Exit code (0 if every callback was accepted)
+    """
+    bodies = synthetic_callbacks(count)
+    scratch = server = None
+    if url is None:
+        scratch = tempfile.TemporaryDirectory()
+        buffer = CallbackBuffer(DeliveryStore(f"{scratch.name}/deliveries.db")).start()
+        server = start_callback_server(buffer, 0, host='127.0.0.1', public_url='')
+        url = f"http://127.0.0.1:{server.server_address[1]}{CALLBACK_PATH}"
+
+    try:
+        accepted, seconds = post_test_callbacks(url, bodies)
+        log.info(f"Posted {len(bodies)} callbacks to {url}: {accepted} accepted in {seconds:.2f}s "
+                 f"({len(bodies) / max(seconds, 1e-9):.0f}/s)")
+        if server is not None:
+            server.shutdown()
+            buffer.stop()
+            log.info(f"Receiver: {buffer.metrics()}, statuses {buffer.store.status_counts()}")
+            buffer.store.close()
+    except OSError as e:
+        log.error(f"Callback test failed: {e}")
+        return 1
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    return 0 if accepted == len(bodies) else 1
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -134,6 +821,103 @@ def parse_arguments():
         help='Use test wind direction (degrees) instead of fetching real data'
     )
 
+    parser.add_argument(
+        '--pipelined',
+        action='store_true',
+        help='Generate the message while deduplication and Twilio setup run'
+    )
+
+    parser.add_argument(
+        '--all-spots',
+        action='store_true',
+        help='Check every spot in the registry concurrently, sending one digest per subscriber'
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Keep running and check on an interval instead of once'
+    )
+
+    parser.add_argument(
+        '--interval-minutes',
+        type=float,
+        default=CHECK_INTERVAL_MINUTES,
+        help='Minutes between checks in daemon mode'
+    )
+
+    parser.add_argument(
+        '--status-port',
+        type=int,
+        default=STATUS_PORT,
+        help='Serve current status over HTTP on this port in daemon mode (0 disables)'
+    )
+
+    parser.add_argument(
+        '--callback-port',
+        type=int,
+        default=CALLBACK_PORT,
+        help='Receive Twilio delivery status callbacks on this port in daemon mode (0 disables)'
+    )
+
+    parser.add_argument(
+        '--simulate-callbacks',
+        nargs='?',
+        const='',
+        metavar='URL',
+        help='Post synthetic status callbacks to URL (or a local receiver if omitted), then exit'
+    )
+
+    parser.add_argument(
+        '--callback-count',
+        type=int,
+        default=1000,
+        metavar='N',
+        help='Messages to simulate callbacks for (three callbacks each)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        choices=PROFILE_MODES,
+        help='Profile the run with cProfile (cpu) or tracemalloc (mem) and log the top entries'
+    )
+
+    parser.add_argument(
+        '--profile-every',
+        type=int,
+        default=PROFILE_SAMPLE_EVERY,
+        metavar='N',
+        help='In daemon mode, profile one cycle in every N'
+    )
+
+    parser.add_argument(
+        '--snapshot',
+        default=SNAPSHOT_PATH,
+        metavar='FILE',
+        help='Restore runtime state from this snapshot at start and write it back at exit'
+    )
+
+    parser.add_argument(
+        '--export-history',
+        nargs='?',
+        const=HISTORY_EXPORT_DIR,
+        metavar='DIR',
+        help='Export the history journal to Arrow/Parquet files partitioned by day, then exit'
+    )
+
+    parser.add_argument(
+        '--import-history',
+        nargs='+',
+        metavar='FILE',
+        help='Import ECCC hourly CSV and/or Open-Meteo archive JSON files into the history store, then exit'
+    )
+
+    parser.add_argument(
+        '--spot',
+        default=DEFAULT_SPOT_ID,
+        help='Spot id to record imported history against'
+    )
+
     return parser.parse_args()
 
 if __name__ == '__main__':
@@ -149,10 +933,41 @@ if __name__ == '__main__':
         log.error("Both --test-wind-speed and --test-wind-direction must be provided together")
         sys.exit(1)
 
-    exit_code = main(
+    if args.all_spots and args.test_wind_speed is not None:
+        log.error("--test-wind-speed/--test-wind-direction can't be used with --all-spots")
+        sys.exit(1)
+
+    run_args = dict(
         force_alert=args.force_alert,
         test_wind_speed=args.test_wind_speed,
-        test_wind_direction=args.test_wind_direction
+        test_wind_direction=args.test_wind_direction,
+        pipelined=args.pipelined or PIPELINE_MODE
     )
 
+    if args.simulate_callbacks is not None:
+        exit_code = profiled_call(args.profile, run_callback_test, args.simulate_callbacks or None,
+                                  args.callback_count, label='callbacks')
+        sys.exit(exit_code)
+
+    # Ephemeral runners start warm from the previous run's snapshot
+    if args.snapshot:
+        restore_snapshot(args.snapshot)
+
+    try:
+        if args.export_history:
+            exit_code = profiled_call(args.profile, run_export, args.export_history, label='export')
+        elif args.import_history:
+            exit_code = profiled_call(args.profile, run_import, args.import_history, args.spot, label='import')
+        elif args.daemon:
+            exit_code = run_daemon(args.interval_minutes, status_port=args.status_port, profile=args.profile,
+                                   profile_every=args.profile_every, all_spots=args.all_spots,
+                                   callback_port=args.callback_port, **run_args)
+        elif args.all_spots:
+            exit_code = profiled_call(args.profile, run_all_spots, label='run', force_alert=args.force_alert)
+        else:
+            exit_code = profiled_call(args.profile, main, label='run', **run_args)
+    finally:
+        if args.snapshot:
+            write_snapshot(args.snapshot)
+
     sys.exit(exit_code)
\ No newline at end of file